@@ -14,14 +14,18 @@ from datetime import datetime
 # Add src-python to the path
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
-sys.path.append(str(PROJECT_ROOT / "src-python"))
+sys.path.insert(0, str(SCRIPT_DIR / "src-python"))
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Security
 from fastapi.security.api_key import APIKeyHeader
 from pydantic import BaseModel
-from src_python.whisper_processor import WhisperProcessor
-from src_python.transcript_analyzer import OllamaTranscriptAnalyzer
-from src_python.recap_generator import DNDRecapGenerator
+# Plain module names, as the modules import each other: WhisperProcessor and
+# /api/models/cache must share one model_registry module
+from whisper_processor import WhisperProcessor
+from model_registry import get_registry
+from segment_store import SegmentStore
+from transcript_analyzer import OllamaTranscriptAnalyzer
+from recap_generator import DNDRecapGenerator
 
 API_KEY = "your_api_key"  # Replace with a secure, generated API key
 API_KEY_NAME = "X-API-Key"
@@ -47,6 +51,8 @@ jobs: Dict[str, dict] = {}
 class TranscribeRequest(BaseModel):
     file_path: str
     model: str = "medium"
+    engine: str = "openai"
+    precision: Optional[str] = None
     output_dir: Optional[str] = None
 
 
@@ -55,6 +61,8 @@ class AnalyzeRequest(BaseModel):
     model: str = "gemma3n:latest"
     ollama_url: str = "http://192.168.68.10:11434"
     output_dir: Optional[str] = None
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
 
 
 class RecapRequest(BaseModel):
@@ -74,6 +82,8 @@ class JobStatus(BaseModel):
     job_id: str
     status: str
     progress: Optional[int] = None
+    eta_seconds: Optional[float] = None
+    rtf: Optional[float] = None
     stage: Optional[str] = None
     error: Optional[str] = None
     result: Optional[dict] = None
@@ -93,22 +103,39 @@ def process_transcribe_job(job_id: str, request: TranscribeRequest):
         jobs[job_id]["stage"] = "transcription"
         jobs[job_id]["progress"] = 0
 
-        # Initialize processor
-        processor = WhisperProcessor(model_name=request.model)
+        def report_progress(event):
+            # Decoding fills the 25-99% band; the processor rate-limits these events
+            jobs[job_id]["progress"] = min(99, 25 + int(75 * event["fraction"]))
+            jobs[job_id]["eta_seconds"] = event["eta_seconds"]
+            jobs[job_id]["rtf"] = event["rtf"]
+
+        # Initialize processor (models stay resident in the shared registry)
+        processor = WhisperProcessor(
+            model_name=request.model,
+            engine=request.engine,
+            precision=request.precision,
+            on_progress=report_progress
+        )
+        if not processor.load_model():
+            raise RuntimeError(f"Failed to load Whisper model: {request.model}")
 
         # Process the file
         input_path = Path(request.file_path)
         output_dir = Path(request.output_dir) if request.output_dir else input_path.parent
+        output_path = output_dir / f"{input_path.stem}_{request.model}_transcript.txt"
 
         jobs[job_id]["progress"] = 25
-        result = processor.process_file(str(input_path), str(output_dir))
+        transcript_path = processor.transcribe_file(str(input_path), str(output_path))
+        if not transcript_path:
+            raise RuntimeError("Transcription failed")
 
         jobs[job_id]["progress"] = 100
         jobs[job_id]["status"] = "completed"
         jobs[job_id]["result"] = {
-            "transcript_path": result.get("transcript_path"),
-            "duration": result.get("duration"),
-            "model": request.model
+            "transcript_path": transcript_path,
+            "model": request.model,
+            "engine": request.engine,
+            "model_cache": get_registry().stats()
         }
     except Exception as e:
         jobs[job_id]["status"] = "failed"
@@ -123,26 +150,31 @@ def process_analyze_job(job_id: str, request: AnalyzeRequest):
         jobs[job_id]["progress"] = 0
 
         # Initialize analyzer
-        analyzer = OllamaTranscriptAnalyzer(
-            model=request.model,
-            base_url=request.ollama_url
-        )
+        analyzer = OllamaTranscriptAnalyzer(ollama_host=request.ollama_url)
 
-        # Read transcript
         transcript_path = Path(request.transcript_path)
-        with open(transcript_path, 'r') as f:
-            transcript_text = f.read()
+        time_range = None
+        if request.start_time is not None or request.end_time is not None:
+            time_range = (request.start_time or 0.0, request.end_time)
 
         jobs[job_id]["progress"] = 25
 
-        # Analyze
+        # Analyze (only the requested range is read from the segment store)
         output_dir = Path(request.output_dir) if request.output_dir else transcript_path.parent
-        analysis = analyzer.analyze_transcript(transcript_text, str(output_dir))
+        base_name = transcript_path.stem.replace('_transcript', '', 1)
+        analysis_path = analyzer.analyze_transcript(
+            str(transcript_path),
+            model=request.model,
+            output_path=str(output_dir / f"{base_name}_analysis.txt"),
+            time_range=time_range
+        )
+        if not analysis_path:
+            raise RuntimeError("Analysis failed")
 
         jobs[job_id]["progress"] = 100
         jobs[job_id]["status"] = "completed"
         jobs[job_id]["result"] = {
-            "analysis_path": analysis.get("output_path"),
+            "analysis_path": analysis_path,
             "model": request.model
         }
     except Exception as e:
@@ -272,12 +304,47 @@ async def get_job_status(job_id: str):
         job_id=job_id,
         status=job.get("status"),
         progress=job.get("progress"),
+        eta_seconds=job.get("eta_seconds"),
+        rtf=job.get("rtf"),
         stage=job.get("stage"),
         error=job.get("error"),
         result=job.get("result")
     )
 
 
+@app.get("/api/models/cache")
+async def model_cache_stats():
+    """Report resident Whisper models and registry hit/miss counts."""
+    return get_registry().stats()
+
+
+@app.get("/api/transcript/segments")
+async def transcript_segments(transcript_path: str, start: float = 0.0, end: Optional[float] = None):
+    """Return the segments (with word timings) of a transcript between two times in seconds."""
+    try:
+        with SegmentStore(transcript_path) as store:
+            return {
+                "segments": store.range(start, end),
+                "duration": store.duration
+            }
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="No segment store for this transcript")
+
+
+@app.get("/api/transcript/words")
+def transcript_words(transcript_path: str, media_path: str, start: float = 0.0,
+                     end: Optional[float] = None, model: str = "medium"):
+    """Align word timings for a time range of a transcript on demand and return its segments."""
+    processor = WhisperProcessor(model_name=model)
+    if not processor.load_model():
+        raise HTTPException(status_code=500, detail=f"Failed to load Whisper model: {model}")
+
+    segments = processor.align_transcript(transcript_path, media_path, start=start, end=end)
+    if segments is None:
+        raise HTTPException(status_code=500, detail="Word alignment failed")
+    return {"segments": segments}
+
+
 @app.get("/api/jobs")
 async def list_jobs():
     """List all jobs."""
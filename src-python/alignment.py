@@ -0,0 +1,237 @@
+"""
+Deferred word-level alignment for the openai-whisper engine.
+Transcription runs at segment level; word timings are computed later, only for
+the segments a consumer asks for (subtitle export, clip lookup, ...).
+Alignment reuses encoder features kept from transcription where a cached
+30 s window covers the segments, so only the decoder's cross-attention pass
+and DTW are paid for.
+"""
+
+import os
+import sys
+from collections import OrderedDict
+
+import torch
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+from whisper.timing import add_word_timestamps
+
+from batched_decoder import window_mels
+
+DEFAULT_FEATURE_CACHE_MB = float(os.environ.get("WHISPER_FEATURE_CACHE_MB", "1024"))
+
+
+class EncoderFeatureCache:
+    """Size-bounded LRU of encoder outputs keyed by (media key, window start sample)"""
+
+    def __init__(self, budget_mb=DEFAULT_FEATURE_CACHE_MB):
+        """
+        Initialize the cache.
+
+        Args:
+            budget_mb: Maximum memory held by cached features (0 disables caching)
+        """
+        self.budget = int(budget_mb * 1024 ** 2)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, key, start, features):
+        """Store one window's (n_audio_ctx, n_audio_state) features on the CPU"""
+        features = features.detach().to("cpu")
+        size = features.numel() * features.element_size()
+        if size > self.budget:
+            return
+
+        entry_key = (key, int(start))
+        if entry_key in self._entries:
+            self._bytes -= self._size(self._entries.pop(entry_key))
+        self._entries[entry_key] = features
+        self._bytes += size
+
+        while self._bytes > self.budget:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._size(evicted)
+
+    def get(self, key, start):
+        """Return cached features for a window, or None"""
+        features = self._entries.get((key, int(start)))
+        if features is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((key, int(start)))
+        self.hits += 1
+        return features
+
+    def window_starts(self, key):
+        """Sorted window start samples cached for one media key"""
+        return sorted(start for entry_key, start in self._entries if entry_key == key)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self):
+        return {
+            "windows": len(self._entries),
+            "resident_mb": round(self._bytes / 1024 ** 2, 1),
+            "budget_mb": round(self.budget / 1024 ** 2, 1),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    @staticmethod
+    def _size(features):
+        return features.numel() * features.element_size()
+
+
+_feature_cache = None
+
+
+def get_feature_cache():
+    """Process-wide encoder feature cache shared by transcription and alignment"""
+    global _feature_cache
+    if _feature_cache is None:
+        _feature_cache = EncoderFeatureCache()
+    return _feature_cache
+
+
+class _PrecomputedEncoder:
+    """
+    Stand-in for a Whisper model inside whisper.timing.find_alignment.
+    Calling it runs only the decoder against precomputed encoder features;
+    every other attribute (dims, decoder, alignment_heads, ...) is the model's.
+    """
+
+    def __init__(self, model, features):
+        self._model = model
+        self._features = features
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def __call__(self, mel, tokens):
+        return self._model.logits(tokens, self._features)
+
+
+def align_window(model, tokenizer, segments, features, window_start, num_samples):
+    """
+    Attach word timings to segments that all fall inside one 30 s window.
+
+    Args:
+        model: Loaded openai-whisper model
+        tokenizer: Whisper tokenizer for the transcript's language
+        segments: Segment dicts with 'tokens' (or 'text'), in time order
+        features: Encoder output for the window, shape (1, n_audio_ctx, n_audio_state)
+        window_start: Window start offset in samples (multiple of HOP_LENGTH)
+        num_samples: Number of real (unpadded) samples in the window
+    """
+    seeks = [segment.get("seek") for segment in segments]
+    for segment in segments:
+        # add_word_timestamps measures word times from the first segment's seek
+        segment["seek"] = window_start // HOP_LENGTH
+        if not segment.get("tokens"):
+            segment["tokens"] = tokenizer.encode(" " + segment["text"].strip())
+
+    try:
+        add_word_timestamps(
+            segments=segments,
+            model=_PrecomputedEncoder(model, features.to(model.device)),
+            tokenizer=tokenizer,
+            mel=torch.empty(0),  # Unused: the encoder output is precomputed
+            num_frames=min(N_FRAMES, num_samples // HOP_LENGTH),
+            last_speech_timestamp=segments[0]["start"],
+        )
+    finally:
+        for segment, seek in zip(segments, seeks):
+            segment["seek"] = seek
+
+    # Degenerate alignments can land a hair outside the window; keep
+    # segment and word times on the window's timeline
+    window_begin = window_start / SAMPLE_RATE
+    window_end = (window_start + num_samples) / SAMPLE_RATE
+    for segment in segments:
+        for item in [segment] + segment.get("words", []):
+            item["start"] = float(min(max(item["start"], window_begin), window_end))
+            item["end"] = float(min(max(item["end"], item["start"]), window_end))
+
+
+class WordAligner:
+    """On-demand word alignment over a decoded waveform"""
+
+    def __init__(self, model, tokenizer, fp16=False, feature_cache=None, media_key=None):
+        """
+        Initialize the aligner.
+
+        Args:
+            model: Loaded openai-whisper model
+            tokenizer: Whisper tokenizer for the transcript's language
+            fp16: Whether the model runs in half precision
+            feature_cache: EncoderFeatureCache shared with transcription (optional)
+            media_key: Key the media's windows are cached under
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.dtype = torch.float16 if fp16 else torch.float32
+        self.feature_cache = feature_cache
+        self.media_key = media_key
+        self.windows_encoded = 0
+
+    def _features(self, audio, start, offset):
+        """Encoder output for the window starting at `start`, from the cache when possible"""
+        if self.feature_cache is not None:
+            features = self.feature_cache.get(self.media_key, start)
+            if features is not None:
+                return features.unsqueeze(0)
+
+        mel = window_mels(self.model, audio, [start - offset], self.dtype)
+        with torch.no_grad():
+            features = self.model.embed_audio(mel)
+        self.windows_encoded += 1
+
+        if self.feature_cache is not None:
+            self.feature_cache.put(self.media_key, start, features[0])
+        return features
+
+    def _group(self, segments):
+        """Split segments into runs that each fit inside one 30 s window"""
+        cached = self.feature_cache.window_starts(self.media_key) if self.feature_cache is not None else []
+
+        groups = []
+        for segment in segments:
+            begin = int(segment["start"] * SAMPLE_RATE)
+            finish = int(segment["end"] * SAMPLE_RATE)
+            if groups and finish <= groups[-1][0] + N_SAMPLES:
+                groups[-1][1].append(segment)
+                continue
+
+            # Prefer a window already encoded during transcription
+            start = next((s for s in cached if s <= begin and finish <= s + N_SAMPLES), None)
+            if start is None:
+                start = begin - begin % HOP_LENGTH
+            groups.append((start, [segment]))
+        return groups
+
+    def align(self, audio, segments, offset=0):
+        """
+        Add 'words' to segments in place.
+
+        Args:
+            audio: float32 waveform at 16 kHz
+            segments: Segment dicts in time order, on the transcript's timeline
+            offset: Sample position of audio[0] on the transcript's timeline
+
+        Returns:
+            The segments that have text, each with a 'words' list
+        """
+        segments = [segment for segment in segments if segment["text"].strip()]
+        for start, group in self._group(segments):
+            num_samples = min(N_SAMPLES, len(audio) - (start - offset))
+            if num_samples <= 0:
+                continue
+            features = self._features(audio, start, offset)
+            align_window(self.model, self.tokenizer, group, features, start, num_samples)
+
+        print(f"🔤 Aligned words for {len(segments)} segments "
+              f"({self.windows_encoded} windows encoded)", file=sys.stderr, flush=True)
+        return segments
@@ -0,0 +1,287 @@
+"""
+Decoded-audio and log-mel cache.
+Comparing models on the same recording used to re-run FFmpeg and recompute
+the log-mel spectrogram on every run. Here the 16 kHz PCM of each recording
+and its per-window log-mel features are stored once as .npy files keyed by
+the media content, then memory-mapped on later runs: nothing is decoded or
+copied, and parallel workers read the same page-cache pages.
+
+The cache is bounded in size; the least recently used recordings are
+evicted first. Float32 PCM takes twice the space of a 16-bit WAV, so the
+cache is opt-in (WHISPER_AUDIO_CACHE=1 or --audio-cache).
+"""
+
+import io
+import json
+import mmap
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from whisper.audio import N_FRAMES, N_SAMPLES
+
+from audio_io import SAMPLE_RATE, stream_pcm
+from transcript_cache import DEFAULT_CACHE_DIR, content_hash, sampled_fingerprint
+
+CACHE_VERSION = 1
+
+DEFAULT_AUDIO_DIR = DEFAULT_CACHE_DIR / "audio"
+AUDIO_CACHE_ENABLED = os.environ.get("WHISPER_AUDIO_CACHE", "0") == "1"
+AUDIO_CACHE_BYTES = int(float(os.environ.get("WHISPER_AUDIO_CACHE_GB", "8")) * 1024 ** 3)
+
+META_NAME = "meta.json"
+PCM_NAME = "pcm.npy"
+NPY_HEADER_BYTES = 128  # Room reserved for the .npy header of a 1-D array
+
+
+def _mels_name(n_mels):
+    return f"mel{n_mels}.npy"
+
+
+def _npy_header(shape, dtype):
+    """Version 1.0 .npy header bytes for an array of this shape and dtype"""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {
+        'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        'fortran_order': False,
+        'shape': tuple(shape),
+    })
+    return header.getvalue()
+
+
+def write_pcm_npy(media_path, path):
+    """
+    Decode media into a float32 .npy file without holding it in memory.
+
+    FFmpeg's PCM stream is converted chunk by chunk and appended after a
+    reserved header, which is filled in once the sample count is known.
+
+    Returns:
+        Number of samples written
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    samples = 0
+    with open(tmp_path, 'wb') as f:
+        f.seek(NPY_HEADER_BYTES)
+        for chunk in stream_pcm(media_path):
+            f.write((chunk * np.float32(1 / 32768.0)).astype(np.float32).tobytes())
+            samples += len(chunk)
+
+        header = _npy_header((samples,), np.float32)
+        if len(header) != NPY_HEADER_BYTES:
+            raise RuntimeError(f"Unexpected .npy header size {len(header)}")
+        f.seek(0)
+        f.write(header)
+    os.replace(tmp_path, path)
+    return samples
+
+
+def cached_pcm_path(audio):
+    """
+    The cache file behind a waveform, if it is a whole one returned by AudioCache.
+
+    Slices share the memory map but not its start, so only arrays mapped
+    directly from the file qualify.
+
+    Returns:
+        Path of the pcm.npy file, or None
+    """
+    if isinstance(audio, np.memmap) and isinstance(audio.base, mmap.mmap) and audio.filename:
+        path = Path(audio.filename)
+        if path.name == PCM_NAME:
+            return path
+    return None
+
+
+class AudioCache:
+    """Memory-mapped PCM and per-window log-mel features, keyed by media content"""
+
+    def __init__(self, cache_dir=DEFAULT_AUDIO_DIR, max_bytes=AUDIO_CACHE_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one subdirectory per recording
+            max_bytes: Total size above which least recently used recordings are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, media_path):
+        return self.cache_dir / sampled_fingerprint(media_path)
+
+    def _is_valid(self, entry_dir, media_path):
+        """
+        Whether an entry holds this media's audio.
+
+        The full content hash is only computed when the file's size or mtime
+        changed since the entry was written.
+        """
+        try:
+            with open(entry_dir / META_NAME, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("version") != CACHE_VERSION or not (entry_dir / PCM_NAME).exists():
+            return False
+
+        stat = Path(media_path).stat()
+        if meta.get("size") == stat.st_size and meta.get("mtime_ns") == stat.st_mtime_ns:
+            return True
+        return meta.get("content_hash") == content_hash(media_path)
+
+    def _write_meta(self, entry_dir, media_path, samples):
+        stat = Path(media_path).stat()
+        meta = {
+            "version": CACHE_VERSION,
+            "content_hash": content_hash(media_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "samples": samples,
+        }
+        tmp_path = entry_dir / (META_NAME + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, entry_dir / META_NAME)
+
+    def lookup_pcm(self, media_path):
+        """
+        Memory-map the cached waveform of a recording.
+
+        Returns:
+            Copy-on-write float32 memmap at 16 kHz, or None on a miss
+        """
+        try:
+            entry_dir = self._entry_dir(media_path)
+            if not self._is_valid(entry_dir, media_path):
+                return None
+            os.utime(entry_dir / META_NAME)  # Track recency for eviction
+            return np.load(entry_dir / PCM_NAME, mmap_mode='c')
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Audio cache lookup failed: {e}", file=sys.stderr, flush=True)
+            return None
+
+    def pcm(self, media_path):
+        """
+        Waveform of a recording, decoding it into the cache on a miss.
+
+        Returns:
+            Copy-on-write float32 memmap at 16 kHz
+        """
+        audio = self.lookup_pcm(media_path)
+        if audio is not None:
+            print(f"⚡ Decoded audio served from cache: {len(audio) / SAMPLE_RATE:.1f}s",
+                  file=sys.stderr, flush=True)
+            return audio
+
+        entry_dir = self._entry_dir(media_path)
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir, ignore_errors=True)  # Stale or from a changed file
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        samples = write_pcm_npy(media_path, entry_dir / PCM_NAME)
+        self._write_meta(entry_dir, media_path, samples)
+        print(f"💾 Cached decoded audio ({samples / SAMPLE_RATE:.1f}s) in "
+              f"{time.perf_counter() - started:.1f}s", file=sys.stderr, flush=True)
+
+        self.evict(keep=entry_dir)
+        return np.load(entry_dir / PCM_NAME, mmap_mode='c')
+
+    def window_mels(self, audio, n_mels, device=None):
+        """
+        Per-window log-mel features of a cached recording.
+
+        Window i covers samples [i * 30 s, (i + 1) * 30 s), padded like
+        whisper.pad_or_trim, matching what batched transcription computes.
+        They are computed once per mel size and stored next to the PCM.
+
+        Args:
+            audio: Whole waveform as returned by pcm() or lookup_pcm()
+            n_mels: Mel bins of the model (80, or 128 for large-v3)
+            device: Torch device to compute missing features on
+
+        Returns:
+            float32 memmap of shape (windows, n_mels, 3000), or None if `audio`
+            is not a cached waveform
+        """
+        import whisper
+
+        pcm_path = cached_pcm_path(audio)
+        if pcm_path is None:
+            return None
+        path = pcm_path.with_name(_mels_name(n_mels))
+        try:
+            if path.exists():
+                return np.load(path, mmap_mode='c')
+
+            windows = -(-len(audio) // N_SAMPLES)
+            tmp_path = path.with_name(path.name + ".tmp.npy")
+            mels = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                             shape=(windows, n_mels, N_FRAMES))
+            started = time.perf_counter()
+            for i in range(windows):
+                window = whisper.pad_or_trim(audio[i * N_SAMPLES:(i + 1) * N_SAMPLES])
+                mels[i] = whisper.log_mel_spectrogram(window, n_mels=n_mels, device=device).cpu().numpy()
+            mels.flush()
+            del mels
+            os.replace(tmp_path, path)
+            print(f"💾 Cached log-mel features ({windows} windows) in "
+                  f"{time.perf_counter() - started:.1f}s", file=sys.stderr, flush=True)
+
+            self.evict(keep=pcm_path.parent)
+            return np.load(path, mmap_mode='c')
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not cache log-mel features: {e}", file=sys.stderr, flush=True)
+            return None
+
+    def entries(self):
+        """
+        Cached recordings, least recently used first.
+
+        Returns:
+            List of (entry_dir, size_bytes, last_used)
+        """
+        if not self.cache_dir.exists():
+            return []
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            if not entry_dir.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry_dir.iterdir() if f.is_file())
+                meta = entry_dir / META_NAME
+                last_used = meta.stat().st_mtime if meta.exists() else 0.0
+            except OSError:
+                continue
+            entries.append((entry_dir, size, last_used))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep=None):
+        """Remove least recently used recordings until the cache fits in max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for entry_dir, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and entry_dir == Path(keep):
+                continue
+            # Open memory maps keep working on POSIX; on Windows the delete may fail
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            if not entry_dir.exists():
+                total -= size
+                print(f"🧹 Evicted cached audio {entry_dir.name} ({size / 1024 ** 2:.0f} MB)",
+                      file=sys.stderr, flush=True)
+
+    def stats(self):
+        """Recording count, total size and size limit"""
+        entries = self.entries()
+        return {
+            "recordings": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,214 @@
+"""
+Audio decoding helpers for the Whisper pipeline.
+Streams FFmpeg's raw PCM output straight into NumPy so media never has to be
+written to (and re-read from) a temporary WAV file.
+"""
+
+import re
+import subprocess
+import sys
+import threading
+import wave
+
+import numpy as np
+
+SAMPLE_RATE = 16000  # Whisper's native sample rate
+
+# Bytes read from the FFmpeg pipe per iteration
+READ_CHUNK_BYTES = 1024 * 1024
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_STREAM_RE = re.compile(r"^\s*Stream #\d+:\d+(?:\[\w+\])?(?:\((\w+)\))?: (\w+): (.*)$")
+_TITLE_RE = re.compile(r"^\s+title\s*: (.*)$")
+
+
+def probe_duration(media_path):
+    """
+    Read a media file's duration from FFmpeg's stream summary.
+
+    Returns:
+        Duration in seconds, or None if FFmpeg cannot report it
+    """
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-nostdin', '-i', str(media_path)],
+            capture_output=True, text=True, errors='replace'
+        )
+    except FileNotFoundError:
+        return None
+
+    match = _DURATION_RE.search(result.stderr)
+    if not match:
+        return None
+
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_audio_streams(media_path):
+    """
+    List a media file's audio streams from FFmpeg's stream summary.
+
+    Returns:
+        List of dicts with 'index' (position among the audio streams, as used
+        by `-map 0:a:N`), 'language', 'title' and 'description'
+    """
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-nostdin', '-i', str(media_path)],
+            capture_output=True, text=True, errors='replace'
+        )
+    except FileNotFoundError:
+        return []
+
+    streams = []
+    current = None  # Audio stream whose metadata lines follow
+    for line in result.stderr.splitlines():
+        match = _STREAM_RE.match(line)
+        if match:
+            language, kind, description = match.groups()
+            current = None
+            if kind == "Audio":
+                current = {
+                    'index': len(streams),
+                    'language': language if language not in (None, "und") else None,
+                    'title': None,
+                    'description': description.strip(),
+                }
+                streams.append(current)
+            continue
+
+        title = _TITLE_RE.match(line)
+        if title and current is not None and current['title'] is None:
+            current['title'] = title.group(1).strip()
+    return streams
+
+
+def _ffmpeg_pcm_command(media_path, sample_rate, start=None, duration=None, track=None):
+    """Build an FFmpeg command that writes mono s16le PCM to stdout"""
+    cmd = ['ffmpeg', '-hide_banner', '-nostdin', '-loglevel', 'error', '-threads', '0']
+    if start:
+        cmd += ['-ss', f"{start:.3f}"]
+    cmd += ['-i', str(media_path)]
+    if track is not None:
+        cmd += ['-map', f"0:a:{track}"]  # One audio stream instead of FFmpeg's default pick
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += [
+        '-vn',  # No video
+        '-f', 's16le',  # Raw PCM 16-bit
+        '-acodec', 'pcm_s16le',
+        '-ar', str(sample_rate),
+        '-ac', '1',  # Mono
+        '-'
+    ]
+    return cmd
+
+
+def stream_pcm(media_path, sample_rate=SAMPLE_RATE, start=None, duration=None, track=None):
+    """
+    Stream FFmpeg's mono 16-bit PCM output in bounded chunks.
+
+    Args:
+        media_path: Path to the audio or video file
+        sample_rate: Output sample rate (default: 16 kHz)
+        start: Optional offset in seconds to start decoding from
+        duration: Optional number of seconds to decode
+        track: Audio stream to decode (position among the audio streams; default:
+            FFmpeg's default stream)
+
+    Yields:
+        int16 sample arrays of at most READ_CHUNK_BYTES / 2 samples. Each one is a
+        view of a reused buffer, valid only until the next iteration.
+
+    Raises:
+        RuntimeError: If FFmpeg fails to decode the input
+    """
+    cmd = _ffmpeg_pcm_command(media_path, sample_rate, start, duration, track)
+    print(f"DEBUG: Decoding audio: {' '.join(cmd)}", file=sys.stderr, flush=True)
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    # Drain stderr on a thread so a chatty FFmpeg can never block the pipe
+    stderr_chunks = []
+    stderr_thread = threading.Thread(
+        target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+    )
+    stderr_thread.start()
+
+    buffer = bytearray(READ_CHUNK_BYTES)
+    view = memoryview(buffer)
+    pending = 0  # Bytes carried over when a read ends mid-sample
+
+    try:
+        while True:
+            read = process.stdout.readinto(view[pending:])
+            if not read:
+                break
+
+            available = pending + read
+            usable = available - (available % 2)
+            yield np.frombuffer(buffer, dtype=np.int16, count=usable // 2)
+
+            pending = available - usable
+            if pending:
+                buffer[0] = buffer[usable]
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()  # Consumer stopped early
+        returncode = process.wait()
+        stderr_thread.join()
+
+    if returncode != 0:
+        stderr = b"".join(stderr_chunks).decode(errors='replace').strip()
+        raise RuntimeError(f"FFmpeg failed to decode {media_path} (exit code {returncode}): {stderr}")
+
+
+def decode_audio(media_path, sample_rate=SAMPLE_RATE, start=None, duration=None, track=None):
+    """
+    Decode any FFmpeg-readable media into a mono float32 waveform.
+
+    The PCM stream is read from FFmpeg's stdout directly into a float32 array
+    preallocated from the probed duration, so no intermediate file is written.
+
+    Args:
+        media_path: Path to the audio or video file
+        sample_rate: Output sample rate (default: 16 kHz)
+        start: Optional offset in seconds to start decoding from
+        duration: Optional number of seconds to decode
+        track: Audio stream to decode (see stream_pcm)
+
+    Returns:
+        np.ndarray of float32 samples in [-1, 1]
+
+    Raises:
+        RuntimeError: If FFmpeg fails to decode the input
+    """
+    expected_seconds = duration or probe_duration(media_path)
+    if expected_seconds and not duration and start:
+        expected_seconds = max(expected_seconds - start, 0)
+    capacity = int((expected_seconds or 60) * sample_rate) + sample_rate
+    audio = np.empty(capacity, dtype=np.float32)
+    filled = 0
+
+    for samples in stream_pcm(media_path, sample_rate, start, duration, track):
+        if filled + len(samples) > len(audio):
+            audio = np.resize(audio, max(len(audio) * 3 // 2, filled + len(samples)))
+        target = audio[filled:filled + len(samples)]
+        target[:] = samples
+        target *= 1 / 32768.0
+        filled += len(samples)
+
+    return audio[:filled]
+
+
+def write_wav(audio, output_path, sample_rate=SAMPLE_RATE):
+    """Write a float32 waveform as a 16-bit PCM WAV file"""
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype('<i2')
+
+    with wave.open(str(output_path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
@@ -0,0 +1,144 @@
+"""
+Multi-file transcription pipeline.
+A folder (or glob) of recordings is transcribed with one loaded model while
+FFmpeg decodes the next files in a small thread pool. At most `prefetch`
+decoded waveforms wait ahead of the file being transcribed, so memory stays
+flat however many files are queued, and neither the decoder cores nor the
+inference cores sit idle between files.
+"""
+
+import glob
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from audio_io import SAMPLE_RATE
+from file_handler import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+
+MEDIA_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
+
+
+def is_batch_input(value):
+    """Whether a CLI input names a directory or a glob rather than one file"""
+    return Path(value).is_dir() or any(char in str(value) for char in "*?[")
+
+
+def expand_inputs(value):
+    """
+    Media files named by a directory or glob pattern, in sorted order.
+
+    Args:
+        value: Directory path or glob (e.g. "sessions/*.mkv")
+
+    Returns:
+        List of Paths with audio/video extensions
+    """
+    path = Path(value)
+    if path.is_dir():
+        candidates = path.iterdir()
+    else:
+        candidates = (Path(match) for match in glob.glob(str(value), recursive=True))
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in MEDIA_EXTENSIONS)
+
+
+def default_transcript_path(input_path, output_dir=None):
+    """Transcript location: output_dir, or the CLI's ../transcripts next to the input"""
+    input_path = Path(input_path)
+    directory = Path(output_dir) if output_dir else input_path.parent.parent / "transcripts"
+    return directory / f"{input_path.stem}.txt"
+
+
+class BatchPipeline:
+    """Transcribes many files with one model, decoding upcoming files in the background"""
+
+    def __init__(self, processor, prefetch=2, decode_workers=None, output_dir=None, keep_audio=False):
+        """
+        Initialize the pipeline.
+
+        Args:
+            processor: WhisperProcessor with its model loaded
+            prefetch: Decoded files allowed to wait ahead of the current one
+            decode_workers: FFmpeg decode threads (default: prefetch)
+            output_dir: Directory for transcripts (default: ../transcripts per input)
+            keep_audio: Also write each decoded waveform as a WAV next to its transcript
+        """
+        self.processor = processor
+        self.prefetch = max(0, int(prefetch))
+        self.decode_workers = decode_workers or max(1, self.prefetch)
+        self.output_dir = output_dir
+        self.keep_audio = keep_audio
+
+    def _needs_audio(self, input_path, language):
+        """Decode ahead only when the file will actually be transcribed in memory"""
+        processor = self.processor
+        if processor.stream or processor.multitrack:
+            return False  # Streaming and multi-track runs read the media themselves
+        if processor.cache and not self.keep_audio:
+            return not processor.cache.has_entry(input_path, processor.settings(language))
+        return True
+
+    def _decode(self, input_path):
+        started = time.perf_counter()
+        audio = self.processor.decode_media(input_path)
+        print(f"🎵 Prefetched {input_path.name}: {len(audio) / SAMPLE_RATE:.0f}s of audio "
+              f"in {time.perf_counter() - started:.1f}s", file=sys.stderr, flush=True)
+        return audio
+
+    def run(self, inputs, language=None):
+        """
+        Transcribe every input in order.
+
+        Args:
+            inputs: Media file paths
+            language: Force language (None for auto-detect per file)
+
+        Returns:
+            List of (input_path, transcript_path or None) in input order
+        """
+        inputs = [Path(p) for p in inputs]
+        results = []
+        pending = deque()  # (input_path, future or None) for the current and upcoming files
+        upcoming = iter(inputs)
+
+        def submit_next(pool):
+            input_path = next(upcoming, None)
+            if input_path is None:
+                return
+            future = pool.submit(self._decode, input_path) if self._needs_audio(input_path, language) else None
+            pending.append((input_path, future))
+
+        with ThreadPoolExecutor(max_workers=self.decode_workers, thread_name_prefix="decode") as pool:
+            for _ in range(self.prefetch + 1):
+                submit_next(pool)
+
+            index = 0
+            while pending:
+                input_path, future = pending.popleft()
+                index += 1
+                print(f"\n📁 [{index}/{len(inputs)}] {input_path.name}")
+
+                audio = None
+                if future is not None:
+                    try:
+                        audio = future.result()
+                    except Exception as e:
+                        print(f"❌ Failed to decode {input_path}: {e}")
+                        results.append((input_path, None))
+                        submit_next(pool)
+                        continue
+
+                transcript_path = default_transcript_path(input_path, self.output_dir)
+                transcript_path.parent.mkdir(parents=True, exist_ok=True)
+                saved = self.processor.transcribe_file(input_path, transcript_path, keep_audio=self.keep_audio,
+                                                       audio=audio, language=language)
+                del audio
+                results.append((input_path, saved))
+
+                # Only now queue the next decode, so `prefetch` files wait ahead at most
+                submit_next(pool)
+
+        done = sum(1 for _, saved in results if saved)
+        print(f"\n✨ Batch complete: {done}/{len(results)} files transcribed")
+        return results
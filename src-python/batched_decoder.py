@@ -0,0 +1,352 @@
+"""
+Batched window transcription for the openai-whisper engine.
+With condition_on_previous_text=False the 30-second windows are independent,
+so N windows are turned into one log-mel batch, encoded in a single encoder
+pass and decoded together.
+"""
+
+import sys
+
+import numpy as np
+import torch
+import whisper
+from whisper.audio import HOP_LENGTH, N_SAMPLES, SAMPLE_RATE
+from whisper.decoding import DecodingOptions
+from whisper.tokenizer import get_tokenizer
+from whisper.utils import format_timestamp
+
+# Seconds represented by one timestamp token step (0.02 s)
+TIME_PRECISION = 2 * HOP_LENGTH / SAMPLE_RATE
+
+
+def decoding_options(options, fp16):
+    """
+    Map openai-whisper transcribe() options onto DecodingOptions.
+
+    Mirrors transcribe(): beam search at temperature 0, sampling otherwise.
+    """
+    temperature = options.get("temperature", 0.0)
+    kwargs = {
+        "task": options.get("task", "transcribe"),
+        "language": options.get("language"),
+        "temperature": temperature,
+        "fp16": fp16,
+    }
+    if temperature > 0:
+        kwargs["best_of"] = options.get("best_of")
+    else:
+        kwargs["beam_size"] = options.get("beam_size")
+        kwargs["patience"] = options.get("patience")
+    return DecodingOptions(**kwargs)
+
+
+def window_mels(model, audio, starts, dtype=torch.float32, cached=None):
+    """
+    Build a (batch, n_mels, 3000) log-mel tensor for 30 s windows.
+
+    Args:
+        model: openai-whisper model
+        audio: float32 waveform at 16 kHz
+        starts: Window start offsets in samples
+        dtype: Tensor dtype matching the model weights
+        cached: Optional (windows, n_mels, 3000) log-mel array of `audio` (see
+            AudioCache.window_mels), read instead of recomputing aligned windows
+    """
+    if (cached is not None and cached.shape[1] == model.dims.n_mels
+            and all(start % N_SAMPLES == 0 for start in starts)):
+        mel = np.asarray(cached[[start // N_SAMPLES for start in starts]])
+        return torch.from_numpy(mel).to(model.device, dtype)
+
+    mels = [
+        whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio[start:start + N_SAMPLES]),
+            n_mels=model.dims.n_mels,
+            device=model.device,
+        )
+        for start in starts
+    ]
+    return torch.stack(mels).to(dtype)
+
+
+def is_silence(result, options):
+    """transcribe()'s rule for dropping a window as silence"""
+    no_speech_threshold = options.get("no_speech_threshold")
+    logprob_threshold = options.get("logprob_threshold")
+    return (
+        no_speech_threshold is not None
+        and result.no_speech_prob > no_speech_threshold
+        and (logprob_threshold is None or result.avg_logprob < logprob_threshold)
+    )
+
+
+def needs_beam(result, options):
+    """
+    transcribe()'s fallback rule: the greedy result is too repetitive or too
+    unconfident. Windows that look like silence never need the beam pass.
+    """
+    if is_silence(result, options):
+        return False
+    compression_ratio_threshold = options.get("compression_ratio_threshold")
+    logprob_threshold = options.get("logprob_threshold")
+    return (
+        (compression_ratio_threshold is not None and result.compression_ratio > compression_ratio_threshold)
+        or (logprob_threshold is not None and result.avg_logprob < logprob_threshold)
+    )
+
+
+def result_to_segments(tokenizer, result, start, num_samples):
+    """
+    Split one window's DecodingResult into timestamped segments.
+
+    Args:
+        tokenizer: Whisper tokenizer
+        result: DecodingResult for the window
+        start: Window start offset in samples
+        num_samples: Number of real (unpadded) samples in the window
+
+    Returns:
+        List of openai-whisper segment dicts with absolute timestamps
+    """
+    time_offset = start / SAMPLE_RATE
+    window_duration = num_samples / SAMPLE_RATE
+    tokens = torch.tensor(result.tokens)
+    timestamp_begin = tokenizer.timestamp_begin
+
+    def new_segment(seg_start, seg_end, seg_tokens):
+        seg_tokens = seg_tokens.tolist()
+        text_tokens = [token for token in seg_tokens if token < tokenizer.eot]
+        return {
+            "seek": start // HOP_LENGTH,
+            "start": time_offset + seg_start,
+            "end": time_offset + min(seg_end, window_duration),
+            "text": tokenizer.decode(text_tokens),
+            "tokens": seg_tokens,
+            "temperature": result.temperature,
+            "avg_logprob": result.avg_logprob,
+            "compression_ratio": result.compression_ratio,
+            "no_speech_prob": result.no_speech_prob,
+        }
+
+    if len(tokens) == 0:
+        return []
+
+    timestamp_tokens = tokens.ge(timestamp_begin)
+    single_timestamp_ending = timestamp_tokens[-2:].tolist() == [False, True]
+    consecutive = torch.where(timestamp_tokens[:-1] & timestamp_tokens[1:])[0] + 1
+
+    segments = []
+    if len(consecutive) > 0:
+        slices = consecutive.tolist()
+        if single_timestamp_ending:
+            slices.append(len(tokens))
+
+        last_slice = 0
+        for current_slice in slices:
+            sliced = tokens[last_slice:current_slice]
+            start_pos = sliced[0].item() - timestamp_begin
+            end_pos = sliced[-1].item() - timestamp_begin
+            segments.append(new_segment(start_pos * TIME_PRECISION, end_pos * TIME_PRECISION, sliced))
+            last_slice = current_slice
+
+        # A fixed window cannot seek back, so keep any trailing unclosed segment
+        remainder = tokens[last_slice:]
+        if not single_timestamp_ending and remainder.lt(tokenizer.eot).any():
+            start_pos = remainder[0].item() - timestamp_begin if remainder[0] >= timestamp_begin else 0
+            segments.append(new_segment(start_pos * TIME_PRECISION, window_duration, remainder))
+    else:
+        duration = window_duration
+        timestamps = tokens[timestamp_tokens.nonzero().flatten()]
+        if len(timestamps) > 0 and timestamps[-1].item() != timestamp_begin:
+            duration = (timestamps[-1].item() - timestamp_begin) * TIME_PRECISION
+        segments.append(new_segment(0.0, duration, tokens))
+
+    return [segment for segment in segments if segment["text"].strip()]
+
+
+class BatchedTranscriber:
+    """Transcribes independent 30 s windows in encoder/decoder batches"""
+
+    greedy_only = False  # Windows are decoded greedily whatever the beam settings
+
+    def __init__(self, model, batch_size=8, fp16=False, adaptive=False, on_encoded=None, mels=None):
+        """
+        Initialize the transcriber.
+
+        Args:
+            model: Loaded openai-whisper model
+            batch_size: Windows per encoder/decoder batch
+            fp16: Whether the model runs in half precision
+            adaptive: Decode greedily and re-run beam search only on windows
+                that fail the compression ratio / avg_logprob checks
+            on_encoded: Optional callback(start_sample, features) receiving each
+                window's encoder output, e.g. to keep it for later word alignment
+            mels: Cached per-window log-mel features of the audio to transcribe
+        """
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.fp16 = fp16
+        self.dtype = torch.float16 if fp16 else torch.float32
+        self.adaptive = adaptive
+        self.windows_decoded = 0
+        self.beam_windows = 0
+        self.on_encoded = on_encoded
+        self.mels = mels
+
+    def tokenizer(self, language, task="transcribe"):
+        return get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=language,
+            task=task,
+        )
+
+    def encode_windows(self, audio, starts):
+        """Run the encoder once over a batch of windows"""
+        mel = window_mels(self.model, audio, starts, self.dtype, cached=self.mels)
+        with torch.no_grad():
+            return self.model.embed_audio(mel)
+
+    def decode_features(self, features, options):
+        """Decode pre-computed encoder features; returns one DecodingResult per window"""
+        decode_options = decoding_options(options, self.fp16)
+        with torch.no_grad():
+            if decode_options.beam_size is None or len(features) == 1:
+                return whisper.decode(self.model, features, decode_options)
+
+            # Beam search over a multi-window batch is not reliable across
+            # whisper releases, so beams run per window on the shared encoder output
+            return [
+                whisper.decode(self.model, features[i:i + 1], decode_options)[0]
+                for i in range(len(features))
+            ]
+
+    def decode_adaptive(self, features, options):
+        """
+        Greedy-decode a batch, then beam-decode only the windows that fail.
+
+        The encoder output is reused, so a retried window costs one extra
+        decoder pass and no extra encoder pass.
+        """
+        results = self.decode_features(features, dict(options, beam_size=None, patience=None))
+
+        retry = [i for i, result in enumerate(results) if needs_beam(result, options)]
+        for i in retry:
+            results[i] = self.decode_features(features[i:i + 1], options)[0]
+
+        self.beam_windows += len(retry)
+        return results
+
+    def decode_windows(self, audio, starts, options):
+        """Encode and decode a batch of windows; returns (encoder features, DecodingResults)"""
+        features = self.encode_windows(audio, starts)
+        if self.on_encoded is not None:
+            for start, window_features in zip(starts, features):
+                self.on_encoded(start, window_features)
+
+        self.windows_decoded += len(starts)
+        if self.adaptive:
+            return features, self.decode_adaptive(features, options)
+        return features, self.decode_features(features, options)
+
+    def transcribe(self, audio, options, verbose=None, on_progress=None):
+        """
+        Transcribe a waveform window by window in batches.
+
+        Args:
+            audio: float32 waveform at 16 kHz
+            options: openai-whisper style decoding options (language should be set)
+            verbose: Print segments as each batch finishes
+            on_progress: Optional callback(seconds) after each batch with the audio decoded so far
+
+        Returns:
+            Dict with 'text', 'segments' and 'language'
+        """
+        starts = list(range(0, len(audio), N_SAMPLES))
+        print(f"📦 Batched transcription: {len(starts)} windows, batch size {self.batch_size}",
+              file=sys.stderr, flush=True)
+
+        batches = (
+            (audio, starts[i:i + self.batch_size], 0)
+            for i in range(0, len(starts), self.batch_size)
+        )
+        return self._transcribe_batches(batches, options, verbose, on_progress)
+
+    def transcribe_stream(self, batches, options, verbose=None, on_progress=None):
+        """
+        Transcribe audio delivered in bounded batches (see streaming.stream_batches).
+
+        Only the current batch and its encoder output are held in memory, so
+        memory use does not grow with the length of the recording.
+
+        Args:
+            batches: Iterable of (offset_samples, samples), each holding up to
+                batch_size consecutive 30 s windows starting `offset_samples` into the audio
+            options: openai-whisper style decoding options (language should be set)
+            verbose: Print segments as each batch finishes
+            on_progress: Optional callback(seconds) after each batch with the audio decoded so far
+
+        Returns:
+            Dict with 'text', 'segments' and 'language'
+        """
+        print(f"🌊 Streaming transcription: batches of {self.batch_size} windows", file=sys.stderr, flush=True)
+        batches = (
+            (samples, list(range(0, len(samples), N_SAMPLES)), offset)
+            for offset, samples in batches
+        )
+        return self._transcribe_batches(batches, options, verbose, on_progress)
+
+    def _transcribe_batches(self, batches, options, verbose=None, on_progress=None):
+        """
+        Decode batches of windows and collect their segments.
+
+        Args:
+            batches: Iterable of (audio, starts, offset): windows at `starts` samples
+                into `audio`, which itself begins `offset` samples into the recording
+        """
+        if self.batch_size > 1 and options.get("beam_size") and not (self.adaptive or self.greedy_only):
+            print("ℹ️  Beam search decodes one window at a time; only the encoder runs batched "
+                  "(--adaptive decodes greedily in batches)", file=sys.stderr, flush=True)
+        language = options.get("language") or "en"
+        options = dict(options, language=language)
+        tokenizer = self.tokenizer(language, options.get("task", "transcribe"))
+
+        segments = []
+        for audio, batch, offset in batches:
+            features, results = self.decode_windows(audio, batch, options)
+
+            for start, window_features, result in zip(batch, features, results):
+                if is_silence(result, options):
+                    continue
+                num_samples = min(N_SAMPLES, len(audio) - start)
+                window_segments = result_to_segments(tokenizer, result, offset + start, num_samples)
+
+                if options.get("word_timestamps") and window_segments:
+                    self.add_word_timestamps(window_segments, tokenizer, window_features,
+                                             offset + start, num_samples)
+
+                for segment in window_segments:
+                    segment["id"] = len(segments)
+                    segments.append(segment)
+                    if verbose:
+                        print(f"[{format_timestamp(segment['start'])} --> "
+                              f"{format_timestamp(segment['end'])}] {segment['text']}", flush=True)
+
+            if on_progress:
+                on_progress((offset + min(len(audio), batch[-1] + N_SAMPLES)) / SAMPLE_RATE)
+
+        result = {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language,
+        }
+        if self.adaptive:
+            print(f"🔁 Adaptive decoding: {self.beam_windows}/{self.windows_decoded} windows "
+                  f"needed beam search", file=sys.stderr, flush=True)
+            result["adaptive"] = {"windows": self.windows_decoded, "beam_windows": self.beam_windows}
+        return result
+
+    def add_word_timestamps(self, segments, tokenizer, features, start, num_samples):
+        """Attach word-level timings to one window's segments, reusing its encoder output"""
+        from alignment import align_window
+
+        align_window(self.model, tokenizer, segments, features.unsqueeze(0), start, num_samples)
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmarks for the local transcription paths.
+
+    python benchmarks.py compile --model small --windows 8 --batch-size 4
+    python benchmarks.py precision --model small --input clip.wav --reference clip.txt
+    python benchmarks.py memory --model tiny --minutes 2 60 --whole-file
+    python benchmarks.py packing --model small --minutes 30
+    python benchmarks.py repetition
+    python benchmarks.py load --model medium --precision fp16
+
+Runs the same windows through each configuration and reports windows per
+second, so the fastest setup can be picked per machine.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import torch
+from whisper.audio import N_SAMPLES, SAMPLE_RATE
+
+from audio_io import decode_audio
+
+
+def synthetic_audio(windows, seed=0):
+    """Deterministic speech-like test signal: tone bursts over low noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(windows * N_SAMPLES) / SAMPLE_RATE
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > 0).astype(np.float32)
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t) * envelope
+    return (tone + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+def benchmark_audio(input_path, windows):
+    """Benchmark input: the first `windows` 30 s windows of a file, or synthetic audio"""
+    if input_path is None:
+        return synthetic_audio(windows)
+    audio = decode_audio(input_path)[:windows * N_SAMPLES]
+    return np.pad(audio, (0, windows * N_SAMPLES - len(audio)))
+
+
+def windows_per_second(model, audio, batch_size, fp16=False, repeats=1, transcriber=None):
+    """
+    Encode and greedily decode every window of `audio`.
+
+    Args:
+        model: Loaded openai-whisper model (eager or compiled)
+        audio: float32 waveform, a whole number of 30 s windows
+        batch_size: Windows per encoder/decoder batch
+        fp16: Whether the model runs in half precision
+        repeats: Timed passes after one warm-up pass
+        transcriber: BatchedTranscriber to time (default: one for `model`)
+
+    Returns:
+        Windows decoded per second over the timed passes
+    """
+    from batched_decoder import BatchedTranscriber
+
+    if transcriber is None:
+        transcriber = BatchedTranscriber(model, batch_size=batch_size, fp16=fp16)
+    options = {"language": "en", "temperature": 0.0, "beam_size": None}
+    starts = list(range(0, len(audio), N_SAMPLES))
+
+    def run():
+        for i in range(0, len(starts), batch_size):
+            transcriber.decode_windows(audio, starts[i:i + batch_size], options)
+
+    run()  # Warm-up (lazy compilation, allocator, page faults)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        run()
+    return len(starts) * repeats / (time.perf_counter() - started)
+
+
+def compare_compile(model_name, audio, batch_size, precision="fp32", repeats=1,
+                    modes=("eager", "trace", "inductor")):
+    """
+    Windows per second for the eager model and each compiled mode.
+
+    Returns:
+        Dict of mode -> {"windows_per_second", "setup_seconds"}
+    """
+    from compiled import compile_model
+    from weight_cache import load_model
+
+    results = {}
+    for mode in modes:
+        started = time.perf_counter()
+        model, _ = load_model(model_name, "cpu", precision)
+        if mode != "eager":
+            model = compile_model(model, model_name, precision, mode, batch_size=batch_size)
+        setup_seconds = time.perf_counter() - started
+
+        with torch.no_grad():
+            rate = windows_per_second(model, audio, batch_size, fp16=precision == "fp16", repeats=repeats)
+        results[mode] = {
+            "windows_per_second": round(rate, 3),
+            "setup_seconds": round(setup_seconds, 2),
+        }
+        print(f"  {mode:<10} {rate:8.3f} windows/s  (setup {setup_seconds:.1f}s)", flush=True)
+        del model
+
+    return results
+
+
+def compare_engines(model_name, audio, batch_size, repeats=1, engines=("openai", "onnx")):
+    """
+    Windows per second for the openai-whisper and ONNX Runtime engines.
+
+    Both decode greedily on the CPU, so the numbers compare like with like.
+
+    Returns:
+        Dict of engine -> {"windows_per_second", "setup_seconds"}
+    """
+    from engines import create_engine
+    from onnx_engine import OnnxTranscriber
+
+    results = {}
+    for name in engines:
+        started = time.perf_counter()
+        model = create_engine(name, model_name, "cpu").load()
+        setup_seconds = time.perf_counter() - started
+
+        with torch.no_grad():
+            if name == "onnx":
+                rate = windows_per_second(model, audio, batch_size, repeats=repeats,
+                                          transcriber=OnnxTranscriber(model, batch_size=batch_size))
+            else:
+                rate = windows_per_second(model, audio, batch_size, repeats=repeats)
+        results[name] = {
+            "windows_per_second": round(rate, 3),
+            "setup_seconds": round(setup_seconds, 2),
+        }
+        print(f"  {name:<10} {rate:8.3f} windows/s  (setup {setup_seconds:.1f}s)", flush=True)
+        del model
+
+    return results
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word error rate of `hypothesis` against `reference` (case and punctuation ignored).
+
+    Returns:
+        (substitutions + deletions + insertions) / reference words
+    """
+    from repetition import WORD_PATTERN
+
+    ref = WORD_PATTERN.findall(reference.lower())
+    hyp = WORD_PATTERN.findall(hypothesis.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def compare_precisions(model_name, audio, precisions=("fp32", "int8"), language="en", reference=None):
+    """
+    Transcribe a reference clip at each precision and report RTF and WER.
+
+    WER is measured against the FP32 transcript, and against a reference
+    transcript too when one is given.
+
+    Returns:
+        Dict of precision -> {"rtf", "wer_vs_fp32", "wer_vs_reference", "load_seconds"}
+    """
+    from whisper_processor import WhisperProcessor
+
+    duration = len(audio) / SAMPLE_RATE
+    texts = {}
+    results = {}
+    for precision in ("fp32",) + tuple(p for p in precisions if p != "fp32"):
+        processor = WhisperProcessor(model_name=model_name, device="cpu", precision=precision, use_cache=False)
+        started = time.perf_counter()
+        if not processor.load_model():
+            continue
+        load_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = processor.transcribe(audio, language=language)
+        elapsed = time.perf_counter() - started
+        texts[precision] = result["text"] if result else ""
+
+        results[precision] = {
+            "rtf": round(elapsed / duration, 4),
+            "wer_vs_fp32": round(word_error_rate(texts["fp32"], texts[precision]), 4),
+            "wer_vs_reference": (
+                round(word_error_rate(reference, texts[precision]), 4) if reference is not None else None
+            ),
+            "load_seconds": round(load_seconds, 2),
+        }
+
+    print(f"\n  {'precision':<10} {'RTF':>8} {'WER vs fp32':>12} {'WER vs ref':>11}")
+    for precision, row in results.items():
+        ref_wer = f"{row['wer_vs_reference']:.2%}" if row["wer_vs_reference"] is not None else "-"
+        print(f"  {precision:<10} {row['rtf']:8.3f} {row['wer_vs_fp32']:12.2%} {ref_wer:>11}")
+    return results
+
+
+def write_synthetic_wav(path, seconds, seed=0):
+    """
+    Write `seconds` of synthetic audio as a 16 kHz mono WAV, one window at a time.
+
+    Long inputs for the memory benchmark never exist in memory in full.
+    """
+    import wave
+
+    windows = -(-int(seconds * SAMPLE_RATE) // N_SAMPLES)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        for i in range(windows):
+            window = synthetic_audio(1, seed=seed + i)
+            f.writeframes((np.clip(window, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+    return windows * N_SAMPLES / SAMPLE_RATE
+
+
+def _peak_rss_run(model_name, engine, input_path, batch_size, stream):
+    """Transcribe one file in a fresh process and return its peak resident memory in bytes"""
+    import resource
+
+    from whisper_processor import WhisperProcessor
+
+    processor = WhisperProcessor(model_name=model_name, device="cpu", engine=engine, batch_size=batch_size,
+                                 stream=stream, use_cache=False)
+    if not processor.load_model():
+        raise RuntimeError(f"Could not load model {model_name}")
+    processor.audio_cache = None  # Measure decoding, not a memory-mapped cache hit
+    processor.transcribe(input_path if stream else processor.load_audio(input_path), language="en")
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports kilobytes
+
+
+def compare_memory(model_name, minutes=(2, 20), batch_size=4, engine="openai", tolerance=0.15,
+                   whole_file=False):
+    """
+    Peak memory of streaming transcription for short and long recordings.
+
+    Each run happens in its own spawned process, so peaks do not carry over.
+    Streaming passes when the longest recording peaks within `tolerance` of
+    the shortest, i.e. memory does not grow with duration.
+
+    Args:
+        model_name: Whisper model size
+        minutes: Recording lengths to compare
+        batch_size: Windows per batch
+        engine: "openai" or "onnx"
+        tolerance: Allowed relative growth of the peak over the shortest run
+        whole_file: Also measure whole-file (non-streaming) transcription for contrast
+
+    Returns:
+        Dict of "<mode> <minutes>min" -> {"peak_mb", "seconds"}, plus "within_ceiling"
+    """
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    from pathlib import Path
+
+    modes = [("stream", True)] + ([("whole", False)] if whole_file else [])
+    results = {}
+    peaks = {}
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for length in sorted(minutes):
+            input_path = Path(tmp) / f"synthetic_{length}min.wav"
+            write_synthetic_wav(input_path, length * 60)
+            for mode, stream in modes:
+                started = time.perf_counter()
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    peak = pool.submit(_peak_rss_run, model_name, engine, str(input_path),
+                                       batch_size, stream).result()
+                elapsed = time.perf_counter() - started
+                peaks.setdefault(mode, []).append(peak)
+                results[f"{mode} {length}min"] = {
+                    "peak_mb": round(peak / 1024 ** 2, 1),
+                    "seconds": round(elapsed, 1),
+                }
+                print(f"  {mode:<7} {length:>5} min  peak {peak / 1024 ** 2:8.1f} MB  ({elapsed:.0f}s)", flush=True)
+
+    stream_peaks = peaks["stream"]
+    growth = stream_peaks[-1] / stream_peaks[0] - 1
+    results["within_ceiling"] = growth <= tolerance
+    status = "✅" if results["within_ceiling"] else "❌"
+    print(f"{status} Streaming peak grew {growth:+.1%} from {min(minutes)} to {max(minutes)} min "
+          f"(ceiling {tolerance:+.0%})")
+    return results
+
+
+def bursty_audio(seconds, seed=0, min_burst=0.5, max_burst=3.0, min_pause=3.0, max_pause=20.0):
+    """
+    Deterministic bursty test signal: short tone bursts separated by long pauses.
+
+    Returns:
+        (float32 waveform, seconds of burst audio)
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = (0.003 * rng.standard_normal(total)).astype(np.float32)
+    burst_samples = 0
+    position = int(rng.uniform(min_pause, max_pause) * SAMPLE_RATE)
+    while position < total:
+        length = min(int(rng.uniform(min_burst, max_burst) * SAMPLE_RATE), total - position)
+        t = np.arange(length) / SAMPLE_RATE
+        pitch = rng.uniform(150, 300)
+        audio[position:position + length] += (0.3 * np.sin(2 * np.pi * pitch * t)).astype(np.float32)
+        burst_samples += length
+        position += length + int(rng.uniform(min_pause, max_pause) * SAMPLE_RATE)
+    return audio, burst_samples / SAMPLE_RATE
+
+
+def compare_packing(model_name, audio, speech_seconds=None, batch_size=4, engine="openai"):
+    """
+    Encoder windows and wall time with no VAD, VAD concatenation and packed windows.
+
+    Every mode decodes fixed 30 s windows (batched path), so the window count
+    is the number of encoder passes. `speech_seconds` defaults to what VAD detects.
+
+    Returns:
+        Dict of mode -> {"windows", "windows_per_speech_hour", "split_regions", "seconds", "segments"}
+    """
+    from packing import PackedSpeechMap
+    from vad import SpeechMap
+    from whisper_processor import WhisperProcessor
+
+    maps = {"full": None, "vad": SpeechMap.from_audio(audio), "pack": PackedSpeechMap.from_audio(audio)}
+    if speech_seconds is None:
+        speech_seconds = maps["vad"].speech_samples / SAMPLE_RATE
+    results = {}
+    for mode, speech_map in maps.items():
+        if speech_map is None:
+            windows = -(-len(audio) // N_SAMPLES)
+            split_regions = 0
+        else:
+            windows = -(-len(speech_map.packed_audio(audio)) // N_SAMPLES)
+            # Regions cut in two by a window boundary lose context on both sides
+            ends = speech_map.packed_starts + speech_map.lengths - 1
+            split_regions = int(np.count_nonzero(speech_map.packed_starts // N_SAMPLES != ends // N_SAMPLES))
+
+        processor = WhisperProcessor(model_name=model_name, device="cpu", engine=engine, batch_size=batch_size,
+                                     vad=mode == "vad", pack=mode == "pack", use_cache=False)
+        if not processor.load_model():
+            continue
+        processor.transcribe(audio[:N_SAMPLES], language="en")  # Warm-up
+        started = time.perf_counter()
+        result = processor.transcribe(audio, language="en")
+        elapsed = time.perf_counter() - started
+
+        results[mode] = {
+            "windows": windows,
+            "windows_per_speech_hour": round(windows * 3600 / speech_seconds, 1) if speech_seconds else None,
+            "split_regions": split_regions,
+            "seconds": round(elapsed, 2),
+            "segments": len(result["segments"]) if result else 0,
+        }
+
+    print(f"\n  {'mode':<6} {'windows':>8} {'per speech h':>13} {'split':>6} {'seconds':>8}")
+    for mode, row in results.items():
+        per_hour = f"{row['windows_per_speech_hour']:.1f}" if row["windows_per_speech_hour"] is not None else "-"
+        print(f"  {mode:<6} {row['windows']:8d} {per_hour:>13} "
+              f"{row['split_regions']:6d} {row['seconds']:8.2f}")
+    return results
+
+
+def compare_load(model_name, precision="fp32", repeats=1):
+    """
+    Cold-start time from the original checkpoint vs the memory-mapped weight cache.
+
+    Both sources are timed with a warm page cache, to a model that has encoded
+    one window, since mapped weights are only read on first use. The measured
+    load times are recorded for `whisper_processor.py --check`.
+
+    Returns:
+        Dict of source -> {"load_seconds", "first_window_seconds"}
+    """
+    from whisper.audio import log_mel_spectrogram
+
+    from weight_cache import (SOURCE_CACHE, SOURCE_CHECKPOINT, load_checkpoint, load_model,
+                              load_weight_cache, record_load_time)
+
+    load_model(model_name, "cpu", precision)  # Converts the cache on the first run
+
+    loaders = {
+        SOURCE_CHECKPOINT: lambda: load_checkpoint(model_name, "cpu", precision),
+        SOURCE_CACHE: lambda: load_weight_cache(model_name, precision, "cpu"),
+    }
+    results = {}
+    for source, loader in loaders.items():
+        load_seconds = first_window_seconds = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model = loader()
+            loaded = time.perf_counter() - started
+            mel = log_mel_spectrogram(np.zeros(N_SAMPLES, dtype=np.float32), model.dims.n_mels)
+            with torch.no_grad():
+                model.encoder(mel.unsqueeze(0).to(next(model.parameters()).dtype))
+            load_seconds = min(load_seconds, loaded)
+            first_window_seconds = min(first_window_seconds, time.perf_counter() - started)
+            del model
+        record_load_time(model_name, precision, source, load_seconds)
+        results[source] = {
+            "load_seconds": round(load_seconds, 3),
+            "first_window_seconds": round(first_window_seconds, 3),
+        }
+        print(f"  {source:<13} load {load_seconds:7.3f}s  first window {first_window_seconds:7.3f}s", flush=True)
+
+    speedup = results[SOURCE_CHECKPOINT]["load_seconds"] / max(results[SOURCE_CACHE]["load_seconds"], 1e-3)
+    print(f"  weight cache loads {speedup:.1f}x faster than the checkpoint")
+    return results
+
+
+# (text, expected to be kept): backchannels recur but are real speech; loops are not
+REPETITION_CASES = [
+    ("Yeah.", True),
+    ("So the rogue sneaks up to the door and listens for the guards.", True),
+    ("Yeah.", True),
+    ("Okay.", True),
+    ("Roll for stealth, and add your dexterity modifier to the roll.", True),
+    ("Okay.", True),
+    ("Yeah.", True),
+    ("Roll for stealth, and add your dexterity modifier to the roll.", False),
+    ("Thank you.", True),
+    ("Thank you.", False),
+    ("Thank you.", False),
+]
+
+
+def check_repetition(window=8, threshold=0.8):
+    """
+    Run the repetition filter over a scripted exchange with repeated backchannels.
+
+    Short replies must survive anywhere in the window; immediate short repeats
+    and repeated long lines must be dropped.
+
+    Returns:
+        Dict with "expected_kept", "kept" and "passed"
+    """
+    from repetition import RepetitionDetector
+
+    segments = [{"start": float(i), "text": text} for i, (text, _) in enumerate(REPETITION_CASES)]
+    kept = RepetitionDetector(window=window, threshold=threshold).filter(segments, verbose=False)
+    kept_ids = [int(segment["start"]) for segment in kept]
+    expected = [i for i, (_, keep) in enumerate(REPETITION_CASES) if keep]
+
+    for i, (text, keep) in enumerate(REPETITION_CASES):
+        status = "kept   " if i in kept_ids else "dropped"
+        marker = "✅" if (i in kept_ids) == keep else "❌"
+        print(f"  {marker} {status} {text}")
+    return {"expected_kept": expected, "kept": kept_ids, "passed": kept_ids == expected}
+
+
+def main():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--model', default='small', help='Whisper model size')
+    common.add_argument('--input', help='Media file to benchmark on (default: synthetic audio)')
+    common.add_argument('--windows', type=int, default=8, help='30 s windows per pass')
+    common.add_argument('--batch-size', type=int, default=4, help='Windows per batch')
+    common.add_argument('--repeats', type=int, default=1, help='Timed passes per configuration')
+    common.add_argument('--json', help='Also write results to this JSON file')
+
+    parser = argparse.ArgumentParser(description='Transcription throughput benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    compile_parser = subparsers.add_parser('compile', parents=[common],
+                                           help='Eager vs compiled CPU inference')
+    compile_parser.add_argument('--precision', default='fp32', choices=['fp32', 'fp16'])
+    compile_parser.add_argument('--modes', nargs='+', default=['eager', 'trace', 'inductor'],
+                                choices=['eager', 'trace', 'inductor'])
+
+    engines_parser = subparsers.add_parser('engines', parents=[common],
+                                           help='openai-whisper vs ONNX Runtime on CPU')
+    engines_parser.add_argument('--engines', nargs='+', default=['openai', 'onnx'],
+                                choices=['openai', 'onnx'])
+
+    precision_parser = subparsers.add_parser('precision', parents=[common],
+                                             help='RTF and WER per CPU precision on a reference clip')
+    precision_parser.add_argument('--precisions', nargs='+', default=['fp32', 'int8'],
+                                  choices=['fp32', 'int8', 'bf16'])
+    precision_parser.add_argument('--language', default='en', help='Language of the clip')
+    precision_parser.add_argument('--reference', help='Text file with the correct transcript')
+
+    memory_parser = subparsers.add_parser('memory', parents=[common],
+                                          help='Peak memory of streaming transcription vs recording length')
+    memory_parser.add_argument('--minutes', type=float, nargs='+', default=[2, 20],
+                               help='Synthetic recording lengths to compare (default: 2 20)')
+    memory_parser.add_argument('--engine', default='openai', choices=['openai', 'onnx'])
+    memory_parser.add_argument('--tolerance', type=float, default=0.15,
+                               help='Allowed peak growth over the shortest recording (default: 0.15)')
+    memory_parser.add_argument('--whole-file', action='store_true',
+                               help='Also measure whole-file transcription for contrast')
+
+    packing_parser = subparsers.add_parser('packing', parents=[common],
+                                           help='Encoder windows with and without packed speech regions')
+    packing_parser.add_argument('--minutes', type=float, default=10,
+                                help='Length of the bursty synthetic recording (default: 10)')
+    packing_parser.add_argument('--engine', default='openai', choices=['openai', 'onnx'])
+
+    repetition_parser = subparsers.add_parser('repetition', parents=[common],
+                                              help='Repetition filter keeps backchannels and drops loops')
+    repetition_parser.add_argument('--repetition-window', type=int, default=8)
+    repetition_parser.add_argument('--repetition-threshold', type=float, default=0.8)
+
+    load_parser = subparsers.add_parser('load', parents=[common],
+                                        help='Model load time from the checkpoint vs the weight cache')
+    load_parser.add_argument('--precision', default='fp32', choices=['fp32', 'fp16'])
+
+    args = parser.parse_args()
+
+    print(f"🏁 Benchmark: {args.benchmark} ({args.model}, {torch.get_num_threads()} threads)")
+    if args.benchmark == 'compile':
+        audio = benchmark_audio(args.input, args.windows)
+        results = compare_compile(args.model, audio, args.batch_size, args.precision,
+                                  args.repeats, args.modes)
+    elif args.benchmark == 'engines':
+        audio = benchmark_audio(args.input, args.windows)
+        results = compare_engines(args.model, audio, args.batch_size, args.repeats, args.engines)
+    elif args.benchmark == 'precision':
+        audio = benchmark_audio(args.input, args.windows)
+        reference = None
+        if args.reference:
+            with open(args.reference, 'r', encoding='utf-8') as f:
+                reference = f.read()
+        results = compare_precisions(args.model, audio, tuple(args.precisions), args.language, reference)
+    elif args.benchmark == 'packing':
+        if args.input:
+            audio, speech_seconds = decode_audio(args.input), None
+        else:
+            audio, speech_seconds = bursty_audio(args.minutes * 60)
+        results = compare_packing(args.model, audio, speech_seconds, args.batch_size, args.engine)
+    elif args.benchmark == 'memory':
+        results = compare_memory(args.model, tuple(args.minutes), args.batch_size, args.engine,
+                                 args.tolerance, args.whole_file)
+    elif args.benchmark == 'repetition':
+        results = check_repetition(args.repetition_window, args.repetition_threshold)
+    elif args.benchmark == 'load':
+        results = compare_load(args.model, args.precision, args.repeats)
+
+    report = {
+        "benchmark": args.benchmark,
+        "model": args.model,
+        "torch": torch.__version__,
+        "threads": torch.get_num_threads(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results saved: {args.json}")
+    if args.benchmark == 'memory' and not results["within_ceiling"]:
+        return 1
+    if args.benchmark == 'repetition' and not results["passed"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Resumable transcription checkpoints.
+Completed segments and the audio offset reached are written to a sidecar file
+next to the transcript, so a crashed or killed run can pick up where it left off.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+CHECKPOINT_VERSION = 1
+
+
+def json_default(value):
+    """Serialise NumPy scalars that whisper leaves in segment dicts"""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TranscriptionCheckpoint:
+    """Sidecar checkpoint for one (input, output, settings) transcription"""
+
+    def __init__(self, output_path, input_path, settings):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            output_path: Transcript path; the checkpoint lives next to it
+            input_path: Media file being transcribed
+            settings: Dict of options that affect the output (model, engine, ...)
+        """
+        output_path = Path(output_path)
+        input_path = Path(input_path)
+        stat = input_path.stat()
+
+        self.path = output_path.with_name(output_path.name + ".checkpoint.json")
+        self.fingerprint = {
+            "version": CHECKPOINT_VERSION,
+            "input": str(input_path.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "settings": settings,
+        }
+
+    def load(self):
+        """
+        Load a matching checkpoint.
+
+        Returns:
+            (segments, offset_seconds, language) or None if there is no usable
+            checkpoint for this input and these settings
+        """
+        if not self.path.exists():
+            return None
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable checkpoint {self.path}: {e}", file=sys.stderr, flush=True)
+            return None
+
+        if state.get("fingerprint") != self.fingerprint:
+            print(f"⚠️  Checkpoint {self.path} is for a different input or settings; starting over",
+                  file=sys.stderr, flush=True)
+            return None
+
+        return state["segments"], state["offset"], state.get("language")
+
+    def save(self, segments, offset, language):
+        """Atomically write the completed segments and audio offset"""
+        state = {
+            "fingerprint": self.fingerprint,
+            "offset": offset,
+            "language": language,
+            "segments": segments,
+        }
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, default=json_default)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        """Delete the checkpoint once the transcript is saved"""
+        if self.path.exists():
+            self.path.unlink()
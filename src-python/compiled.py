@@ -0,0 +1,163 @@
+"""
+Compiled CPU inference for openai-whisper models.
+Two modes replace the eager modules on a loaded model:
+
+- "trace": the encoder is traced with TorchScript for the configured batch
+  shape and saved with torch.jit.save. The decoder stays eager, because its
+  KV cache is filled by forward hooks that tracing cannot capture.
+- "inductor": encoder and decoder go through torch.compile. Inductor's
+  compiled kernels are exported with torch.compiler.save_cache_artifacts and
+  loaded again on the next start, so only the first run pays for codegen.
+
+Artifacts are cached per (model, precision, shape, device, torch version).
+If compilation is unavailable or fails, the model is left eager.
+"""
+
+import atexit
+import os
+import re
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import torch
+import whisper
+from whisper.audio import N_FRAMES
+from whisper.decoding import DecodingOptions
+
+from transcript_cache import DEFAULT_CACHE_DIR
+
+COMPILE_MODES = ("trace", "inductor")
+
+DEFAULT_COMPILE_DIR = DEFAULT_CACHE_DIR / "compiled"
+
+_pending_artifacts = set()  # Inductor artifact files to refresh at exit
+
+
+def artifact_path(model_name, precision, mode, batch_size, device, cache_dir=DEFAULT_COMPILE_DIR):
+    """Cache file for one (model, precision, mode, batch shape, device, torch version)"""
+    version = re.sub(r"[^\w.]+", "_", torch.__version__)
+    suffix = ".pt" if mode == "trace" else ".bin"
+    name = f"{model_name}-{precision}-{mode}-b{batch_size}-{device}-torch{version}{suffix}"
+    return Path(cache_dir) / name
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class _TracedEncoder(torch.nn.Module):
+    """Runs the traced encoder for its traced batch shape and the eager one otherwise"""
+
+    def __init__(self, eager, traced, batch_size):
+        super().__init__()
+        self.eager = eager
+        self.traced = traced
+        self.batch_size = batch_size
+
+    def forward(self, x):
+        if x.shape[0] == self.batch_size and x.shape[-1] == N_FRAMES:
+            return self.traced(x)
+        return self.eager(x)
+
+
+def _example_mel(model, batch_size):
+    dtype = next(model.parameters()).dtype
+    return torch.zeros(batch_size, model.dims.n_mels, N_FRAMES, dtype=dtype, device=model.device)
+
+
+def _trace_encoder(model, path, batch_size):
+    """Load the traced encoder from the cache, tracing and saving it on a miss"""
+    with warnings.catch_warnings():
+        # TorchScript deprecation and tracer warnings; the encoder has no data-dependent branches
+        warnings.simplefilter("ignore")
+        if path.exists():
+            traced = torch.jit.load(str(path), map_location=model.device)
+            cached = True
+        else:
+            with torch.no_grad():
+                traced = torch.jit.trace(model.encoder, _example_mel(model, batch_size))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".tmp")
+            torch.jit.save(traced, str(tmp_path))
+            os.replace(tmp_path, path)
+            cached = False
+
+    model.encoder = _TracedEncoder(model.encoder, traced, batch_size)
+    return cached
+
+
+def _save_inductor_artifacts(path):
+    try:
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts is not None:
+            _write_atomic(path, artifacts[0])
+    except Exception as e:
+        print(f"⚠️  Could not save compiled artifacts: {e}", file=sys.stderr, flush=True)
+
+
+def _compile_inductor(model, path, batch_size):
+    """torch.compile encoder and decoder, warming up from cached artifacts when present"""
+    cached = path.exists()
+    if cached:
+        torch.compiler.load_cache_artifacts(path.read_bytes())
+
+    model.encoder = torch.compile(model.encoder)
+    model.decoder = torch.compile(model.decoder, dynamic=True)
+
+    # Compilation is lazy: run one window so failures surface here, not mid-transcript
+    fp16 = next(model.parameters()).dtype == torch.float16
+    with torch.no_grad():
+        features = model.embed_audio(_example_mel(model, batch_size))
+        whisper.decode(model, features[:1], DecodingOptions(language="en", fp16=fp16, sample_len=4))
+
+    _save_inductor_artifacts(path)
+    if path not in _pending_artifacts:
+        # Shapes first seen during transcription (beam widths, batch tails) are kept too
+        _pending_artifacts.add(path)
+        atexit.register(_save_inductor_artifacts, path)
+    return cached
+
+
+def compile_model(model, model_name, precision, mode, batch_size=1, cache_dir=DEFAULT_COMPILE_DIR):
+    """
+    Swap a loaded openai-whisper model's encoder/decoder for compiled versions.
+
+    Args:
+        model: Loaded openai-whisper model
+        model_name: Whisper model size (part of the artifact key)
+        precision: Weight precision (part of the artifact key)
+        mode: "trace" or "inductor"
+        batch_size: Windows per encoder batch the artifacts are built for
+        cache_dir: Directory holding compiled artifacts
+
+    Returns:
+        The model, compiled where possible and eager otherwise
+    """
+    if mode not in COMPILE_MODES:
+        raise ValueError(f"Unknown compile mode '{mode}' (choose from: {', '.join(COMPILE_MODES)})")
+
+    device = model.device.type
+    path = artifact_path(model_name, precision, mode, batch_size, device, cache_dir)
+    encoder, decoder = model.encoder, model.decoder
+    started = time.perf_counter()
+
+    try:
+        if mode == "trace":
+            cached = _trace_encoder(model, path, batch_size)
+        else:
+            cached = _compile_inductor(model, path, batch_size)
+    except Exception as e:
+        model.encoder, model.decoder = encoder, decoder
+        print(f"⚠️  Compilation unavailable ({mode}), using eager model: {e}", file=sys.stderr, flush=True)
+        return model
+
+    source = "cached artifacts" if cached else "fresh compile"
+    print(f"⚙️  Compiled model ({mode}, {source}) in {time.perf_counter() - started:.1f}s",
+          file=sys.stderr, flush=True)
+    return model
@@ -0,0 +1,46 @@
+"""
+CPU feature detection for reduced-precision inference.
+bfloat16 only pays off with native support: AVX512_BF16 dot-product
+instructions or AMX tile units (Sapphire Rapids and later Xeons). Without
+them oneDNN emulates bf16 and runs slower than FP32.
+"""
+
+import platform
+
+BF16_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+def cpu_flags():
+    """Instruction-set flags reported by the kernel (empty if unavailable)"""
+    try:
+        with open("/proc/cpuinfo", 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def bf16_support():
+    """
+    Report native bfloat16 support.
+
+    Returns:
+        Dict with 'avx512_bf16', 'amx_bf16' and 'native' (usable for bf16 inference)
+    """
+    flags = cpu_flags()
+    support = {flag: flag in flags for flag in BF16_FLAGS}
+
+    if flags:
+        support["native"] = any(support.values())
+    else:
+        # No /proc/cpuinfo (e.g. Windows): trust oneDNN's capability check
+        try:
+            import torch
+            support["native"] = bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+        except Exception:
+            support["native"] = False
+
+    support["cpu"] = platform.processor() or platform.machine()
+    return support
@@ -0,0 +1,451 @@
+"""
+Pluggable inference engines behind WhisperProcessor.
+Every engine returns openai-whisper shaped results ({'text', 'segments',
+'language'}) so repetition filtering and transcript writers work unchanged.
+"""
+
+import sys
+
+SAMPLE_RATE = 16000
+
+
+def _float_output(module, inputs, output):
+    """Forward hook returning a module's output in FP32"""
+    return output.float()
+
+
+class TranscriptionEngine:
+    """Base class for a Whisper inference backend"""
+
+    name = None
+    precisions = ()
+    beam_search = True  # Honours beam_size/best_of; otherwise decoding is always greedy
+    adaptive_decoding = False  # Supports greedy-first decoding with beam fallback
+    speculative_decoding = False  # Supports draft-model speculative decoding
+    compilable = False  # Model can be compiled with compiled.compile_model
+    streaming = False  # Supports constant-memory transcription of streamed windows
+    window_packing = False  # Supports several VAD speech regions packed into each 30 s window
+
+    def __init__(self, model_name, device, precision=None, cpu_threads=0):
+        """
+        Initialize the engine.
+
+        Args:
+            model_name: Whisper model size
+            device: Computing device ("cpu" or "cuda")
+            precision: Weight/compute precision (default depends on device)
+            cpu_threads: Intra-op CPU threads (0 = engine default)
+
+        Raises:
+            ValueError: If the precision is not supported by this engine
+        """
+        self.model_name = model_name
+        self.device = device
+        self.precision = precision or self.default_precision(device)
+        self.cpu_threads = cpu_threads
+
+        if self.precision not in self.precisions:
+            raise ValueError(
+                f"Engine '{self.name}' does not support precision '{self.precision}' "
+                f"(choose from: {', '.join(self.precisions)})"
+            )
+
+    def default_precision(self, device):
+        """Precision used when none is requested"""
+        raise NotImplementedError
+
+    def load(self):
+        """Load the model from disk and return it"""
+        raise NotImplementedError
+
+    def transcribe(self, model, audio, options, verbose=None, on_progress=None):
+        """
+        Transcribe audio with a loaded model.
+
+        Args:
+            model: Model returned by load()
+            audio: float32 waveform at 16 kHz, or a path
+            options: openai-whisper style decoding options
+            verbose: Print segments as they are decoded
+            on_progress: Optional callback(seconds) with the audio decoded so far
+
+        Returns:
+            Dict with 'text', 'segments' and 'language'
+        """
+        raise NotImplementedError
+
+    def transcribe_batched(self, model, audio, options, batch_size, verbose=None, adaptive=False,
+                           on_encoded=None, draft=None, draft_tokens=4, on_progress=None, mels=None):
+        """
+        Transcribe independent 30 s windows in batches.
+
+        Args:
+            model: Model returned by load()
+            audio: float32 waveform at 16 kHz
+            options: openai-whisper style decoding options (language should be set)
+            batch_size: Windows per batch
+            verbose: Print segments as they are decoded
+            adaptive: Decode greedily, re-running beam search only on failing
+                windows (engines with adaptive_decoding only)
+            on_encoded: Optional callback(start_sample, features) for each window's
+                encoder output (ignored by engines that do not expose it)
+            draft: Loaded draft model for speculative greedy decoding
+                (engines with speculative_decoding only)
+            draft_tokens: Tokens the draft proposes per target verification pass
+            on_progress: Optional callback(seconds) with the audio decoded so far
+            mels: Cached per-window log-mel features of `audio` (ignored by engines
+                that compute their own features)
+
+        Returns:
+            Dict with 'text', 'segments' and 'language'
+        """
+        raise NotImplementedError(f"Engine '{self.name}' does not support batched transcription")
+
+    def transcribe_stream(self, model, batches, options, batch_size, verbose=None, adaptive=False,
+                          draft=None, draft_tokens=4, on_progress=None):
+        """
+        Transcribe a recording delivered in bounded batches of 30 s windows.
+
+        Args:
+            model: Model returned by load()
+            batches: Iterable of (offset_samples, samples) from streaming.stream_batches
+            options: openai-whisper style decoding options (language should be set)
+            batch_size: Windows per batch
+            verbose: Print segments as they are decoded
+            adaptive: Greedy-first decoding with beam fallback (engines with adaptive_decoding only)
+            draft: Loaded draft model for speculative greedy decoding
+            draft_tokens: Tokens the draft proposes per target verification pass
+            on_progress: Optional callback(seconds) with the audio decoded so far
+
+        Returns:
+            Dict with 'text', 'segments' and 'language'
+        """
+        raise NotImplementedError(f"Engine '{self.name}' does not support streaming transcription")
+
+    def detect_language(self, model, audio):
+        """Detect the spoken language from the first 30 seconds of a waveform"""
+        raise NotImplementedError
+
+    def align_words(self, model, audio, segments, language, feature_cache=None, media_key=None, offset=0):
+        """
+        Add word-level timings to already transcribed segments.
+
+        Args:
+            model: Model returned by load()
+            audio: float32 waveform at 16 kHz
+            segments: Segment dicts to align, in time order
+            language: Transcript language code
+            feature_cache: EncoderFeatureCache to reuse encoder output from (optional)
+            media_key: Key of the media in the feature cache
+            offset: Sample position of audio[0] on the segments' timeline
+
+        Returns:
+            The aligned segments, each with a 'words' list
+        """
+        raise NotImplementedError(f"Engine '{self.name}' does not support deferred word alignment")
+
+
+class OpenAIWhisperEngine(TranscriptionEngine):
+    """Reference openai-whisper PyTorch backend"""
+
+    name = "openai"
+    precisions = ("fp32", "fp16", "int8", "bf16")
+    adaptive_decoding = True
+    speculative_decoding = True
+    compilable = True
+    streaming = True
+    window_packing = True
+
+    def __init__(self, model_name, device, precision=None, cpu_threads=0):
+        if precision in ("int8", "bf16") and device != "cpu":
+            # Dynamic quantization and bf16 autocast are CPU modes
+            print(f"⚠️  {precision} precision runs on the CPU", file=sys.stderr, flush=True)
+            device = "cpu"
+        if precision == "bf16":
+            from cpu_features import bf16_support
+
+            if not bf16_support()["native"]:
+                print("⚠️  CPU has no native bf16 (AVX512_BF16/AMX), using fp32", file=sys.stderr, flush=True)
+                precision = "fp32"
+        super().__init__(model_name, device, precision=precision, cpu_threads=cpu_threads)
+
+    @property
+    def weight_precision(self):
+        """Precision the weights are cached in; int8 and bf16 start from FP32 weights"""
+        return "fp32" if self.precision in ("int8", "bf16") else self.precision
+
+    def _autocast(self):
+        """CPU bf16 autocast for the bf16 mode; weights stay FP32"""
+        import contextlib
+
+        import torch
+
+        if self.precision == "bf16":
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return contextlib.nullcontext()
+
+    def default_precision(self, device):
+        return "fp16" if device == "cuda" else "fp32"
+
+    def load(self):
+        from weight_cache import load_model
+
+        # FP16 weights are converted once and cached, so no .half() pass per start
+        model, source = load_model(self.model_name, self.device, self.weight_precision)
+
+        if self.precision == "fp16":
+            # Optimize for RTX 5090
+            print(f"✅ Model loaded with FP16 optimization (from {source})")
+        elif self.precision == "int8":
+            from quantization import quantize_int8
+
+            model = quantize_int8(model)
+            print(f"✅ Model loaded with dynamic int8 quantization (from {source})")
+        elif self.precision == "bf16":
+            # whisper.decode expects FP32 audio features; autocast would leave them in bf16
+            model.encoder.register_forward_hook(_float_output)
+            print(f"✅ Model loaded with bf16 autocast (from {source})")
+        else:
+            print(f"✅ Model loaded (CPU mode, from {source})")
+
+        return model
+
+    def transcribe(self, model, audio, options, verbose=None, on_progress=None):
+        from progress import whisper_progress
+
+        options = dict(options, fp16=self.precision == "fp16")
+        with self._autocast(), whisper_progress(on_progress):
+            return model.transcribe(audio, **options, verbose=verbose)
+
+    def transcribe_batched(self, model, audio, options, batch_size, verbose=None, adaptive=False,
+                           on_encoded=None, draft=None, draft_tokens=4, on_progress=None, mels=None):
+        transcriber = self._transcriber(model, batch_size, adaptive, on_encoded, draft, draft_tokens, mels)
+        with self._autocast():
+            return transcriber.transcribe(audio, options, verbose=verbose, on_progress=on_progress)
+
+    def transcribe_stream(self, model, batches, options, batch_size, verbose=None, adaptive=False,
+                          draft=None, draft_tokens=4, on_progress=None):
+        transcriber = self._transcriber(model, batch_size, adaptive, None, draft, draft_tokens, None)
+        with self._autocast():
+            return transcriber.transcribe_stream(batches, options, verbose=verbose, on_progress=on_progress)
+
+    def _transcriber(self, model, batch_size, adaptive, on_encoded, draft, draft_tokens, mels):
+        """BatchedTranscriber for this precision, speculative when a draft model is given"""
+        from batched_decoder import BatchedTranscriber
+
+        fp16 = self.precision == "fp16"
+        if draft is not None:
+            from speculative import SpeculativeTranscriber
+
+            return SpeculativeTranscriber(
+                model, draft, draft_tokens=draft_tokens, batch_size=batch_size, fp16=fp16,
+                adaptive=adaptive, on_encoded=on_encoded, mels=mels
+            )
+        return BatchedTranscriber(
+            model, batch_size=batch_size, fp16=fp16, adaptive=adaptive, on_encoded=on_encoded, mels=mels
+        )
+
+    def detect_language(self, model, audio):
+        import whisper
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio), n_mels=model.dims.n_mels
+        ).to(model.device)
+        if self.precision == "fp16":
+            mel = mel.half()
+        with self._autocast():
+            _, probs = model.detect_language(mel)
+        return max(probs, key=probs.get)
+
+    def align_words(self, model, audio, segments, language, feature_cache=None, media_key=None, offset=0):
+        from whisper.tokenizer import get_tokenizer
+
+        from alignment import WordAligner
+
+        tokenizer = get_tokenizer(
+            model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe"
+        )
+        aligner = WordAligner(model, tokenizer, fp16=self.precision == "fp16",
+                              feature_cache=feature_cache, media_key=media_key)
+        with self._autocast():
+            return aligner.align(audio, segments, offset=offset)
+
+
+class FasterWhisperEngine(TranscriptionEngine):
+    """CTranslate2 backend via faster-whisper, with int8 inference"""
+
+    name = "faster-whisper"
+    precisions = ("int8", "int8_float16", "int8_float32", "float16", "float32")
+
+    # openai-whisper option name -> faster-whisper option name
+    OPTION_NAMES = {
+        "language": "language",
+        "task": "task",
+        "temperature": "temperature",
+        "compression_ratio_threshold": "compression_ratio_threshold",
+        "logprob_threshold": "log_prob_threshold",
+        "no_speech_threshold": "no_speech_threshold",
+        "condition_on_previous_text": "condition_on_previous_text",
+        "beam_size": "beam_size",
+        "best_of": "best_of",
+        "patience": "patience",
+        "word_timestamps": "word_timestamps",
+    }
+
+    def default_precision(self, device):
+        return "float16" if device == "cuda" else "int8"
+
+    def load(self):
+        from faster_whisper import WhisperModel
+
+        model = WhisperModel(
+            self.model_name,
+            device=self.device,
+            compute_type=self.precision,
+            cpu_threads=self.cpu_threads,
+        )
+        print(f"✅ Model loaded with CTranslate2 ({self.precision})")
+        return model
+
+    def transcribe(self, model, audio, options, verbose=None, on_progress=None):
+        kwargs = {
+            target: options[source]
+            for source, target in self.OPTION_NAMES.items()
+            if options.get(source) is not None
+        }
+        segments, info = model.transcribe(audio, **kwargs)
+        return self._collect(segments, info, verbose, on_progress)
+
+    def _collect(self, segments, info, verbose, on_progress=None):
+        """Drain a faster-whisper segment generator into a result dict"""
+        results = []
+        for segment in segments:  # Lazy generator: decoding happens here
+            result = self._segment_to_dict(segment)
+            results.append(result)
+            if verbose:
+                print(f"[{result['start']:.3f} --> {result['end']:.3f}] {result['text']}", flush=True)
+            if on_progress:
+                on_progress(result['end'])
+
+        return {
+            'text': "".join(segment['text'] for segment in results),
+            'segments': results,
+            'language': info.language,
+        }
+
+    def transcribe_batched(self, model, audio, options, batch_size, verbose=None, adaptive=False,
+                           on_encoded=None, draft=None, draft_tokens=4, on_progress=None, mels=None):
+        from faster_whisper import BatchedInferencePipeline
+
+        pipeline = BatchedInferencePipeline(model=model)
+        kwargs = {
+            target: options[source]
+            for source, target in self.OPTION_NAMES.items()
+            if options.get(source) is not None and source != "condition_on_previous_text"
+        }
+        segments, info = pipeline.transcribe(audio, batch_size=batch_size, **kwargs)
+        return self._collect(segments, info, verbose, on_progress)
+
+    def detect_language(self, model, audio):
+        # Language detection runs eagerly; the segment generator is never consumed
+        _, info = model.transcribe(audio[:30 * SAMPLE_RATE])
+        return info.language
+
+    @staticmethod
+    def _segment_to_dict(segment):
+        """Convert a faster-whisper Segment into an openai-whisper segment dict"""
+        return {
+            'id': segment.id,
+            'seek': segment.seek,
+            'start': segment.start,
+            'end': segment.end,
+            'text': segment.text,
+            'tokens': list(segment.tokens),
+            'temperature': segment.temperature,
+            'avg_logprob': segment.avg_logprob,
+            'compression_ratio': segment.compression_ratio,
+            'no_speech_prob': segment.no_speech_prob,
+            'words': [
+                {
+                    'word': word.word,
+                    'start': word.start,
+                    'end': word.end,
+                    'probability': word.probability,
+                }
+                for word in segment.words or []
+            ],
+        }
+
+
+class OnnxWhisperEngine(TranscriptionEngine):
+    """openai-whisper weights exported to ONNX and run with ONNX Runtime on CPU"""
+
+    name = "onnx"
+    precisions = ("fp32",)
+    beam_search = False
+    streaming = True
+    window_packing = True
+
+    def __init__(self, model_name, device, precision=None, cpu_threads=0):
+        if device != "cpu":
+            print("⚠️  The onnx engine runs on the CPU execution provider", file=sys.stderr, flush=True)
+        super().__init__(model_name, "cpu", precision=precision, cpu_threads=cpu_threads)
+
+    def default_precision(self, device):
+        return "fp32"
+
+    def load(self):
+        from onnx_engine import load_onnx_model
+
+        model = load_onnx_model(self.model_name, cpu_threads=self.cpu_threads)
+        print("✅ Model loaded with ONNX Runtime (CPU)")
+        return model
+
+    def transcribe(self, model, audio, options, verbose=None, on_progress=None):
+        if not hasattr(audio, "shape"):
+            from audio_io import decode_audio
+
+            audio = decode_audio(audio)
+        if options.get("language") is None:
+            options = dict(options, language=self.detect_language(model, audio))
+        return self.transcribe_batched(model, audio, options, 1, verbose=verbose, on_progress=on_progress)
+
+    def transcribe_batched(self, model, audio, options, batch_size, verbose=None, adaptive=False,
+                           on_encoded=None, draft=None, draft_tokens=4, on_progress=None, mels=None):
+        from onnx_engine import OnnxTranscriber
+
+        transcriber = OnnxTranscriber(model, batch_size=batch_size, mels=mels)
+        return transcriber.transcribe(audio, options, verbose=verbose, on_progress=on_progress)
+
+    def transcribe_stream(self, model, batches, options, batch_size, verbose=None, adaptive=False,
+                          draft=None, draft_tokens=4, on_progress=None):
+        from onnx_engine import OnnxTranscriber
+
+        transcriber = OnnxTranscriber(model, batch_size=batch_size)
+        return transcriber.transcribe_stream(batches, options, verbose=verbose, on_progress=on_progress)
+
+    def detect_language(self, model, audio):
+        return model.detect_language(audio)
+
+
+ENGINES = {
+    OpenAIWhisperEngine.name: OpenAIWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    OnnxWhisperEngine.name: OnnxWhisperEngine,
+}
+
+
+def create_engine(name, model_name, device, precision=None, cpu_threads=0):
+    """
+    Instantiate an engine by name.
+
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    try:
+        engine_class = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}' (choose from: {', '.join(ENGINES)})") from None
+
+    print(f"⚙️  Engine: {name}", file=sys.stderr, flush=True)
+    return engine_class(model_name, device, precision=precision, cpu_threads=cpu_threads)
@@ -26,14 +26,16 @@ def send_response(status, data=None, error=None):
     print(json.dumps(response), flush=True)
 
 
-def send_progress(stage, progress, message):
-    """Send progress update to frontend"""
+def send_progress(stage, progress, message, details=None):
+    """Send progress update to frontend (details: optional extra fields, e.g. ETA)"""
     response = {
         "type": "progress",
         "stage": stage,
         "progress": progress,
         "message": message
     }
+    if details:
+        response.update(details)
     print(json.dumps(response), flush=True)
 
 
@@ -50,6 +52,25 @@ def process_command(command):
             model = command.get("model", "medium")
             mode = command.get("mode", "local")  # "local" or "remote"
             whisper_host = command.get("whisper_host", "http://localhost:9000")
+            workers = command.get("workers", 1)  # >1 enables parallel CPU transcription
+            threads_per_worker = command.get("threads_per_worker")
+            engine = command.get("engine", "openai")  # "openai" or "faster-whisper"
+            precision = command.get("precision")  # e.g. "int8" for faster-whisper on CPU
+            batch_size = command.get("batch_size", 1)  # >1 batches 30 s windows
+            vad = command.get("vad", False)  # Skip silence before decoding
+            pack = command.get("pack", False)  # Several short speech regions per 30 s window
+            multitrack = command.get("multitrack", False)  # Transcribe each speaker track separately
+            audio_cache = command.get("audio_cache")  # Keep decoded audio on disk (default: WHISPER_AUDIO_CACHE)
+            adaptive = command.get("adaptive", False)  # Greedy first, beam only where needed
+            draft_model = command.get("draft_model")  # e.g. "tiny" for speculative decoding
+            compile_mode = command.get("compile")  # "trace" or "inductor"
+            checkpoint_interval = command.get("checkpoint_interval")  # Seconds between resumable checkpoints (opt-in)
+            use_cache = command.get("use_cache", True)  # Reuse transcripts of identical media
+            repetition_window = command.get("repetition_window", 8)  # Recent segments checked for loops
+            follow = command.get("follow", False)  # Tail a recording that is still being written
+            stream = command.get("stream", False)  # Constant-memory 30 s windows from FFmpeg
+            follow_idle_seconds = command.get("follow_idle_seconds", 15)
+            model_cache = None
 
             if not file_path:
                 send_response("error", error="File path is required")
@@ -73,34 +94,67 @@ def process_command(command):
                 print(f"Using remote Whisper server at {whisper_host}", file=sys.stderr, flush=True)
                 from remote_whisper_client import RemoteWhisperClient
 
-                send_progress("transcription", 0, "Connecting to remote Whisper server...")
-
                 client = RemoteWhisperClient(whisper_host=whisper_host)
 
-                # Check connection
-                if not client.check_connection():
-                    error_msg = f"Cannot connect to remote Whisper server at {whisper_host}. Server may be offline or unreachable."
-                    print(f"Connection check failed: {error_msg}", file=sys.stderr, flush=True)
-                    send_response("error", error=error_msg)
-                    return
+                # A cached transcript of these media bytes needs no server
+                cached_text = client.cached_transcript(str(file_path), model=model, language="en") if use_cache else None
+                if cached_text is not None:
+                    print(f"Served from transcript cache; remote server not contacted", file=sys.stderr, flush=True)
+                    result = client.save_transcript(cached_text, str(output_path))
+                else:
+                    send_progress("transcription", 0, "Connecting to remote Whisper server...")
+
+                    # Check connection
+                    if not client.check_connection():
+                        error_msg = f"Cannot connect to remote Whisper server at {whisper_host}. Server may be offline or unreachable."
+                        print(f"Connection check failed: {error_msg}", file=sys.stderr, flush=True)
+                        send_response("error", error=error_msg)
+                        return
 
-                print(f"Remote server connection successful", file=sys.stderr, flush=True)
-                send_progress("transcription", 15, f"Sending to remote server at {whisper_host}...")
+                    print(f"Remote server connection successful", file=sys.stderr, flush=True)
+                    send_progress("transcription", 15, f"Sending to remote server at {whisper_host}...")
 
-                # Transcribe using remote server
-                print(f"Calling remote transcribe_and_save...", file=sys.stderr, flush=True)
-                result = client.transcribe_and_save(str(file_path), str(output_path), model=model, language="en")
+                    # Transcribe using remote server
+                    print(f"Calling remote transcribe_and_save...", file=sys.stderr, flush=True)
+                    result = client.transcribe_and_save(str(file_path), str(output_path), model=model, language="en",
+                                                        use_cache=use_cache)
 
                 print(f"Remote transcribe result: {result}", file=sys.stderr, flush=True)
 
             else:
                 # Use local Whisper (original behavior)
                 print(f"Using local Whisper processor", file=sys.stderr, flush=True)
+                from audio_cache import AUDIO_CACHE_ENABLED
+                from progress import format_progress
                 from whisper_processor import WhisperProcessor
 
                 send_progress("transcription", 0, "Initializing Whisper processor...")
 
-                processor = WhisperProcessor(model_name=model)
+                def report_progress(event):
+                    # Decoding fills the 30-95% band; rate limited by the processor
+                    send_progress("transcription", 30 + int(65 * event["fraction"]),
+                                  format_progress(event), details=event)
+
+                processor = WhisperProcessor(
+                    model_name=model,
+                    workers=workers,
+                    threads_per_worker=threads_per_worker,
+                    engine=engine,
+                    precision=precision,
+                    batch_size=batch_size,
+                    vad=vad,
+                    checkpoint_interval=checkpoint_interval or None,
+                    use_cache=use_cache,
+                    repetition_window=repetition_window,
+                    adaptive=adaptive,
+                    draft_model=draft_model,
+                    compile_mode=compile_mode,
+                    stream=stream,
+                    pack=pack,
+                    multitrack=multitrack,
+                    audio_cache=AUDIO_CACHE_ENABLED if audio_cache is None else audio_cache,
+                    on_progress=None if follow else report_progress  # Follow mode reports per window
+                )
                 print(f"Processor initialized", file=sys.stderr, flush=True)
 
                 send_progress("transcription", 15, "Loading Whisper model (this may take a minute)...")
@@ -120,13 +174,30 @@ def process_command(command):
                     return
 
                 print(f"Model loaded successfully", file=sys.stderr, flush=True)
+
+                from model_registry import get_registry
+                model_cache = get_registry().stats()
+                print(f"Model cache: {model_cache['hits']} hits, {model_cache['misses']} misses", file=sys.stderr, flush=True)
                 send_progress("transcription", 30, f"Transcribing {Path(file_path).name}...")
 
                 print(f"Input: {input_path}", file=sys.stderr, flush=True)
 
-                # Transcribe the file
-                print(f"Calling transcribe_file...", file=sys.stderr, flush=True)
-                result = processor.transcribe_file(str(file_path), str(output_path))
+                if follow:
+                    # Live session: transcribe windows as the recording grows
+                    def report_window(offset, segments, final):
+                        stage = "Final pass" if final else "Live"
+                        send_progress("transcription", 95 if final else 50,
+                                      f"{stage}: transcribed {offset / 60:.1f} min ({len(segments)} new segments)")
+
+                    print(f"Calling transcribe_follow...", file=sys.stderr, flush=True)
+                    followed = processor.transcribe_follow(str(file_path), str(output_path),
+                                                           idle_seconds=follow_idle_seconds,
+                                                           on_window=report_window)
+                    result = str(output_path) if followed is not None else None
+                else:
+                    # Transcribe the file
+                    print(f"Calling transcribe_file...", file=sys.stderr, flush=True)
+                    result = processor.transcribe_file(str(file_path), str(output_path))
 
                 print(f"Transcribe result: {result}", file=sys.stderr, flush=True)
 
@@ -139,10 +210,13 @@ def process_command(command):
 
             if result:
                 send_progress("transcription", 100, "Transcription complete!")
-                send_response("success", data={
+                data = {
                     "transcript_path": str(result),
                     "message": "Transcription completed successfully"
-                })
+                }
+                if model_cache:
+                    data["model_cache"] = model_cache
+                send_response("success", data=data)
             else:
                 send_response("error", error="Transcription returned None - check terminal output for details")
 
@@ -161,6 +235,9 @@ def process_command(command):
             file_path = command.get("file")
             model = command.get("model", "gemma3n:latest")
             ollama_host = command.get("ollama_host", "http://localhost:11434")
+            start_time = command.get("start_time")  # Optional range in seconds
+            end_time = command.get("end_time")
+            time_range = (start_time or 0.0, end_time) if start_time is not None or end_time is not None else None
 
             if not file_path:
                 send_response("error", error="File path is required")
@@ -180,7 +257,8 @@ def process_command(command):
             output_path = input_path.parent / f"{base_name}_analysis.txt"
 
             # Analyze the transcript file
-            result = analyzer.analyze_transcript(str(file_path), model=model, output_path=str(output_path))
+            result = analyzer.analyze_transcript(str(file_path), model=model, output_path=str(output_path),
+                                                 time_range=time_range)
 
             if result:
                 send_progress("analysis", 100, "Analysis complete!")
@@ -237,6 +315,59 @@ def process_command(command):
         except Exception as e:
             send_response("error", error=str(e))
 
+    elif cmd_type == "model_cache_stats":
+        # Report which Whisper models are resident and how many loads were saved
+        try:
+            from model_registry import get_registry
+
+            send_response("success", data=get_registry().stats())
+        except Exception as e:
+            send_response("error", error=str(e))
+
+    elif cmd_type == "transcript_segments":
+        # Load one time range of a transcript from its segment store
+        try:
+            from segment_store import SegmentStore
+
+            file_path = command.get("file")
+            if not file_path:
+                send_response("error", error="File path is required")
+                return
+
+            with SegmentStore(file_path) as store:
+                segments = store.range(command.get("start_time", 0.0), command.get("end_time"))
+                send_response("success", data={"segments": segments, "duration": store.duration})
+        except FileNotFoundError:
+            send_response("error", error="No segment store for this transcript - transcribe it again to create one")
+        except Exception as e:
+            send_response("error", error=str(e))
+
+    elif cmd_type == "align_words":
+        # Word-level timings for one time range of a transcript, computed on demand
+        try:
+            from whisper_processor import WhisperProcessor
+
+            file_path = command.get("file")  # Transcript
+            media_path = command.get("media")
+            if not file_path or not media_path:
+                send_response("error", error="Transcript and media paths are required")
+                return
+
+            processor = WhisperProcessor(model_name=command.get("model", "medium"))
+            if not processor.load_model():
+                send_response("error", error="Failed to load Whisper model")
+                return
+
+            segments = processor.align_transcript(file_path, media_path,
+                                                  start=command.get("start_time", 0.0),
+                                                  end=command.get("end_time"))
+            if segments is None:
+                send_response("error", error="Word alignment failed - check terminal output for details")
+            else:
+                send_response("success", data={"segments": segments})
+        except Exception as e:
+            send_response("error", error=str(e))
+
     elif cmd_type == "check_whisper_health":
       # Check health of remote Whisper server
       try:
@@ -0,0 +1,224 @@
+"""
+Process-wide registry of loaded Whisper models.
+Keeps models resident between transcriptions under a RAM/VRAM budget and
+evicts the least-recently-used models when a new one would not fit. Room is
+made from a size estimate before the load, so the new model and the evicted
+ones are never held together.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+GB = 1024 ** 3
+
+# Resident budgets per device type, overridable from the environment
+DEFAULT_RAM_BUDGET = float(os.environ.get("WHISPER_RAM_BUDGET_GB", "8")) * GB
+DEFAULT_VRAM_BUDGET = float(os.environ.get("WHISPER_VRAM_BUDGET_GB", "12")) * GB
+
+# Approximate FP32 parameter size per checkpoint, used to make room before a
+# load and when a model cannot report its own size
+APPROX_MODEL_BYTES = {
+    "tiny": 0.15 * GB,
+    "base": 0.3 * GB,
+    "small": 1.0 * GB,
+    "medium": 3.0 * GB,
+    "large": 6.2 * GB,
+    "large-v1": 6.2 * GB,
+    "large-v2": 6.2 * GB,
+    "large-v3": 6.2 * GB,
+    "large-v3-turbo": 3.2 * GB,
+    "turbo": 3.2 * GB,
+}
+
+# Bytes per parameter relative to FP32
+PRECISION_SCALE = {
+    "fp32": 1.0,
+    "fp16": 0.5,
+    "float32": 1.0,
+    "float16": 0.5,
+    "int8": 0.25,
+    "int8_float16": 0.25,
+}
+
+
+def _device_type(device):
+    """Map a device string like 'cuda:0' onto its budget bucket"""
+    return "cuda" if str(device).startswith("cuda") else "cpu"
+
+
+def approx_model_bytes(model_name, precision):
+    """Expected resident size of a model that is not loaded yet, from its name and precision"""
+    base = APPROX_MODEL_BYTES.get(model_name.removesuffix(".en"), APPROX_MODEL_BYTES["medium"])
+    return int(base * PRECISION_SCALE.get(precision, 1.0))
+
+
+def estimate_model_bytes(model, model_name, precision):
+    """Estimate how much memory a loaded model keeps resident"""
+    parameters = getattr(model, "parameters", None)
+    if callable(parameters):
+        try:
+            size = sum(p.numel() * p.element_size() for p in parameters())
+            # Dynamically quantized Linear layers keep their int8 weights outside parameters()
+            for module in model.modules():
+                if hasattr(module, "_packed_params") and callable(getattr(module, "weight", None)):
+                    weight = module.weight()
+                    size += weight.numel() * weight.element_size()
+            return size
+        except Exception:
+            pass
+
+    return approx_model_bytes(model_name, precision)
+
+
+class _Entry:
+    """A resident model and its accounting"""
+
+    def __init__(self, model, size, load_seconds):
+        self.model = model
+        self.size = size
+        self.load_seconds = load_seconds
+
+
+class ModelRegistry:
+    """LRU cache of loaded models keyed by (engine, model_name, device, precision)"""
+
+    def __init__(self, ram_budget=DEFAULT_RAM_BUDGET, vram_budget=DEFAULT_VRAM_BUDGET):
+        """
+        Initialize the registry.
+
+        Args:
+            ram_budget: Bytes of CPU-resident models to keep loaded
+            vram_budget: Bytes of GPU-resident models to keep loaded
+        """
+        self.budgets = {"cpu": ram_budget, "cuda": vram_budget}
+        self._models = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name, device, precision, loader, engine="openai"):
+        """
+        Return a resident model, loading it with `loader()` on a miss.
+
+        Args:
+            model_name: Whisper model size
+            device: Device the model lives on
+            precision: Weight precision (e.g. fp32, fp16, int8)
+            loader: Zero-argument callable that loads the model
+            engine: Inference engine the model belongs to
+
+        Returns:
+            The loaded model object
+        """
+        key = (engine, model_name, str(device), precision)
+
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                print(f"♻️  Reusing resident model: {model_name} ({engine}, {device}, {precision})",
+                      file=sys.stderr, flush=True)
+                return entry.model
+
+            self.misses += 1
+            # Evict before loading: the new model and the evicted ones must not be resident together
+            self._make_room(_device_type(device), approx_model_bytes(model_name, precision))
+            started = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - started
+            print(f"⏱️  Loaded {model_name} in {load_seconds:.2f}s", file=sys.stderr, flush=True)
+
+            # The measured size can exceed the estimate
+            size = estimate_model_bytes(model, model_name, precision)
+            self._make_room(_device_type(device), size)
+            self._models[key] = _Entry(model, size, load_seconds)
+            return model
+
+    def _make_room(self, device_type, size):
+        """Evict least-recently-used models on a device until `size` fits"""
+        budget = self.budgets[device_type]
+        if size > budget:
+            print(f"⚠️  Model needs {size / GB:.1f} GB, over the {budget / GB:.1f} GB "
+                  f"{device_type} budget", file=sys.stderr, flush=True)
+
+        for key in list(self._models):
+            if self.resident_bytes(device_type) + size <= budget:
+                break
+            if _device_type(key[2]) == device_type:
+                self.evict(key)
+
+    def resident_bytes(self, device_type=None):
+        """Total bytes held by resident models, optionally for one device type"""
+        with self._lock:
+            return sum(
+                entry.size for key, entry in self._models.items()
+                if device_type is None or _device_type(key[2]) == device_type
+            )
+
+    def evict(self, key):
+        """Drop a model from the registry and release its memory"""
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if entry is None:
+                return False
+
+            self.evictions += 1
+            print(f"🗑️  Evicted model: {key[1]} ({key[0]}, {key[2]}, {key[3]})", file=sys.stderr, flush=True)
+
+        del entry
+        if _device_type(key[2]) == "cuda":
+            try:
+                import torch
+                torch.cuda.empty_cache()
+            except Exception:
+                pass
+        return True
+
+    def clear(self):
+        """Evict every resident model"""
+        with self._lock:
+            for key in list(self._models):
+                self.evict(key)
+
+    def stats(self):
+        """Return hit/miss counters and what is currently resident"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "resident": [
+                    {
+                        "engine": key[0],
+                        "model": key[1],
+                        "device": key[2],
+                        "precision": key[3],
+                        "size_mb": round(entry.size / 1024 ** 2, 1),
+                        "load_seconds": round(entry.load_seconds, 3),
+                    }
+                    for key, entry in self._models.items()
+                ],
+                "resident_mb": round(self.resident_bytes() / 1024 ** 2, 1),
+                "budget_mb": {
+                    device_type: round(budget / 1024 ** 2, 1)
+                    for device_type, budget in self.budgets.items()
+                },
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Return the process-wide model registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
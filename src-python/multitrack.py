@@ -0,0 +1,172 @@
+"""
+Per-track transcription of multi-track session recordings.
+When every speaker has their own track (a multi-stream MKV, or a ZIP of one
+FLAC per player), downmixing to mono throws that separation away and leaves
+the model a dense mix. Here each track is decoded on its own, its silence is
+skipped with the VAD pre-pass, and the tracks are transcribed in parallel.
+The segments are then merged into one time-ordered transcript labelled by
+track. Sparse per-speaker tracks are mostly silence, so this is far cheaper
+than transcribing the mix.
+"""
+
+import multiprocessing
+import os
+import sys
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from audio_io import SAMPLE_RATE, decode_audio, probe_audio_streams
+from file_handler import AUDIO_EXTENSIONS
+from parallel_transcribe import stitch_segments
+
+# Per-process state set up by _init_worker
+_worker_processor = None
+
+
+def list_tracks(media_path, extract_dir=None):
+    """
+    The speaker tracks of a recording.
+
+    Args:
+        media_path: Multi-stream media file, or a ZIP archive of per-speaker audio files
+        extract_dir: Directory ZIP members are extracted to (required for ZIP input)
+
+    Returns:
+        List of dicts with 'label', 'path' and 'stream' (audio stream index within
+        'path', or None for a single-track file)
+    """
+    media_path = Path(media_path)
+    if zipfile.is_zipfile(media_path):
+        if extract_dir is None:
+            raise ValueError("extract_dir is required for ZIP input")
+        tracks = []
+        with zipfile.ZipFile(media_path) as archive:
+            for name in sorted(archive.namelist()):
+                member = Path(name)
+                if name.endswith("/") or member.name.startswith(".") or \
+                        member.suffix.lower() not in AUDIO_EXTENSIONS:
+                    continue
+                tracks.append({'label': member.stem, 'path': Path(archive.extract(name, extract_dir)),
+                               'stream': None})
+        return tracks
+
+    streams = probe_audio_streams(media_path)
+    return [
+        {'label': stream['title'] or f"Track {stream['index'] + 1}", 'path': media_path,
+         'stream': stream['index'] if len(streams) > 1 else None}
+        for stream in streams
+    ]
+
+
+def _decode_track(processor, track):
+    """Waveform of one track; whole files go through the processor's audio cache"""
+    if track['stream'] is None:
+        return processor.decode_media(track['path'])
+    return decode_audio(track['path'], track=track['stream'])
+
+
+def _transcribe_track(processor, track, language=None):
+    """
+    Decode and transcribe one track.
+
+    Returns:
+        (segments labelled with the track, language, VAD report, track seconds)
+    """
+    audio = _decode_track(processor, track)
+    print(f"🎚️  {track['label']}: {len(audio) / SAMPLE_RATE:.1f}s of audio", file=sys.stderr, flush=True)
+    result = processor.transcribe(audio, language=language)
+    if result is None:
+        raise RuntimeError(f"Transcription of track '{track['label']}' failed")
+
+    segments = result.get('segments', [])
+    for segment in segments:
+        segment['track'] = track['label']
+    return segments, result.get('language'), result.get('vad'), len(audio) / SAMPLE_RATE
+
+
+def _init_worker(processor_kwargs, threads):
+    """Load the model once per worker process"""
+    global _worker_processor
+
+    import torch
+    torch.set_num_threads(threads)
+
+    from whisper_processor import WhisperProcessor
+    _worker_processor = WhisperProcessor(device="cpu", use_cache=False, **processor_kwargs)
+    _worker_processor.engine.cpu_threads = threads
+    if not _worker_processor.load_model():
+        raise RuntimeError(f"Worker {os.getpid()} failed to load model {processor_kwargs.get('model_name')}")
+
+
+def _transcribe_track_worker(track, language):
+    return _transcribe_track(_worker_processor, track, language)
+
+
+def transcribe_tracks(processor, tracks, language=None, workers=1, threads_per_worker=None,
+                      worker_settings=None, on_progress=None):
+    """
+    Transcribe speaker tracks and merge them into one labelled transcript.
+
+    With several workers each track is transcribed in its own CPU process
+    (holding its own copy of the model); otherwise the tracks run one after
+    another on `processor`, which may be on the GPU.
+
+    Args:
+        processor: Loaded WhisperProcessor with VAD enabled
+        tracks: Tracks from list_tracks()
+        language: Force language (None to detect per track)
+        workers: Worker processes for parallel tracks (1 = in this process)
+        threads_per_worker: Torch intra-op threads per worker (default: cores / workers)
+        worker_settings: WhisperProcessor keyword arguments for the worker processes
+        on_progress: Optional callback(seconds) with the audio of all finished tracks
+
+    Returns:
+        Whisper-style result dict with 'text', 'segments' (each with 'track'),
+        'language' and a per-track 'tracks' report
+    """
+    segments = []
+    languages = []
+    reports = {}
+    finished_seconds = 0.0
+
+    def collect(track, track_segments, track_language, vad_report, seconds):
+        nonlocal finished_seconds
+        segments.extend(track_segments)
+        if track_language:
+            languages.append(track_language)
+        reports[track['label']] = {'segments': len(track_segments), 'vad': vad_report}
+        finished_seconds += seconds
+        if on_progress:
+            on_progress(finished_seconds)
+
+    workers = max(1, min(workers, len(tracks)))
+    if workers > 1:
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        print(f"🎚️  Multi-track transcription: {len(tracks)} tracks across {workers} workers "
+              f"({threads_per_worker} threads each)")
+        # Spawn so workers never inherit an initialised OpenMP/CUDA runtime
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(worker_settings or {}, threads_per_worker)) as pool:
+            futures = {pool.submit(_transcribe_track_worker, track, language): track for track in tracks}
+            for done, future in enumerate(as_completed(futures), start=1):
+                track = futures[future]
+                collect(track, *future.result())
+                print(f"✅ Track {done}/{len(tracks)} done ({track['label']})", file=sys.stderr, flush=True)
+    else:
+        print(f"🎚️  Multi-track transcription: {len(tracks)} tracks")
+        for track in tracks:
+            processor.media_offset = finished_seconds  # Progress continues after the finished tracks
+            collect(track, *_transcribe_track(processor, track, language))
+        processor.media_offset = 0.0
+
+    segments = stitch_segments(segments)
+    return {
+        'text': "".join(segment['text'] for segment in segments),
+        'segments': segments,
+        'language': language or (Counter(languages).most_common(1)[0][0] if languages else None),
+        'tracks': reports,
+    }
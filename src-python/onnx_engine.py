@@ -0,0 +1,374 @@
+"""
+ONNX Runtime backend for Whisper on CPU.
+The openai-whisper model is exported once per model size into two graphs:
+
+- encoder.onnx: log-mel windows -> per-layer cross-attention keys/values
+- decoder.onnx: one decoder step over new tokens, taking and returning the
+  self-attention KV cache as explicit tensors
+
+The graphs are cached on disk and run with ONNX Runtime's CPU execution
+provider. Decoding is greedy with the same logit filters as whisper.decode,
+and windows go through BatchedTranscriber, so segments come out in the same
+format as the openai engine.
+"""
+
+import json
+import os
+import re
+import shutil
+import sys
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from whisper.decoding import DecodingOptions, DecodingResult, DecodingTask
+from whisper.utils import compression_ratio
+
+from batched_decoder import BatchedTranscriber, window_mels
+from transcript_cache import DEFAULT_CACHE_DIR
+
+EXPORT_VERSION = 1
+OPSET_VERSION = 17
+
+DEFAULT_ONNX_DIR = DEFAULT_CACHE_DIR / "onnx"
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "defaults.json"
+
+# Runtime settings used when config/defaults.json has no whisper.onnx section
+DEFAULT_RUNTIME_CONFIG = {
+    "graphOptimizationLevel": "all",
+    "intraOpThreads": 0,
+    "interOpThreads": 1,
+    "executionMode": "sequential",
+}
+
+
+def runtime_config(config_path=CONFIG_PATH):
+    """ONNX Runtime settings from the whisper.onnx section of the app config"""
+    config = dict(DEFAULT_RUNTIME_CONFIG)
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config.update(json.load(f).get("whisper", {}).get("onnx", {}))
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def export_dir(model_name, cache_dir=DEFAULT_ONNX_DIR):
+    """Directory holding the exported graphs for one model size and torch version"""
+    version = re.sub(r"[^\w.]+", "_", torch.__version__)
+    return Path(cache_dir) / f"{model_name}-opset{OPSET_VERSION}-torch{version}"
+
+
+def _attention(q, k, v, n_head, mask=None):
+    """Whisper's multi-head attention core, written out so it exports with a KV cache"""
+    scale = (q.shape[-1] // n_head) ** -0.25
+    q = q.reshape(q.shape[0], q.shape[1], n_head, -1).permute(0, 2, 1, 3) * scale
+    k = k.reshape(k.shape[0], k.shape[1], n_head, -1).permute(0, 2, 3, 1) * scale
+    v = v.reshape(v.shape[0], v.shape[1], n_head, -1).permute(0, 2, 1, 3)
+
+    qk = q @ k
+    if mask is not None:
+        qk = qk + mask
+    w = F.softmax(qk.float(), dim=-1).to(q.dtype)
+    return (w @ v).permute(0, 2, 1, 3).flatten(start_dim=2)
+
+
+class _EncoderGraph(torch.nn.Module):
+    """Encoder plus every decoder layer's cross-attention key/value projection"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.encoder = model.encoder
+        self.blocks = model.decoder.blocks
+
+    def forward(self, mel):
+        features = self.encoder(mel)
+        cross_k = torch.stack([block.cross_attn.key(features) for block in self.blocks])
+        cross_v = torch.stack([block.cross_attn.value(features) for block in self.blocks])
+        return cross_k, cross_v
+
+
+class _DecoderGraph(torch.nn.Module):
+    """One decoder step with the self-attention cache passed in and out explicitly"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.decoder = model.decoder
+
+    def forward(self, tokens, positions, mask, self_k, self_v, cross_k, cross_v):
+        decoder = self.decoder
+        x = decoder.token_embedding(tokens) + decoder.positional_embedding[positions]
+
+        new_k, new_v = [], []
+        for i, block in enumerate(decoder.blocks):
+            n_head = block.attn.n_head
+            h = block.attn_ln(x)
+            k = torch.cat([self_k[i], block.attn.key(h)], dim=1)
+            v = torch.cat([self_v[i], block.attn.value(h)], dim=1)
+            new_k.append(k)
+            new_v.append(v)
+            x = x + block.attn.out(_attention(block.attn.query(h), k, v, n_head, mask))
+
+            h = block.cross_attn_ln(x)
+            x = x + block.cross_attn.out(_attention(block.cross_attn.query(h), cross_k[i], cross_v[i], n_head))
+            x = x + block.mlp(block.mlp_ln(x))
+
+        x = decoder.ln(x)
+        logits = x @ decoder.token_embedding.weight.transpose(0, 1)
+        return logits, torch.stack(new_k), torch.stack(new_v)
+
+
+def export_model(model_name, cache_dir=DEFAULT_ONNX_DIR):
+    """
+    Export an openai-whisper model to ONNX (once per model size).
+
+    Args:
+        model_name: Whisper model size
+        cache_dir: Root of the ONNX export cache
+
+    Returns:
+        Path to the export directory
+    """
+    from weight_cache import load_model
+
+    target = export_dir(model_name, cache_dir)
+    if (target / "meta.json").exists():
+        return target
+
+    print(f"📤 Exporting {model_name} to ONNX (one-time)...", file=sys.stderr, flush=True)
+    model, _ = load_model(model_name, "cpu", "fp32")
+    model.eval()
+    dims = model.dims
+
+    tmp_dir = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    mel = torch.zeros(1, dims.n_mels, 2 * dims.n_audio_ctx)
+    layers, state = dims.n_text_layer, dims.n_text_state
+    cross = torch.zeros(layers, 1, dims.n_audio_ctx, state)
+    past = torch.zeros(layers, 1, 1, state)
+    tokens = torch.zeros(1, 2, dtype=torch.long)
+
+    with torch.no_grad(), warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # Tracer warnings for whisper's static shape asserts
+        torch.onnx.export(
+            _EncoderGraph(model), (mel,), str(tmp_dir / "encoder.onnx"),
+            input_names=["mel"], output_names=["cross_k", "cross_v"],
+            dynamic_axes={"mel": {0: "batch"}, "cross_k": {1: "batch"}, "cross_v": {1: "batch"}},
+            opset_version=OPSET_VERSION, dynamo=False,
+        )
+        torch.onnx.export(
+            _DecoderGraph(model),
+            (tokens, torch.arange(1, 3), torch.zeros(2, 3), past, past, cross, cross),
+            str(tmp_dir / "decoder.onnx"),
+            input_names=["tokens", "positions", "mask", "self_k", "self_v", "cross_k", "cross_v"],
+            output_names=["logits", "new_self_k", "new_self_v"],
+            dynamic_axes={
+                "tokens": {0: "batch", 1: "tokens"},
+                "positions": {0: "tokens"},
+                "mask": {0: "tokens", 1: "context"},
+                "self_k": {1: "batch", 2: "past"},
+                "self_v": {1: "batch", 2: "past"},
+                "cross_k": {1: "batch"},
+                "cross_v": {1: "batch"},
+                "logits": {0: "batch", 1: "tokens"},
+                "new_self_k": {1: "batch", 2: "context"},
+                "new_self_v": {1: "batch", 2: "context"},
+            },
+            opset_version=OPSET_VERSION, dynamo=False,
+        )
+
+    meta = {
+        "version": EXPORT_VERSION,
+        "model": model_name,
+        "dims": vars(dims),
+        "is_multilingual": model.is_multilingual,
+        "num_languages": model.num_languages,
+    }
+    with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+    print(f"💾 ONNX graphs cached: {target}", file=sys.stderr, flush=True)
+    return target
+
+
+def _session_options(config, cpu_threads=0):
+    import onnxruntime as ort
+
+    levels = {
+        "disabled": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    options = ort.SessionOptions()
+    options.graph_optimization_level = levels[config["graphOptimizationLevel"]]
+    options.intra_op_num_threads = cpu_threads or int(config["intraOpThreads"])
+    options.inter_op_num_threads = int(config["interOpThreads"])
+    options.execution_mode = (
+        ort.ExecutionMode.ORT_PARALLEL if config["executionMode"] == "parallel"
+        else ort.ExecutionMode.ORT_SEQUENTIAL
+    )
+    return options
+
+
+class OnnxWhisperModel:
+    """ONNX Runtime sessions for one exported model, with the metadata whisper's helpers read"""
+
+    device = torch.device("cpu")
+
+    # DecodingTask reads decoder.blocks to set up a PyTorch KV cache, which is unused here
+    decoder = SimpleNamespace(blocks=())
+
+    def __init__(self, path, cpu_threads=0, config=None):
+        import onnxruntime as ort
+
+        with open(Path(path) / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        from whisper.model import ModelDimensions
+
+        self.dims = ModelDimensions(**meta["dims"])
+        self.is_multilingual = meta["is_multilingual"]
+        self.num_languages = meta["num_languages"]
+
+        options = _session_options(config or runtime_config(), cpu_threads)
+        providers = ["CPUExecutionProvider"]
+        self.encoder = ort.InferenceSession(str(Path(path) / "encoder.onnx"), options, providers=providers)
+        self.decoder_session = ort.InferenceSession(str(Path(path) / "decoder.onnx"), options, providers=providers)
+
+    def encode(self, mel):
+        """Run the encoder; returns (cross_k, cross_v) for the batch of windows"""
+        return self.encoder.run(None, {"mel": np.ascontiguousarray(mel, dtype=np.float32)})
+
+    def empty_cache(self, batch=1):
+        shape = (self.dims.n_text_layer, batch, 0, self.dims.n_text_state)
+        return np.zeros(shape, dtype=np.float32), np.zeros(shape, dtype=np.float32)
+
+    def step(self, tokens, past_k, past_v, cross_k, cross_v):
+        """
+        Run the decoder on new tokens after the cached positions.
+
+        Returns:
+            (logits of shape (batch, n_new, n_vocab), new_self_k, new_self_v)
+        """
+        offset = past_k.shape[2]
+        n_new = len(tokens[0])
+        mask = np.triu(np.full((n_new, offset + n_new), -np.inf, dtype=np.float32), k=offset + 1)
+        return self.decoder_session.run(None, {
+            "tokens": np.asarray(tokens, dtype=np.int64),
+            "positions": np.arange(offset, offset + n_new, dtype=np.int64),
+            "mask": mask,
+            "self_k": past_k,
+            "self_v": past_v,
+            "cross_k": cross_k,
+            "cross_v": cross_v,
+        })
+
+    def detect_language(self, audio):
+        """Most likely language code for the first 30 s of a waveform"""
+        from whisper.tokenizer import get_tokenizer
+
+        tokenizer = get_tokenizer(self.is_multilingual, num_languages=self.num_languages)
+        if not self.is_multilingual:
+            return "en"
+
+        cross_k, cross_v = self.encode(window_mels(self, audio, [0]).numpy())
+        logits, _, _ = self.step([[tokenizer.sot]], *self.empty_cache(), cross_k, cross_v)
+        language_tokens = list(tokenizer.all_language_tokens)
+        best = language_tokens[int(np.argmax(logits[0, -1, language_tokens]))]
+        return tokenizer.decode([best]).strip("<|>")
+
+
+def load_onnx_model(model_name, cpu_threads=0, cache_dir=DEFAULT_ONNX_DIR):
+    """Export the model if needed and open ONNX Runtime sessions for it"""
+    return OnnxWhisperModel(export_model(model_name, cache_dir), cpu_threads=cpu_threads)
+
+
+def greedy_decode(model, cross_k, cross_v, options):
+    """
+    Greedy-decode one window with ONNX Runtime.
+
+    Args:
+        model: OnnxWhisperModel
+        cross_k, cross_v: Encoder outputs for this window (batch of 1)
+        options: DecodingOptions (temperature 0; beam settings are ignored)
+
+    Returns:
+        DecodingResult in whisper.decode's format
+    """
+    options = DecodingOptions(task=options.task, language=options.language, temperature=0.0, fp16=False)
+    task = DecodingTask(model, options)
+    tokenizer = task.tokenizer
+    eot = tokenizer.eot
+
+    tokens = list(task.initial_tokens)
+    past_k, past_v = model.empty_cache()
+    new_tokens = tokens
+    sum_logprob = 0.0
+    no_speech_prob = float("nan")
+
+    while len(tokens) - task.sample_begin < task.sample_len:
+        logits, past_k, past_v = model.step([new_tokens], past_k, past_v, cross_k, cross_v)
+        logits = torch.from_numpy(logits[0])
+        if len(new_tokens) > 1:
+            no_speech_prob = logits[task.sot_index].softmax(-1)[tokenizer.no_speech].item()
+
+        last = logits[-1:].clone()
+        for logit_filter in task.logit_filters:
+            logit_filter.apply(last, torch.tensor([tokens]))
+        token = int(last[0].argmax())
+        sum_logprob += F.log_softmax(last[0], dim=-1)[token].item()
+        tokens.append(token)
+        new_tokens = [token]
+        if token == eot:
+            break
+
+    text_tokens = [token for token in tokens[task.sample_begin:] if token != eot]
+    text = tokenizer.decode(text_tokens).strip()
+    return DecodingResult(
+        audio_features=None,
+        language=options.language,
+        tokens=text_tokens,
+        text=text,
+        avg_logprob=sum_logprob / (len(text_tokens) + 1),
+        no_speech_prob=no_speech_prob,
+        temperature=0.0,
+        compression_ratio=compression_ratio(text),
+    )
+
+
+class OnnxTranscriber(BatchedTranscriber):
+    """BatchedTranscriber running the exported graphs in ONNX Runtime"""
+
+    greedy_only = True
+
+    def __init__(self, model, batch_size=1, mels=None):
+        super().__init__(model, batch_size=batch_size, mels=mels)
+        self._warned_words = False
+        self._warned_beam = False
+
+    def decode_windows(self, audio, starts, options):
+        if options.get("beam_size") and not self._warned_beam:
+            print(f"⚠️  The onnx engine decodes greedily; beam_size {options['beam_size']} is ignored",
+                  file=sys.stderr, flush=True)
+            self._warned_beam = True
+        cross_k, cross_v = self.model.encode(window_mels(self.model, audio, starts, cached=self.mels).numpy())
+        decode_options = DecodingOptions(task=options.get("task", "transcribe"), language=options.get("language"))
+        results = [
+            greedy_decode(self.model, cross_k[:, i:i + 1], cross_v[:, i:i + 1], decode_options)
+            for i in range(len(starts))
+        ]
+        self.windows_decoded += len(starts)
+        return [None] * len(starts), results
+
+    def add_word_timestamps(self, segments, tokenizer, features, start, num_samples):
+        if not self._warned_words:
+            print("⚠️  Word timestamps are not available with the onnx engine", file=sys.stderr, flush=True)
+            self._warned_words = True
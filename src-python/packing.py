@@ -0,0 +1,156 @@
+"""
+Packing of short speech regions into shared 30 s encoder windows.
+Whisper encodes a full 30 s window however little speech it holds, so bursty
+audio (short interjections between long pauses) is mostly padding. Here the
+VAD regions are laid into windows in time order, several per window with a
+short silent gap between them, and no region crosses a window boundary. The
+segments decoded from each window are then split back onto the regions they
+came from.
+"""
+
+import numpy as np
+from whisper.audio import N_SAMPLES
+
+from vad import SAMPLE_RATE, SpeechMap, detect_speech, find_quiet_point
+
+PACK_GAP_SECONDS = 1.0  # Long enough for Whisper to end a segment between regions
+SPLIT_SEARCH_SECONDS = 10.0  # How far back from a window's end a long region may be cut
+
+
+def split_long_regions(audio, regions, max_samples=N_SAMPLES, sample_rate=SAMPLE_RATE):
+    """
+    Cut regions longer than one window at their quietest point.
+
+    Args:
+        audio: float32 waveform the regions refer to
+        regions: (start_sample, end_sample) speech regions in time order
+        max_samples: Longest piece allowed
+
+    Returns:
+        List of (start_sample, end_sample) pieces, none longer than max_samples
+    """
+    search = int(min(SPLIT_SEARCH_SECONDS * sample_rate, max_samples // 2))
+    pieces = []
+    for start, end in regions:
+        while end - start > max_samples:
+            cut = find_quiet_point(audio, start + max_samples - search, start + max_samples, sample_rate)
+            cut = min(max(cut, start + 1), start + max_samples)
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+    return pieces
+
+
+def pack_regions(lengths, gap, window_samples=N_SAMPLES):
+    """
+    Lay regions into fixed-size windows in time order (next fit).
+
+    Args:
+        lengths: Sample count of each region, none longer than window_samples
+        gap: Silent samples between neighbouring regions in a window
+        window_samples: Window size
+
+    Returns:
+        (packed start of each region on the windowed timeline, window count)
+    """
+    starts = np.zeros(len(lengths), dtype=np.int64)
+    window = 0
+    fill = 0
+    for i, length in enumerate(lengths):
+        offset = fill + gap if fill else 0
+        if offset + length > window_samples:
+            window += 1
+            offset = 0
+        starts[i] = window * window_samples + offset
+        fill = offset + length
+    return starts, (window + 1 if len(lengths) else 0)
+
+
+class PackedSpeechMap(SpeechMap):
+    """
+    SpeechMap whose compact waveform is a sequence of 30 s windows.
+
+    Window i occupies samples [i * 30 s, (i + 1) * 30 s) of the packed
+    waveform, so it must be decoded with fixed windows (BatchedTranscriber),
+    not whisper's seek loop.
+    """
+
+    def __init__(self, regions, total_samples, sample_rate=SAMPLE_RATE, gap_seconds=PACK_GAP_SECONDS,
+                 window_samples=N_SAMPLES):
+        """
+        Initialize the map.
+
+        Args:
+            regions: (start_sample, end_sample) speech regions in time order, none
+                longer than window_samples
+            total_samples: Length of the original waveform
+            sample_rate: Waveform sample rate
+            gap_seconds: Silence between regions sharing a window
+            window_samples: Encoder window size
+        """
+        super().__init__(regions, total_samples, sample_rate, gap_seconds)
+        self.window_samples = window_samples
+        self.packed_starts, self.windows = pack_regions(self.lengths, self.gap, window_samples)
+
+    @classmethod
+    def from_audio(cls, audio, sample_rate=SAMPLE_RATE, **kwargs):
+        """Build a map from detect_speech() on a waveform, cutting over-long regions"""
+        regions = split_long_regions(audio, detect_speech(audio, sample_rate, **kwargs), sample_rate=sample_rate)
+        return cls(regions, len(audio), sample_rate)
+
+    def packed_audio(self, audio):
+        """Windowed waveform holding every region at its packed position"""
+        if self.is_empty:
+            return np.zeros(0, dtype=np.float32)
+        packed = np.zeros(int(self.packed_starts[-1] + self.lengths[-1]), dtype=np.float32)
+        for (start, end), offset in zip(self.regions, self.packed_starts):
+            packed[offset:offset + end - start] = audio[start:end]
+        return packed
+
+    def _region_index(self, seconds, is_end=False):
+        side = 'left' if is_end else 'right'
+        return max(0, int(np.searchsorted(self.packed_starts, seconds * self.sample_rate, side=side)) - 1)
+
+    def remap_segments(self, segments):
+        """
+        Map segments back onto the original timeline, splitting any that span regions.
+
+        A segment covering several packed regions is split by its words, each
+        word going to the region holding its midpoint. Without word timings the
+        segment is kept whole, running from its first region to its last.
+
+        Returns:
+            New list of segments, renumbered
+        """
+        remapped = []
+        for segment in segments:
+            words = segment.get('words') or []
+            first = self._region_index(segment['start'])
+            last = self._region_index(segment['end'], is_end=True)
+
+            if first == last or not words:
+                remapped.extend(super().remap_segments([segment]))
+                continue
+
+            groups = {}
+            for word in words:
+                groups.setdefault(self._region_index((word['start'] + word['end']) / 2), []).append(word)
+            for region_words in groups.values():
+                piece = dict(segment,
+                             start=region_words[0]['start'],
+                             end=region_words[-1]['end'],
+                             text="".join(word['word'] for word in region_words),
+                             tokens=[],  # Token ids cannot be divided between regions
+                             words=[dict(word) for word in region_words])
+                remapped.extend(super().remap_segments([piece]))
+
+        for i, segment in enumerate(remapped):
+            segment['id'] = i
+        return remapped
+
+    def report(self):
+        """Skipped audio, plus encoder windows used against unpacked transcription"""
+        report = super().report()
+        report['windows'] = self.windows
+        report['unpacked_windows'] = -(-self.total_samples // self.window_samples)
+        return report
@@ -0,0 +1,166 @@
+"""
+Parallel CPU transcription.
+Cuts decoded audio at silence into independent spans and transcribes them in
+a process pool. Spans can be decoded independently because the transcription
+options set condition_on_previous_text=False.
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from vad import SAMPLE_RATE, split_at_silence
+
+# Per-process state set up by _init_worker
+_worker_processor = None
+_worker_options = None
+_worker_adaptive = False
+
+
+def _init_worker(model_name, engine, precision, threads, options, adaptive=False, draft_model=None,
+                 compile_mode=None):
+    """Load the model once per worker process"""
+    global _worker_processor, _worker_options, _worker_adaptive
+
+    import torch
+    torch.set_num_threads(threads)
+
+    from whisper_processor import WhisperProcessor
+    _worker_processor = WhisperProcessor(
+        model_name=model_name, device="cpu", engine=engine, precision=precision,
+        draft_model=draft_model, compile_mode=compile_mode
+    )
+    _worker_processor.engine.cpu_threads = threads
+    if not _worker_processor.load_model():
+        raise RuntimeError(f"Worker {os.getpid()} failed to load model {model_name}")
+    _worker_options = options
+    _worker_adaptive = adaptive
+
+
+def _transcribe_span(audio, offset):
+    """
+    Transcribe one span and shift its timestamps onto the global timeline.
+
+    `audio` is the span's waveform, or (pcm_path, start, end) to slice it from
+    the audio cache's memory-mapped .npy without pickling samples to the worker.
+    """
+    if isinstance(audio, tuple):
+        pcm_path, start, end = audio
+        audio = np.load(pcm_path, mmap_mode='c')[start:end]
+    engine = _worker_processor.engine
+    draft = _worker_processor.draft
+    if _worker_adaptive or draft is not None:
+        result = engine.transcribe_batched(_worker_processor.model, audio, _worker_options, 1,
+                                           adaptive=_worker_adaptive, draft=draft)
+    else:
+        result = engine.transcribe(_worker_processor.model, audio, _worker_options)
+    return (offset_segments(result.get('segments', []), offset), result.get('language'),
+            result.get('adaptive'))
+
+
+def offset_segments(segments, offset):
+    """Shift segment (and word) timestamps by `offset` seconds in place"""
+    for segment in segments:
+        segment['start'] += offset
+        segment['end'] += offset
+        for word in segment.get('words') or []:
+            word['start'] += offset
+            word['end'] += offset
+    return segments
+
+
+def stitch_segments(segments):
+    """Order segments on the global timeline and renumber them"""
+    segments = sorted(segments, key=lambda s: (s['start'], s['end']))
+    for i, segment in enumerate(segments):
+        segment['id'] = i
+    return segments
+
+
+def default_span_seconds(duration, workers):
+    """Aim for ~2 spans per worker so uneven spans still balance, within 1-10 min"""
+    return min(600.0, max(60.0, duration / (workers * 2)))
+
+
+def transcribe_parallel(model_name, audio, options, workers, threads_per_worker=None,
+                        span_seconds=None, engine="openai", precision=None, adaptive=False,
+                        draft_model=None, compile_mode=None, on_progress=None, pcm_path=None):
+    """
+    Transcribe a waveform across a pool of CPU worker processes.
+
+    Each worker holds its own copy of the model, so RAM use grows with the
+    number of workers.
+
+    Args:
+        model_name: Whisper model size
+        audio: float32 waveform at 16 kHz
+        options: openai-whisper style decoding options (language should be set)
+        workers: Number of worker processes
+        threads_per_worker: Torch intra-op threads per worker (default: cores / workers)
+        span_seconds: Target span length (default: derived from duration)
+        engine: Inference engine name
+        precision: Engine precision
+        adaptive: Greedy-first decoding with beam fallback in each worker
+        draft_model: Draft model name for speculative decoding in each worker
+        compile_mode: Compiled inference mode for each worker's model
+        on_progress: Optional callback(seconds) with the audio of all finished spans
+        pcm_path: .npy file holding `audio` (audio cache); workers memory-map
+            their spans from it instead of receiving copies
+
+    Returns:
+        Whisper-style result dict with 'text', 'segments' and 'language'
+    """
+    duration = len(audio) / SAMPLE_RATE
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    if span_seconds is None:
+        span_seconds = default_span_seconds(duration, workers)
+
+    spans = split_at_silence(audio, span_seconds)
+    print(f"⚡ Parallel transcription: {len(spans)} spans across {workers} workers "
+          f"({threads_per_worker} threads each)")
+
+    segments = []
+    languages = []
+    adaptive_stats = {"windows": 0, "beam_windows": 0}
+    finished_seconds = 0.0
+    # Spawn so workers never inherit an initialised OpenMP/CUDA runtime
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(model_name, engine, precision, threads_per_worker,
+                                       options, adaptive, draft_model, compile_mode)) as pool:
+        futures = {
+            pool.submit(_transcribe_span, (pcm_path, start, end) if pcm_path else audio[start:end],
+                        start / SAMPLE_RATE): (start, end)
+            for start, end in spans
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            span_segments, language, span_adaptive = future.result()
+            segments.extend(span_segments)
+            languages.append(language)
+            for key in adaptive_stats:
+                adaptive_stats[key] += (span_adaptive or {}).get(key, 0)
+            start, end = futures[future]
+            print(f"✅ Span {done}/{len(spans)} done "
+                  f"({start / SAMPLE_RATE:.0f}s-{end / SAMPLE_RATE:.0f}s)",
+                  file=sys.stderr, flush=True)
+            # Spans finish out of order, so progress counts finished audio
+            finished_seconds += (end - start) / SAMPLE_RATE
+            if on_progress:
+                on_progress(finished_seconds)
+
+    segments = stitch_segments(segments)
+    result = {
+        'text': "".join(segment['text'] for segment in segments),
+        'segments': segments,
+        'language': options.get('language') or (languages[0] if languages else None),
+    }
+    if adaptive:
+        print(f"🔁 Adaptive decoding: {adaptive_stats['beam_windows']}/{adaptive_stats['windows']} "
+              f"windows needed beam search")
+        result['adaptive'] = adaptive_stats
+    return result
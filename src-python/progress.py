@@ -0,0 +1,163 @@
+"""
+Transcription progress reporting.
+Turns "seconds of audio decoded so far" from any transcription path into
+progress events with the real-time factor and an ETA. Events are rate
+limited, so a UI polling stdout or a job record is not flooded by
+per-segment updates.
+"""
+
+import importlib
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+PROGRESS_INTERVAL = 2.0  # Minimum seconds between events
+
+
+class ProgressReporter:
+    """Rate-limited progress events for one transcription"""
+
+    def __init__(self, total_seconds, callback, min_interval=PROGRESS_INTERVAL, done_seconds=0.0):
+        """
+        Initialize the reporter.
+
+        Args:
+            total_seconds: Audio duration being transcribed
+            callback: Called with an event dict (see event())
+            min_interval: Minimum seconds between events; the final one is always sent
+            done_seconds: Audio already transcribed before this run (e.g. resumed from
+                a checkpoint); counted as done but not in the real-time factor
+        """
+        self.total_seconds = max(0.0, float(total_seconds or 0.0))
+        self.callback = callback
+        self.min_interval = min_interval
+        self.start_seconds = min(done_seconds, self.total_seconds)
+        self.decoded_seconds = self.start_seconds
+        self.started = time.perf_counter()
+        self._last_emit = None
+        self._finished = False
+
+    def update(self, decoded_seconds):
+        """
+        Record progress and emit an event if the rate limit allows.
+
+        Args:
+            decoded_seconds: Audio transcribed so far, from the start of the media
+        """
+        if decoded_seconds >= self.total_seconds:
+            self.finish()
+            return
+        if decoded_seconds <= self.decoded_seconds or self._finished:
+            return
+        self.decoded_seconds = decoded_seconds
+
+        now = time.perf_counter()
+        if self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        self.callback(self.event())
+
+    def finish(self):
+        """Mark the audio as fully transcribed and send the final event"""
+        if self._finished:
+            return
+        self.decoded_seconds = self.total_seconds
+        self._finished = True
+        self.callback(self.event())
+
+    def scoped(self, offset, span_seconds, transcribed_seconds):
+        """
+        Callback for one part of the media, e.g. a checkpointed chunk.
+
+        Args:
+            offset: Media time where the part starts
+            span_seconds: Media duration the part covers
+            transcribed_seconds: Audio actually sent to the model for it (shorter
+                than span_seconds when VAD packed out silence)
+
+        Returns:
+            Function taking seconds decoded into the transcribed audio
+        """
+        scale = span_seconds / transcribed_seconds if transcribed_seconds else 1.0
+
+        def report(seconds):
+            self.update(offset + seconds * scale)
+        return report
+
+    def event(self):
+        """
+        Current progress.
+
+        Returns:
+            Dict with decoded_seconds, total_seconds, fraction, rtf (wall time per
+            audio second, None until measurable) and eta_seconds (None likewise)
+        """
+        elapsed = time.perf_counter() - self.started
+        measured = self.decoded_seconds - self.start_seconds
+        rtf = elapsed / measured if measured > 0 else None
+        remaining = self.total_seconds - self.decoded_seconds
+        return {
+            "decoded_seconds": round(self.decoded_seconds, 1),
+            "total_seconds": round(self.total_seconds, 1),
+            "fraction": self.decoded_seconds / self.total_seconds if self.total_seconds else 1.0,
+            "rtf": round(rtf, 3) if rtf is not None else None,
+            "eta_seconds": round(remaining * rtf) if rtf is not None else None,
+        }
+
+
+def format_progress(event):
+    """One-line summary of a progress event, e.g. for a status message"""
+    message = (f"Transcribed {event['decoded_seconds'] / 60:.1f}/{event['total_seconds'] / 60:.1f} min "
+               f"({event['fraction']:.0%})")
+    if event["rtf"] is not None:
+        eta = event["eta_seconds"]
+        eta_text = f"{eta // 60:.0f} min {eta % 60:.0f} s" if eta >= 60 else f"{eta:.0f} s"
+        message += f", RTF {event['rtf']:.2f}, ETA {eta_text}"
+    return message
+
+
+class _FrameCounter:
+    """Stand-in for whisper's tqdm bar that forwards mel-frame progress"""
+
+    def __init__(self, on_progress, frames_per_second):
+        self.on_progress = on_progress
+        self.frames_per_second = frames_per_second
+        self.frames = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, frames):
+        self.frames += frames
+        self.on_progress(self.frames / self.frames_per_second)
+
+
+@contextmanager
+def whisper_progress(on_progress):
+    """
+    Report progress from openai-whisper's sequential model.transcribe().
+
+    whisper only exposes progress through its tqdm bar, so the module's tqdm
+    is swapped for a counter while the block runs. Not thread-safe: two
+    concurrent transcriptions in one process would share the patch.
+
+    Args:
+        on_progress: Callback taking seconds decoded, or None to do nothing
+    """
+    if on_progress is None:
+        yield
+        return
+
+    from whisper.audio import FRAMES_PER_SECOND
+
+    module = importlib.import_module("whisper.transcribe")  # `whisper.transcribe` is the function
+    original = module.tqdm
+
+    module.tqdm = SimpleNamespace(tqdm=lambda *args, **kwargs: _FrameCounter(on_progress, FRAMES_PER_SECOND))
+    try:
+        yield
+    finally:
+        module.tqdm = original
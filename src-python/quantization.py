@@ -0,0 +1,48 @@
+"""
+Dynamic int8 quantization for the openai-whisper CPU path.
+Every Linear layer's weights are converted to int8 once after loading;
+activations are quantized on the fly per batch, so no calibration data is
+needed. Embeddings, convolutions and layer norms stay FP32.
+"""
+
+import warnings
+
+import torch
+from torch import nn
+
+
+def _as_plain_linear(model):
+    """
+    Replace whisper.model.Linear with nn.Linear, sharing the same parameters.
+
+    quantize_dynamic matches module types exactly, and whisper subclasses
+    nn.Linear only to cast weights to the activation dtype.
+    """
+    from whisper.model import Linear
+
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, Linear):
+                plain = nn.Linear(child.in_features, child.out_features,
+                                  bias=child.bias is not None, device="meta")
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+    return model
+
+
+def quantize_int8(model):
+    """
+    Quantize a loaded FP32 openai-whisper model's Linear layers to int8 in place.
+
+    Args:
+        model: openai-whisper model on the CPU
+
+    Returns:
+        The quantized model
+    """
+    from torch.ao.quantization import quantize_dynamic
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # torch.ao.quantization deprecation notices
+        return quantize_dynamic(_as_plain_linear(model), {nn.Linear}, dtype=torch.qint8, inplace=True)
@@ -8,6 +8,8 @@ import requests
 import sys
 from pathlib import Path
 
+from transcript_cache import TranscriptCache
+
 
 class RemoteWhisperClient:
     """HTTP client for remote Whisper transcription server using faster-whisper-server API."""
@@ -134,7 +136,7 @@ class RemoteWhisperClient:
             traceback.print_exc(file=sys.stderr)
             return None
 
-    def transcribe_and_save(self, input_file, output_file, model="medium", language="en"):
+    def transcribe_and_save(self, input_file, output_file, model="medium", language="en", use_cache=True):
         """
         Transcribe audio file and save result to output file.
 
@@ -146,6 +148,7 @@ class RemoteWhisperClient:
             output_file (str): Path to save the transcription text
             model (str): Whisper model size
             language (str): Language code
+            use_cache (bool): Serve identical media from the local transcript cache
 
         Returns:
             str: Path to the output file if successful, None if failed
@@ -153,8 +156,17 @@ class RemoteWhisperClient:
         output_path = Path(output_file)
 
         try:
-            # Get transcription from remote server
-            result = self.transcribe_file(input_file, model=model, language=language)
+            cache = TranscriptCache() if use_cache else None
+            settings = self._cache_settings(model, language)
+
+            # Skip the upload entirely if this media was transcribed before
+            result = cache.lookup(input_file, settings) if cache else None
+            cache_hit = result is not None
+            if cache_hit:
+                print(f"[RemoteWhisperClient] Served from transcript cache", file=sys.stderr)
+            else:
+                # Get transcription from remote server
+                result = self.transcribe_file(input_file, model=model, language=language)
 
             if result is None:
                 print(f"[RemoteWhisperClient] Transcription returned None", file=sys.stderr)
@@ -167,6 +179,46 @@ class RemoteWhisperClient:
                 print(f"[RemoteWhisperClient] Empty transcription result", file=sys.stderr)
                 return None
 
+            if cache and not cache_hit:
+                cache.store(input_file, settings, {'text': transcript_text})
+
+        except Exception as e:
+            print(f"[RemoteWhisperClient] Failed to save transcription: {e}", file=sys.stderr)
+            import traceback
+            traceback.print_exc(file=sys.stderr)
+            return None
+
+        return self.save_transcript(transcript_text, output_path)
+
+    def cached_transcript(self, input_file, model="medium", language="en"):
+        """
+        Look up a transcript in the local transcript cache without contacting the server.
+
+        Args:
+            input_file (str): Path to the audio/video file
+            model (str): Whisper model size
+            language (str): Language code
+
+        Returns:
+            str: Cached transcript text, or None on a cache miss
+        """
+        result = TranscriptCache().lookup(input_file, self._cache_settings(model, language))
+        return (result or {}).get('text') or None
+
+    def save_transcript(self, transcript_text, output_file):
+        """
+        Write transcript text to the output file.
+
+        Args:
+            transcript_text (str): Transcript to save
+            output_file (str): Path to save the transcription text
+
+        Returns:
+            str: Path to the output file if successful, None if failed
+        """
+        output_path = Path(output_file)
+
+        try:
             # Ensure output directory exists
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -184,6 +236,15 @@ class RemoteWhisperClient:
             traceback.print_exc(file=sys.stderr)
             return None
 
+    def _cache_settings(self, model, language):
+        """Transcript cache settings for this server, model and language"""
+        return {
+            'engine': 'remote',
+            'host': self.whisper_host,
+            'model': model,
+            'language': language
+        }
+
 
 def test_connection(host="http://192.168.68.10:9000"):
     """
@@ -0,0 +1,153 @@
+"""
+Repetition (hallucination loop) detection over transcript segments.
+Each segment is reduced to rolling hashes of its word n-grams ("shingles").
+A multiset of the shingles from the last K segments is kept up to date as the
+window slides, so a segment is checked against all of them in time
+proportional to its own word count. This catches A-B-A-B loops that a
+previous-segment comparison misses, and runs in O(total words).
+
+Short segments ("Yeah.", "Okay.") are too short for shingle overlap to mean
+anything, and they recur naturally in conversation, so they are only
+treated as repetitions when they repeat the segment right before them.
+"""
+
+import re
+from collections import Counter, deque
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Polynomial rolling hash over word hashes, modulo a Mersenne prime
+_HASH_BASE = 1_000_003
+_HASH_MOD = (1 << 61) - 1
+
+
+def shingle_hashes(text, size):
+    """
+    Rolling hashes of every `size`-word shingle in a piece of text.
+
+    Text shorter than `size` words yields a single shingle of all its words,
+    so short utterances ("Thank you.") can still be matched.
+
+    Args:
+        text: Segment text
+        size: Words per shingle
+
+    Returns:
+        Set of integer shingle hashes (empty if the text has no words)
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if not words:
+        return set()
+
+    size = min(size, len(words))
+    word_hashes = [hash(word) % _HASH_MOD for word in words]
+    leading_power = pow(_HASH_BASE, size - 1, _HASH_MOD)
+
+    rolling = 0
+    for word_hash in word_hashes[:size]:
+        rolling = (rolling * _HASH_BASE + word_hash) % _HASH_MOD
+
+    shingles = {rolling}
+    for i in range(size, len(word_hashes)):
+        rolling = (rolling - word_hashes[i - size] * leading_power) % _HASH_MOD
+        rolling = (rolling * _HASH_BASE + word_hashes[i]) % _HASH_MOD
+        shingles.add(rolling)
+
+    return shingles
+
+
+class RepetitionDetector:
+    """Sliding-window shingle index over the most recent segments"""
+
+    def __init__(self, window=8, shingle_size=3, threshold=0.8):
+        """
+        Initialize the detector.
+
+        Args:
+            window: Number of recent segments a new segment is compared against
+            shingle_size: Words per shingle
+            threshold: Fraction of a segment's shingles already seen in the
+                window above which it is treated as a repetition (0-1)
+
+        Segments under `2 * shingle_size` words are only compared against the
+        previous segment.
+        """
+        if window < 1 or shingle_size < 1:
+            raise ValueError("Repetition window and shingle size must be at least 1")
+        if not 0 < threshold <= 1:
+            raise ValueError("Repetition threshold must be in (0, 1]")
+
+        self.window = window
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_words = 2 * shingle_size
+        self.reset()
+
+    def reset(self):
+        """Forget all previously seen segments"""
+        self._recent = deque()
+        self._counts = Counter()
+        self._previous = set()
+        self.filtered = 0
+
+    def _push(self, shingles):
+        """Add a segment's shingles to the window, evicting the oldest segment"""
+        self._recent.append(shingles)
+        self._counts.update(shingles)
+        self._previous = shingles
+
+        if len(self._recent) > self.window:
+            oldest = self._recent.popleft()
+            self._counts.subtract(oldest)
+            for shingle in oldest:
+                if self._counts[shingle] <= 0:
+                    del self._counts[shingle]
+
+    def similarity(self, shingles):
+        """Fraction of `shingles` present in the current window"""
+        if not shingles:
+            return 0.0
+        seen = sum(1 for shingle in shingles if shingle in self._counts)
+        return seen / len(shingles)
+
+    def is_repetition(self, text):
+        """
+        Check one segment and add it to the window.
+
+        Repeated segments stay in the window too, so a loop that keeps
+        cycling through the same lines stays suppressed. Short segments only
+        count as repeated when they match the previous segment.
+        """
+        shingles = shingle_hashes(text, self.shingle_size)
+        if len(WORD_PATTERN.findall(text)) < self.min_words:
+            repeated = bool(shingles) and shingles == self._previous
+        else:
+            repeated = self.similarity(shingles) >= self.threshold
+        self._push(shingles)
+        return repeated
+
+    def prime(self, segments):
+        """Seed the window with already accepted segments (e.g. on resume)"""
+        for segment in segments[-self.window:]:
+            self._push(shingle_hashes(segment['text'], self.shingle_size))
+
+    def filter(self, segments, verbose=True):
+        """
+        Drop repeated segments.
+
+        Args:
+            segments: Whisper-style segment dicts in time order
+            verbose: Print each filtered segment
+
+        Returns:
+            List of segments that are not repetitions
+        """
+        kept = []
+        for segment in segments:
+            if self.is_repetition(segment['text']):
+                self.filtered += 1
+                if verbose:
+                    print(f"⚠️  Filtered repetition at {segment['start']:.1f}s")
+            else:
+                kept.append(segment)
+        return kept
@@ -0,0 +1,170 @@
+"""
+Structured segment store saved next to each transcript.
+Segments (with words, avg_logprob and no_speech_prob) are written one JSON
+object per line, and a small binary index maps each segment's start and end
+time to its byte offset in that file. Readers memory-map the store and parse
+only the lines covering the requested time range, so seeking into a
+multi-hour session does not read the whole transcript.
+"""
+
+import json
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+
+STORE_SUFFIX = ".segments.jsonl"
+INDEX_SUFFIX = ".segments.idx.npy"
+
+INDEX_DTYPE = np.dtype([("start", "<f8"), ("end", "<f8"), ("offset", "<i8")])
+
+
+def store_paths(transcript_path):
+    """Return (store_path, index_path) for a transcript file"""
+    transcript_path = Path(transcript_path)
+    return transcript_path.with_suffix(STORE_SUFFIX), transcript_path.with_suffix(INDEX_SUFFIX)
+
+
+def _segment_record(segment):
+    """Compact JSON-ready form of a whisper segment; words become [word, start, end, probability]"""
+    record = {
+        "id": segment.get("id"),
+        "start": round(float(segment["start"]), 3),
+        "end": round(float(segment["end"]), 3),
+        "text": segment["text"].strip(),
+        "avg_logprob": segment.get("avg_logprob"),
+        "no_speech_prob": segment.get("no_speech_prob"),
+    }
+    if segment.get("track"):
+        record["track"] = segment["track"]
+    words = segment.get("words")
+    if words:
+        record["words"] = [
+            [word["word"], round(float(word["start"]), 3), round(float(word["end"]), 3),
+             round(float(word.get("probability", 0.0)), 4)]
+            for word in words
+        ]
+    return record
+
+
+def write_segment_store(segments, transcript_path):
+    """
+    Write the segment store and its seek index next to a transcript.
+
+    Args:
+        segments: Whisper-style segment dicts in time order
+        transcript_path: Transcript the store belongs to
+
+    Returns:
+        Path to the store file
+    """
+    store_path, index_path = store_paths(transcript_path)
+    index = np.empty(len(segments), dtype=INDEX_DTYPE)
+
+    tmp_path = store_path.with_name(store_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        for i, segment in enumerate(segments):
+            record = _segment_record(segment)
+            index[i] = (record["start"], record["end"], f.tell())
+            f.write(json.dumps(record, ensure_ascii=False, default=float).encode('utf-8'))
+            f.write(b"\n")
+
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_index, 'wb') as f:
+        np.save(f, index)
+
+    os.replace(tmp_path, store_path)
+    os.replace(tmp_index, index_path)
+    return store_path
+
+
+class SegmentStore:
+    """Read-only, memory-mapped view of a transcript's segment store"""
+
+    def __init__(self, transcript_path):
+        """
+        Open the store next to a transcript.
+
+        Args:
+            transcript_path: Transcript file the store was written for
+
+        Raises:
+            FileNotFoundError: If the transcript has no segment store
+        """
+        self.store_path, self.index_path = store_paths(transcript_path)
+        self.index = np.load(self.index_path, mmap_mode='r')
+
+        self._file = open(self.store_path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        # Running maximum of end times, so overlapping segments are still found
+        self._max_end = np.maximum.accumulate(self.index["end"]) if len(self.index) else self.index["end"]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def duration(self):
+        """End time of the last segment in seconds"""
+        return float(self._max_end[-1]) if len(self) else 0.0
+
+    def _expand(self, record):
+        record["words"] = [
+            {"word": word, "start": start, "end": end, "probability": probability}
+            for word, start, end, probability in record.get("words", [])
+        ]
+        return record
+
+    def range(self, start=0.0, end=None):
+        """
+        Load the segments overlapping [start, end) seconds.
+
+        Only the bytes for those segments are read from the mapped file.
+
+        Args:
+            start: Range start in seconds
+            end: Range end in seconds (None = end of transcript)
+
+        Returns:
+            List of segment dicts with 'words' expanded to whisper-style dicts
+        """
+        first = int(np.searchsorted(self._max_end, start, side='left'))
+        last = len(self) if end is None else int(np.searchsorted(self.index["start"], end, side='left'))
+        if first >= last:
+            return []
+
+        begin = int(self.index["offset"][first])
+        stop = int(self.index["offset"][last]) if last < len(self) else len(self._map)
+        return [self._expand(json.loads(line)) for line in self._map[begin:stop].splitlines()]
+
+    def text(self, start=0.0, end=None, timestamps=True):
+        """Plain-text transcript for a time range, in the .txt transcript's format"""
+        lines = []
+        for segment in self.range(start, end):
+            if timestamps:
+                lines.append(f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}]")
+            lines.append(f"{segment['track']}: {segment['text']}" if segment.get("track") else segment["text"])
+            lines.append("")
+        return "\n".join(lines)
+
+
+def format_timestamp(seconds):
+    """Format seconds as HH:MM:SS"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
@@ -0,0 +1,285 @@
+"""
+Speculative greedy decoding for the openai-whisper engine.
+A small draft model (tiny/base) proposes a few tokens one by one; the large
+target model then scores all of them in a single decoder pass and keeps the
+longest prefix that matches its own greedy choice, plus one token of its own.
+Every emitted token is the target's argmax under the same logit filters as
+whisper.decode, so the output matches the target's greedy transcript while
+the target runs far fewer sequential decoder steps.
+"""
+
+import sys
+
+import torch
+import torch.nn.functional as F
+from whisper.decoding import DecodingOptions, DecodingResult, DecodingTask
+from whisper.model import disable_sdpa
+from whisper.utils import compression_ratio
+
+from batched_decoder import BatchedTranscriber, needs_beam, window_mels
+
+
+def check_draft_compatible(target, draft):
+    """
+    Raise ValueError unless the draft shares the target's tokenizer.
+
+    Speculation compares token ids, so both models need the same vocabulary
+    (e.g. tiny/base/small/medium together, or large-v3 with large-v3-turbo).
+    """
+    if target.dims.n_vocab != draft.dims.n_vocab or target.is_multilingual != draft.is_multilingual:
+        raise ValueError(
+            f"Draft model vocabulary ({draft.dims.n_vocab} tokens) does not match the target "
+            f"model ({target.dims.n_vocab} tokens); choose a draft from the same model family"
+        )
+
+
+class _OffsetCausalMask:
+    """
+    Causal mask for several new tokens appended after `offset` cached positions.
+    Whisper slices its mask as mask[:n, :n], which only fits when there is no
+    cache; this object ignores the slice and returns the (n, offset + n) mask.
+    """
+
+    def __init__(self, offset, n_new, device):
+        mask = torch.full((n_new, offset + n_new), float("-inf"), device=device)
+        self.mask = mask.triu_(offset + 1)
+
+    def __getitem__(self, _):
+        return self.mask
+
+
+class _DecoderState:
+    """One model's decoder with a KV cache that can be rolled back"""
+
+    def __init__(self, model, features):
+        self.model = model
+        self.features = features
+        self.cache = {}
+        self.self_attn_modules = [
+            module for block in model.decoder.blocks for module in (block.attn.key, block.attn.value)
+        ]
+        self.cached = 0  # Tokens whose keys/values are in the cache
+
+    def forward(self, tokens):
+        """Run the decoder on tokens not yet in the cache; returns (n_new, n_vocab) logits"""
+        decoder = self.model.decoder
+        new = torch.tensor([tokens[self.cached:]], device=self.features.device)
+        offset = self.cached
+
+        x = decoder.token_embedding(new) + decoder.positional_embedding[offset:offset + new.shape[-1]]
+        x = x.to(self.features.dtype)
+        mask = _OffsetCausalMask(offset, new.shape[-1], x.device)
+
+        # Hooks are installed per call so two states can share one model (draft == target)
+        self.cache, hooks = self.model.install_kv_cache_hooks(self.cache)
+        try:
+            with disable_sdpa():
+                for block in decoder.blocks:
+                    x = block(x, self.features, mask=mask, kv_cache=self.cache)
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+        x = decoder.ln(x)
+        self.cached = len(tokens)
+        return (x @ torch.transpose(decoder.token_embedding.weight.to(x.dtype), 0, 1)).float()[0]
+
+    def rollback(self, length):
+        """Drop cached positions beyond `length` tokens (rejected draft tokens)"""
+        if length >= self.cached:
+            return
+        for module in self.self_attn_modules:
+            if module in self.cache:
+                self.cache[module] = self.cache[module][:, :length]
+        self.cached = length
+
+    def close(self):
+        self.cache.clear()
+
+
+class SpeculativeDecoder:
+    """Greedy window decoder that verifies draft-model proposals with the target"""
+
+    def __init__(self, target, draft, draft_tokens=4):
+        """
+        Initialize the decoder.
+
+        Args:
+            target: Loaded openai-whisper model whose greedy output is produced
+            draft: Smaller openai-whisper model with the same vocabulary
+            draft_tokens: Tokens proposed by the draft per verification pass
+
+        Raises:
+            ValueError: If the draft is not compatible with the target
+        """
+        check_draft_compatible(target, draft)
+        self.target = target
+        self.draft = draft
+        self.draft_tokens = max(1, int(draft_tokens))
+        self.proposed = 0
+        self.accepted = 0
+        self.target_passes = 0
+
+    def _filter(self, task, logits, tokens):
+        """Apply whisper.decode's logit filters for the given token prefix"""
+        logits = logits.clone().unsqueeze(0)
+        prefix = torch.tensor([tokens], device=logits.device)
+        for logit_filter in task.logit_filters:
+            logit_filter.apply(logits, prefix)
+        return logits[0]
+
+    def decode(self, target_features, draft_features, options):
+        """
+        Greedy-decode one window.
+
+        Args:
+            target_features: Target encoder output, shape (1, n_audio_ctx, n_state)
+            draft_features: Draft encoder output for the same window
+            options: DecodingOptions (temperature 0; beam settings are ignored)
+
+        Returns:
+            DecodingResult matching whisper.decode's greedy result for the target
+        """
+        options = DecodingOptions(
+            task=options.task, language=options.language, temperature=0.0,
+            fp16=options.fp16, sample_len=options.sample_len,
+            without_timestamps=options.without_timestamps,
+            suppress_tokens=options.suppress_tokens, suppress_blank=options.suppress_blank,
+        )
+        task = DecodingTask(self.target, options)
+        tokenizer = task.tokenizer
+        eot = tokenizer.eot
+
+        target = _DecoderState(self.target, target_features)
+        draft = _DecoderState(self.draft, draft_features)
+        tokens = list(task.initial_tokens)
+        sum_logprob = 0.0
+        no_speech_prob = float("nan")
+
+        try:
+            while len(tokens) - task.sample_begin < task.sample_len and tokens[-1] != eot:
+                # Draft proposes greedily, one token per draft step
+                proposal = []
+                room = task.sample_len - (len(tokens) - task.sample_begin)
+                while len(proposal) < min(self.draft_tokens, room):
+                    logits = self._filter(task, draft.forward(tokens + proposal)[-1], tokens + proposal)
+                    proposal.append(int(logits.argmax()))
+                    if proposal[-1] == eot:
+                        break
+
+                # Target scores the current position and every proposed token in one pass
+                first_pass = target.cached == 0
+                first_new = len(tokens) - target.cached
+                target_logits = target.forward(tokens + proposal)
+                self.target_passes += 1
+                if first_pass:
+                    no_speech_prob = target_logits[task.sot_index].softmax(-1)[tokenizer.no_speech].item()
+
+                accepted = 0
+                for i in range(len(proposal) + 1):
+                    logits = self._filter(task, target_logits[first_new - 1 + i], tokens)
+                    token = int(logits.argmax())
+                    sum_logprob += F.log_softmax(logits, dim=-1)[token].item()
+                    tokens.append(token)
+
+                    if i < len(proposal) and token != proposal[i]:
+                        break
+                    accepted += i < len(proposal)
+                    if token == eot or len(tokens) - task.sample_begin >= task.sample_len:
+                        break
+
+                self.proposed += len(proposal)
+                self.accepted += accepted
+
+                # Keep only cache entries for tokens that were actually emitted
+                target.rollback(len(tokens) - 1)
+                draft.rollback(len(tokens) - 1)
+        finally:
+            target.close()
+            draft.close()
+
+        text_tokens = [token for token in tokens[task.sample_begin:] if token != eot]
+        text = tokenizer.decode(text_tokens).strip()
+        return DecodingResult(
+            audio_features=target_features[0],
+            language=options.language,
+            tokens=text_tokens,
+            text=text,
+            avg_logprob=sum_logprob / (len(text_tokens) + 1),
+            no_speech_prob=no_speech_prob,
+            temperature=0.0,
+            compression_ratio=compression_ratio(text),
+        )
+
+    def report(self):
+        """Acceptance statistics for the windows decoded so far"""
+        return {
+            "proposed": self.proposed,
+            "accepted": self.accepted,
+            "acceptance_rate": round(self.accepted / self.proposed, 3) if self.proposed else 0.0,
+            "target_passes": self.target_passes,
+        }
+
+
+class SpeculativeTranscriber(BatchedTranscriber):
+    """BatchedTranscriber whose windows are decoded speculatively with a draft model"""
+
+    greedy_only = True
+
+    def __init__(self, model, draft, draft_tokens=4, batch_size=1, fp16=False, adaptive=False,
+                 on_encoded=None, mels=None):
+        """
+        Initialize the transcriber.
+
+        Args:
+            model: Loaded target openai-whisper model
+            draft: Loaded draft model (tiny/base) with the same vocabulary
+            draft_tokens: Tokens proposed by the draft per verification pass
+            batch_size: Windows encoded together
+            fp16: Whether the models run in half precision
+            adaptive: Re-decode windows failing the quality checks with beam search
+            on_encoded: Optional callback(start_sample, features) for target encoder output
+            mels: Cached per-window log-mel features of the audio to transcribe
+        """
+        super().__init__(model, batch_size=batch_size, fp16=fp16, adaptive=adaptive, on_encoded=on_encoded,
+                         mels=mels)
+        self.draft = draft
+        self.speculative = SpeculativeDecoder(model, draft, draft_tokens)
+
+    def decode_windows(self, audio, starts, options):
+        features = self.encode_windows(audio, starts)
+        if self.on_encoded is not None:
+            for start, window_features in zip(starts, features):
+                self.on_encoded(start, window_features)
+
+        draft_mel = window_mels(self.draft, audio, starts, self.dtype, cached=self.mels)
+        with torch.no_grad():
+            draft_features = self.draft.embed_audio(draft_mel)
+
+        decode_options = DecodingOptions(
+            task=options.get("task", "transcribe"), language=options.get("language"),
+            temperature=0.0, fp16=self.fp16
+        )
+        with torch.no_grad():
+            results = [
+                self.speculative.decode(features[i:i + 1], draft_features[i:i + 1], decode_options)
+                for i in range(len(starts))
+            ]
+
+        self.windows_decoded += len(starts)
+        if self.adaptive:
+            retry = [i for i, result in enumerate(results) if needs_beam(result, options)]
+            for i in retry:
+                results[i] = self.decode_features(features[i:i + 1], options)[0]
+            self.beam_windows += len(retry)
+
+        return features, results
+
+    def _transcribe_batches(self, batches, options, verbose=None, on_progress=None):
+        result = super()._transcribe_batches(batches, options, verbose=verbose, on_progress=on_progress)
+        report = self.speculative.report()
+        print(f"🏎️  Speculative decoding: {report['accepted']}/{report['proposed']} draft tokens accepted "
+              f"({report['acceptance_rate']:.0%}), {report['target_passes']} target decoder passes",
+              file=sys.stderr, flush=True)
+        result["speculative"] = report
+        return result
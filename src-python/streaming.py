@@ -0,0 +1,101 @@
+"""
+Constant-memory windowed transcription sources.
+Whole-file transcription holds the decoded waveform and its log-mel
+spectrogram in RAM, which grows with the recording (several GB for a
+six-hour session). Streaming instead reads 30 s windows in bounded batches,
+straight from FFmpeg's PCM pipe or from a cached .npy file, and decodes each
+batch before the next one is read. Peak memory then depends on the batch
+size, not on the length of the recording.
+"""
+
+import numpy as np
+from whisper.audio import N_SAMPLES
+
+from audio_io import stream_pcm
+from audio_cache import cached_pcm_path
+
+
+def pcm_batches(media_path, batch_samples):
+    """
+    Read a media file from FFmpeg's PCM pipe in fixed-size batches.
+
+    Args:
+        media_path: Audio or video file
+        batch_samples: Samples per batch (a whole number of 30 s windows)
+
+    Yields:
+        (offset_samples, float32 samples). The samples are a view of one reused
+        buffer, valid only until the next batch is requested.
+    """
+    buffer = np.empty(batch_samples, dtype=np.float32)
+    filled = 0
+    offset = 0
+
+    for chunk in stream_pcm(media_path):
+        while len(chunk):
+            take = min(len(chunk), batch_samples - filled)
+            target = buffer[filled:filled + take]
+            target[:] = chunk[:take]
+            target *= 1 / 32768.0
+            filled += take
+            chunk = chunk[take:]
+
+            if filled == batch_samples:
+                yield offset, buffer
+                offset += filled
+                filled = 0
+
+    if filled:
+        yield offset, buffer[:filled]
+
+
+def npy_batches(pcm_path, batch_samples):
+    """
+    Read a float32 .npy waveform in fixed-size batches.
+
+    Each batch is copied out of a short-lived memory map of just its own
+    range, so pages already transcribed are unmapped again and resident
+    memory stays at one batch.
+
+    Yields:
+        (offset_samples, float32 samples), valid until the next batch is requested
+    """
+    with open(pcm_path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+        header_bytes = f.tell()
+
+    total = shape[0]
+    buffer = np.empty(batch_samples, dtype=np.float32)
+    for offset in range(0, total, batch_samples):
+        count = min(batch_samples, total - offset)
+        window = np.memmap(pcm_path, dtype=dtype, mode='r', shape=(count,),
+                           offset=header_bytes + offset * dtype.itemsize)
+        buffer[:count] = window
+        del window
+        yield offset, buffer[:count]
+
+
+def stream_batches(media_path, batch_size=1, audio_cache=None):
+    """
+    Bounded batches of 30 s windows covering a whole recording.
+
+    Args:
+        media_path: Audio or video file
+        batch_size: Windows per batch
+        audio_cache: AudioCache to read an already decoded waveform from (optional;
+            a miss streams from FFmpeg without filling the cache)
+
+    Returns:
+        Iterator of (offset_samples, samples) for BatchedTranscriber.transcribe_stream
+    """
+    batch_samples = max(1, int(batch_size)) * N_SAMPLES
+    cached = audio_cache.lookup_pcm(media_path) if audio_cache is not None else None
+    if cached is not None:
+        pcm_path = cached_pcm_path(cached)
+        del cached
+        return npy_batches(pcm_path, batch_samples)
+    return pcm_batches(media_path, batch_samples)
@@ -0,0 +1,119 @@
+"""
+Measured transcription throughput per configuration.
+Every transcription adds its audio duration and wall time to a small JSON
+file keyed by model, engine, precision, device and the speed-up modes in
+use, so operators can compare real-time factors of the modes they have run on
+a node and pick the fastest. Parallel track workers update the file at the
+same time, so each update holds a lock file and replaces the JSON atomically.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from transcript_cache import DEFAULT_CACHE_DIR
+
+THROUGHPUT_PATH = DEFAULT_CACHE_DIR / "throughput.json"
+LOCK_TIMEOUT_SECONDS = 10.0
+STALE_LOCK_SECONDS = 60.0  # A lock older than this was left by a crashed process
+
+
+def throughput_key(model_name, engine, precision, device, modes=()):
+    """
+    Configuration key for a throughput entry.
+
+    Args:
+        model_name: Whisper model name
+        engine: Engine name
+        precision: Resolved precision
+        device: Device the model runs on
+        modes: Speed-up modes in use, e.g. ["batch4", "vad"] (empty for plain sequential decoding)
+    """
+    key = f"{model_name}/{engine}/{precision}/{device}"
+    return f"{key}/{'+'.join(modes)}" if modes else key
+
+
+def load_throughput(path=THROUGHPUT_PATH):
+    """Recorded throughput entries, keyed by throughput_key()"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_throughput(key, audio_seconds, elapsed_seconds, path=THROUGHPUT_PATH):
+    """
+    Add one transcription to the running totals for a configuration.
+
+    Args:
+        key: Configuration key from throughput_key()
+        audio_seconds: Duration of the transcribed audio
+        elapsed_seconds: Wall time spent transcribing it
+
+    Returns:
+        The updated entry
+    """
+    entry = {"runs": 0, "audio_seconds": 0.0, "elapsed_seconds": 0.0}
+    lock_path = path.with_name(path.name + ".lock")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _acquire_lock(lock_path)
+    except OSError as e:
+        print(f"⚠️  Could not record throughput: {e}", file=sys.stderr, flush=True)
+        return _add_run(entry, audio_seconds, elapsed_seconds)
+
+    try:
+        entries = load_throughput(path)
+        entry = _add_run(entries.get(key, entry), audio_seconds, elapsed_seconds)
+        entries[key] = entry
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"⚠️  Could not record throughput: {e}", file=sys.stderr, flush=True)
+    finally:
+        try:
+            os.unlink(lock_path)
+        except OSError:
+            pass
+    return entry
+
+
+def _add_run(entry, audio_seconds, elapsed_seconds):
+    entry["runs"] += 1
+    entry["audio_seconds"] = round(entry["audio_seconds"] + audio_seconds, 2)
+    entry["elapsed_seconds"] = round(entry["elapsed_seconds"] + elapsed_seconds, 2)
+    entry["rtf"] = round(entry["elapsed_seconds"] / entry["audio_seconds"], 4) if entry["audio_seconds"] else None
+    return entry
+
+
+def _acquire_lock(lock_path, timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Take an exclusive lock file (created with O_EXCL, so this works on every platform).
+
+    Raises:
+        OSError: If another process still holds the lock after `timeout` seconds
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.unlink(lock_path)
+                    continue
+            except OSError:
+                continue  # Released between the two calls
+            if time.monotonic() > deadline:
+                raise OSError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.05)
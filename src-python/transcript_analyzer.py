@@ -3,6 +3,8 @@ import json
 from pathlib import Path
 from datetime import datetime
 
+from segment_store import SegmentStore
+
 class OllamaTranscriptAnalyzer:
     def __init__(self, ollama_host="http://192.168.68.10:11434", base_dir=None):
         self.ollama_host = ollama_host
@@ -96,8 +98,35 @@ class OllamaTranscriptAnalyzer:
         print(f"✅ Split into {len(chunks)} chunks")
         return chunks
     
-    def analyze_transcript(self, transcript_file, model="gemma3n:latest", analysis_type="summary", output_path=None):
-        """Analyze transcript using Ollama with Gemma3n - with chunking support"""
+    def read_time_range(self, transcript_file, start=0.0, end=None):
+        """
+        Read the part of a transcript between two times (in seconds).
+
+        Uses the segment store saved next to the transcript, so only that
+        range is read from disk.
+
+        Raises:
+            FileNotFoundError: If the transcript has no segment store (written
+                before the store existed), so the range cannot be honoured
+        """
+        try:
+            store = SegmentStore(transcript_file)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"No segment store for {Path(transcript_file).name}; re-transcribe it to analyze a time range"
+            ) from None
+        with store:
+            print(f"⏱️  Loading {start:.0f}s-{'end' if end is None else f'{end:.0f}s'} "
+                  f"from segment store ({len(store)} segments)")
+            return store.text(start, end)
+
+    def analyze_transcript(self, transcript_file, model="gemma3n:latest", analysis_type="summary", output_path=None,
+                           time_range=None):
+        """
+        Analyze transcript using Ollama with Gemma3n - with chunking support.
+        Pass time_range=(start, end) in seconds to analyze only part of the session
+        (see read_time_range; requires the transcript's segment store).
+        """
 
         # Read transcript
         transcript_path = Path(transcript_file)
@@ -110,8 +139,11 @@ class OllamaTranscriptAnalyzer:
                 print(f"❌ Also checked: {transcript_path}")
                 return None
 
-        with open(transcript_path, 'r', encoding='utf-8') as f:
-            transcript_content = f.read()
+        if time_range:
+            transcript_content = self.read_time_range(transcript_path, *time_range)
+        else:
+            with open(transcript_path, 'r', encoding='utf-8') as f:
+                transcript_content = f.read()
 
         # Check transcript size
         char_count = len(transcript_content)
@@ -0,0 +1,146 @@
+"""
+Content-addressed transcript cache.
+Re-running the same recording (UI retries, a different analysis model, another
+output folder) serves the stored transcript instead of transcribing again.
+
+Entries are found with a cheap sampled fingerprint (size plus head, middle and
+tail blocks). The full streaming hash of the media bytes is only computed to
+confirm a candidate hit, or once when a new result is stored.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from checkpoint import json_default
+
+CACHE_VERSION = 1
+SAMPLE_BYTES = 1024 * 1024  # Bytes read at each sampled position
+HASH_BLOCK_BYTES = 8 * 1024 * 1024  # Read size for the full streaming hash
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("MEETING_RECAP_CACHE_DIR", Path.home() / ".cache" / "meeting-recap")
+)
+
+
+def sampled_fingerprint(media_path):
+    """
+    Hash the file size and three sampled blocks.
+
+    Reads at most 3 MiB regardless of file size, so it is safe to run on
+    every request as a pre-check.
+    """
+    path = Path(media_path)
+    size = path.stat().st_size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+
+    with open(path, 'rb') as f:
+        for position in (0, max(0, size // 2 - SAMPLE_BYTES // 2), max(0, size - SAMPLE_BYTES)):
+            f.seek(position)
+            digest.update(f.read(SAMPLE_BYTES))
+
+    return digest.hexdigest()
+
+
+def content_hash(media_path):
+    """Stream the whole file through BLAKE2b"""
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(HASH_BLOCK_BYTES)
+    view = memoryview(buffer)
+
+    with open(media_path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+
+    return digest.hexdigest()
+
+
+def settings_key(settings):
+    """Stable short hash of the options that affect a transcript"""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class TranscriptCache:
+    """Persistent cache of transcription results keyed by media content and settings"""
+
+    def __init__(self, cache_dir=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root cache directory (default: ~/.cache/meeting-recap)
+        """
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR) / "transcripts"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, media_path, settings):
+        return self.cache_dir / f"{sampled_fingerprint(media_path)}_{settings_key(settings)}.json"
+
+    def has_entry(self, media_path, settings):
+        """Cheap check for a cached result (sampled fingerprint only; lookup() verifies it)"""
+        try:
+            return self._entry_path(media_path, settings).exists()
+        except OSError:
+            return False
+
+    def lookup(self, media_path, settings):
+        """
+        Return the cached result for this media and settings, or None.
+
+        Args:
+            media_path: Input media file
+            settings: Dict of model/engine/decode options
+        """
+        try:
+            entry_path = self._entry_path(media_path, settings)
+            if not entry_path.exists():
+                self.misses += 1
+                return None
+
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+
+            # Sampled fingerprints can collide; confirm against the full hash
+            if entry.get("version") != CACHE_VERSION or entry.get("content_hash") != content_hash(media_path):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            os.utime(entry_path)  # Track recency for manual pruning
+            print(f"⚡ Transcript cache hit for {Path(media_path).name}", file=sys.stderr, flush=True)
+            return entry["result"]
+
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Transcript cache lookup failed: {e}", file=sys.stderr, flush=True)
+            self.misses += 1
+            return None
+
+    def store(self, media_path, settings, result):
+        """Save a transcription result for later runs on the same media"""
+        try:
+            entry_path = self._entry_path(media_path, settings)
+            entry = {
+                "version": CACHE_VERSION,
+                "content_hash": content_hash(media_path),
+                "source": str(Path(media_path).resolve()),
+                "settings": settings,
+                "result": result,
+            }
+
+            tmp_path = entry_path.with_name(entry_path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, default=json_default)
+            os.replace(tmp_path, entry_path)
+            return True
+
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️  Could not cache transcript: {e}", file=sys.stderr, flush=True)
+            return False
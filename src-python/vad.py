@@ -0,0 +1,259 @@
+"""
+Voice activity and silence detection helpers.
+Finds speech regions from frame energy and zero-crossing rate, and splits long
+recordings at pauses. All frame features are computed with vectorized NumPy
+over the whole waveform.
+"""
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30  # Analysis frame length
+
+
+def frame_energy(audio, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """
+    Compute per-frame RMS energy in dBFS.
+
+    Returns:
+        np.ndarray with one value per complete frame
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20 * np.log10(rms + 1e-10)
+
+
+def zero_crossing_rate(audio, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS):
+    """
+    Compute the fraction of sign changes per frame.
+
+    Returns:
+        np.ndarray with one value in [0, 1] per complete frame
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    signs = np.signbit(frames)
+    return np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1)
+
+
+def _runs(mask):
+    """Return (start, end) frame indices of each run of True values"""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(audio, sample_rate=SAMPLE_RATE, energy_margin_db=12.0, floor_db=-55.0,
+                  fricative_zcr=0.3, max_noise_zcr=0.6, min_speech_ms=250,
+                  min_silence_ms=600, pad_ms=200):
+    """
+    Find speech regions in a waveform.
+
+    A frame is voiced when its energy clears an adaptive threshold set
+    `energy_margin_db` above the recording's noise floor. Quieter frames with
+    a fricative-like zero-crossing rate also count, while loud frames whose
+    zero-crossing rate looks like broadband noise (table knocks, rustling)
+    do not. Short gaps are bridged and short blips dropped.
+
+    Args:
+        audio: float32 waveform
+        sample_rate: Waveform sample rate
+        energy_margin_db: Threshold above the noise floor (10th percentile energy)
+        floor_db: Absolute minimum threshold in dBFS
+        fricative_zcr: ZCR above which near-threshold frames count as speech
+        max_noise_zcr: ZCR above which frames are treated as noise
+        min_speech_ms: Drop speech runs shorter than this
+        min_silence_ms: Bridge silences shorter than this
+        pad_ms: Padding kept either side of each region
+
+    Returns:
+        List of (start_sample, end_sample) tuples in time order
+    """
+    energy = frame_energy(audio, sample_rate)
+    if len(energy) == 0:
+        return []
+    zcr = zero_crossing_rate(audio, sample_rate)
+
+    threshold = max(np.percentile(energy, 10) + energy_margin_db, floor_db)
+    voiced = (energy > threshold) | ((energy > threshold - 6.0) & (zcr > fricative_zcr))
+    voiced &= zcr < max_noise_zcr
+
+    # Bridge short pauses inside speech
+    starts, ends = _runs(~voiced)
+    short_gaps = (ends - starts) * FRAME_MS < min_silence_ms
+    interior = (starts > 0) & (ends < len(voiced))
+    for start, end in zip(starts[short_gaps & interior], ends[short_gaps & interior]):
+        voiced[start:end] = True
+
+    # Drop isolated blips
+    starts, ends = _runs(voiced)
+    keep = (ends - starts) * FRAME_MS >= min_speech_ms
+
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    pad = int(sample_rate * pad_ms / 1000)
+    regions = []
+    for start, end in zip(starts[keep] * frame_len, ends[keep] * frame_len):
+        start = max(0, int(start) - pad)
+        end = min(len(audio), int(end) + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechMap:
+    """
+    Maps speech regions onto a compact waveform and back.
+
+    Regions are laid end to end with a short silent gap between them; segment
+    timestamps on the compact timeline are mapped back to the original one.
+    """
+
+    def __init__(self, regions, total_samples, sample_rate=SAMPLE_RATE, gap_seconds=0.3):
+        """
+        Initialize the map.
+
+        Args:
+            regions: (start_sample, end_sample) speech regions in time order
+            total_samples: Length of the original waveform
+            sample_rate: Waveform sample rate
+            gap_seconds: Silence inserted between regions in the compact waveform
+        """
+        self.regions = list(regions)
+        self.total_samples = total_samples
+        self.sample_rate = sample_rate
+        self.gap = int(gap_seconds * sample_rate)
+
+        lengths = np.array([end - start for start, end in self.regions], dtype=np.int64)
+        self.packed_starts = np.concatenate(([0], np.cumsum(lengths + self.gap)[:-1])) \
+            if len(lengths) else np.zeros(0, dtype=np.int64)
+        self.lengths = lengths
+
+    @classmethod
+    def from_audio(cls, audio, sample_rate=SAMPLE_RATE, **kwargs):
+        """Build a map from detect_speech() on a waveform"""
+        return cls(detect_speech(audio, sample_rate, **kwargs), len(audio), sample_rate)
+
+    @property
+    def is_empty(self):
+        return not self.regions
+
+    @property
+    def speech_samples(self):
+        return int(self.lengths.sum())
+
+    def packed_audio(self, audio):
+        """Concatenate the speech regions, separated by silent gaps"""
+        packed = np.zeros(self.speech_samples + self.gap * max(len(self.regions) - 1, 0),
+                          dtype=np.float32)
+        for (start, end), offset in zip(self.regions, self.packed_starts):
+            packed[offset:offset + end - start] = audio[start:end]
+        return packed
+
+    def to_original(self, seconds, is_end=False):
+        """
+        Map a compact-timeline timestamp back to the original timeline.
+
+        Timestamps inside a gap snap to the nearest region edge; an end time
+        exactly on a region boundary stays with the region it closes.
+        """
+        sample = seconds * self.sample_rate
+        side = 'left' if is_end else 'right'
+        i = max(0, int(np.searchsorted(self.packed_starts, sample, side=side)) - 1)
+        local = min(max(sample - self.packed_starts[i], 0), self.lengths[i])
+        return float(self.regions[i][0] + local) / self.sample_rate
+
+    def remap_segments(self, segments):
+        """Rewrite segment and word timestamps onto the original timeline in place"""
+        for segment in segments:
+            segment['start'] = self.to_original(segment['start'])
+            segment['end'] = max(self.to_original(segment['end'], is_end=True), segment['start'])
+            for word in segment.get('words') or []:
+                word['start'] = self.to_original(word['start'])
+                word['end'] = max(self.to_original(word['end'], is_end=True), word['start'])
+        return segments
+
+    def report(self):
+        """Summarise how much audio the pre-pass skipped"""
+        total = self.total_samples / self.sample_rate
+        speech = self.speech_samples / self.sample_rate
+        return {
+            'regions': len(self.regions),
+            'total_seconds': round(total, 1),
+            'speech_seconds': round(speech, 1),
+            'skipped_seconds': round(total - speech, 1),
+            'skipped_percent': round(100 * (total - speech) / total, 1) if total else 0.0,
+        }
+
+
+def split_at_silence(audio, span_seconds, sample_rate=SAMPLE_RATE,
+                     search_seconds=30.0, smooth_ms=500):
+    """
+    Cut a waveform into independent spans of roughly `span_seconds` each.
+
+    Each cut is placed at the quietest stretch within `search_seconds` of the
+    nominal boundary, so spans start and end in silence rather than mid-word.
+
+    Args:
+        audio: float32 waveform
+        span_seconds: Target span length in seconds
+        sample_rate: Waveform sample rate
+        search_seconds: How far either side of a nominal boundary to look
+        smooth_ms: Width of the energy smoothing window used to find pauses
+
+    Returns:
+        List of (start_sample, end_sample) tuples covering the whole waveform
+    """
+    total = len(audio)
+    span = int(span_seconds * sample_rate)
+    if total <= span:
+        return [(0, total)]
+
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    energy = frame_energy(audio, sample_rate)
+
+    # Smooth so a cut lands in a pause, not a single quiet frame
+    width = max(1, smooth_ms // FRAME_MS)
+    smoothed = np.convolve(energy, np.ones(width) / width, mode='same')
+
+    # Never search past the midpoint between boundaries
+    search = int(min(search_seconds, span_seconds / 2) * 1000 / FRAME_MS)
+    cuts = [0]
+    for boundary in range(span, total - span // 2, span):
+        centre = boundary // frame_len
+        lo = max(cuts[-1] // frame_len + 1, centre - search)
+        hi = min(len(smoothed), centre + search)
+        if hi <= lo:
+            continue
+        quietest = lo + int(np.argmin(smoothed[lo:hi]))
+        cuts.append(quietest * frame_len + frame_len // 2)
+    cuts.append(total)
+
+    return [(start, end) for start, end in zip(cuts[:-1], cuts[1:]) if end > start]
+
+
+def find_quiet_point(audio, lo, hi, sample_rate=SAMPLE_RATE, smooth_ms=500):
+    """
+    Find the quietest stretch of audio[lo:hi].
+
+    Returns:
+        Sample index (absolute within `audio`) at the centre of the quietest frame
+    """
+    window = audio[lo:hi]
+    energy = frame_energy(window, sample_rate)
+    if len(energy) == 0:
+        return hi
+
+    width = max(1, smooth_ms // FRAME_MS)
+    smoothed = np.convolve(energy, np.ones(width) / width, mode='same')
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    return lo + int(np.argmin(smoothed)) * frame_len + frame_len // 2
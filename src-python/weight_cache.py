@@ -0,0 +1,277 @@
+"""
+Converted weight cache for openai-whisper models.
+whisper.load_model unpickles the full checkpoint and the FP16 path then
+converts every tensor with .half() on each start. Here the weights are written
+once per (model, precision), already converted, into a single flat file with a
+JSON manifest of tensor offsets. A cold start memory-maps that file and builds
+the model around views of it, so nothing is deserialized or copied on CPU and
+parallel workers share the same page-cache pages. The last measured load time
+from each source is kept next to the manifest for `--check`.
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from transcript_cache import DEFAULT_CACHE_DIR
+
+CACHE_VERSION = 1
+ALIGNMENT = 64  # Byte alignment of each tensor in the flat file
+
+DEFAULT_WEIGHT_DIR = DEFAULT_CACHE_DIR / "weights"
+WEIGHT_CACHE_ENABLED = os.environ.get("WHISPER_WEIGHT_CACHE", "1") != "0"
+
+PRECISION_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+}
+
+MANIFEST_NAME = "manifest.json"
+WEIGHTS_NAME = "weights.bin"
+LOAD_TIMES_NAME = "load_times.json"
+
+# Sources a model can be loaded from, as returned by load_model()
+SOURCE_CACHE = "weight cache"
+SOURCE_CHECKPOINT = "checkpoint"
+
+
+def cache_path(model_name, precision, cache_dir=DEFAULT_WEIGHT_DIR):
+    """Directory holding the converted weights for one (model, precision)"""
+    return Path(cache_dir) / f"{model_name}-{precision}"
+
+
+def _checkpoint_source(model_name):
+    """Identify the source checkpoint, so a changed download invalidates the cache"""
+    import whisper
+
+    return whisper._MODELS.get(model_name, model_name)
+
+
+def _tensors_to_store(model):
+    """State dict plus dense non-persistent buffers (e.g. the decoder's causal mask)"""
+    tensors = dict(model.state_dict())
+    for name, buffer in model.named_buffers():
+        if name not in tensors and buffer.layout == torch.strided:
+            tensors[name] = buffer
+    return tensors
+
+
+def write_weight_cache(model, model_name, precision, cache_dir=DEFAULT_WEIGHT_DIR):
+    """
+    Write a loaded model's weights into the flat cache layout.
+
+    Args:
+        model: Loaded openai-whisper model, already in the target precision
+        model_name: Whisper model size
+        precision: Precision the weights are stored in (fp32, fp16)
+        cache_dir: Root of the weight cache
+
+    Returns:
+        Path to the cache directory
+    """
+    target = cache_path(model_name, precision, cache_dir)
+    tmp_dir = target.with_name(target.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    entries = {}
+    with open(tmp_dir / WEIGHTS_NAME, 'wb') as f:
+        for name, tensor in _tensors_to_store(model).items():
+            data = tensor.detach().to("cpu").contiguous()
+            padding = -f.tell() % ALIGNMENT
+            f.write(b"\0" * padding)
+            entries[name] = {
+                "dtype": str(data.dtype).replace("torch.", ""),
+                "shape": list(data.shape),
+                "offset": f.tell(),
+                "nbytes": data.numel() * data.element_size(),
+            }
+            f.write(data.view(torch.uint8).numpy().tobytes() if data.numel() else b"")
+
+    heads = model.alignment_heads.to_dense().nonzero().tolist()
+    manifest = {
+        "version": CACHE_VERSION,
+        "model": model_name,
+        "precision": precision,
+        "source": _checkpoint_source(model_name),
+        "dims": vars(model.dims),
+        "alignment_heads": heads,
+        "tensors": entries,
+    }
+    with open(tmp_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+    return target
+
+
+def _read_manifest(model_name, precision, cache_dir):
+    """Return the manifest if a valid cache exists, else None"""
+    manifest_path = cache_path(model_name, precision, cache_dir) / MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("version") != CACHE_VERSION or manifest.get("source") != _checkpoint_source(model_name):
+        return None
+    return manifest
+
+
+def _empty_model(dims):
+    """
+    Build a Whisper model whose parameters live on the meta device.
+
+    Whisper.__init__ cannot run under the meta device (its alignment-head
+    buffer is sparse), so the encoder and decoder are built here directly.
+    """
+    from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+    dims = ModelDimensions(**dims)
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer
+        )
+    return model
+
+
+def load_weight_cache(model_name, precision, device, cache_dir=DEFAULT_WEIGHT_DIR):
+    """
+    Build a model from memory-mapped cached weights.
+
+    Args:
+        model_name: Whisper model size
+        precision: Stored precision (fp32, fp16)
+        device: Device to place the model on (CPU tensors stay mapped)
+        cache_dir: Root of the weight cache
+
+    Returns:
+        The model, or None if no valid cache exists
+    """
+    manifest = _read_manifest(model_name, precision, cache_dir)
+    if manifest is None:
+        return None
+
+    # Copy-on-write mapping: pages are read lazily and shared with other processes
+    weights_path = cache_path(model_name, precision, cache_dir) / WEIGHTS_NAME
+    flat = torch.from_numpy(np.memmap(weights_path, dtype=np.uint8, mode='c'))
+
+    tensors = {}
+    for name, entry in manifest["tensors"].items():
+        data = flat[entry["offset"]:entry["offset"] + entry["nbytes"]]
+        tensors[name] = data.view(getattr(torch, entry["dtype"])).reshape(entry["shape"])
+
+    model = _empty_model(manifest["dims"])
+    state_keys = set(model.state_dict())
+    model.load_state_dict({k: v for k, v in tensors.items() if k in state_keys}, assign=True)
+
+    for name, tensor in tensors.items():
+        if name not in state_keys:
+            module_name, _, buffer_name = name.rpartition(".")
+            model.get_submodule(module_name)._buffers[buffer_name] = tensor
+
+    heads = torch.zeros(model.dims.n_text_layer, model.dims.n_text_head, dtype=torch.bool)
+    for layer, head in manifest["alignment_heads"]:
+        heads[layer, head] = True
+    model.register_buffer("alignment_heads", heads.to_sparse(), persistent=False)
+
+    if any(tensor.is_meta for tensor in list(model.parameters()) + list(model.buffers())):
+        raise RuntimeError(f"Weight cache for {model_name} ({precision}) is incomplete")
+
+    return model.to(device)
+
+
+def load_model(model_name, device, precision, cache_dir=DEFAULT_WEIGHT_DIR):
+    """
+    Load an openai-whisper model through the weight cache.
+
+    The first load of a (model, precision) goes through whisper.load_model
+    and writes the converted cache; later loads map it directly.
+
+    Args:
+        model_name: Whisper model size
+        device: Device to place the model on
+        precision: fp32 or fp16
+        cache_dir: Root of the weight cache
+
+    Returns:
+        Tuple of (model, source) where source is SOURCE_CACHE or SOURCE_CHECKPOINT
+    """
+    if WEIGHT_CACHE_ENABLED:
+        try:
+            started = time.perf_counter()
+            model = load_weight_cache(model_name, precision, device, cache_dir)
+            if model is not None:
+                record_load_time(model_name, precision, SOURCE_CACHE, time.perf_counter() - started, cache_dir)
+                return model, SOURCE_CACHE
+        except Exception as e:
+            print(f"⚠️  Weight cache unreadable, reloading checkpoint: {e}", file=sys.stderr, flush=True)
+
+    started = time.perf_counter()
+    model = load_checkpoint(model_name, device, precision)
+    load_seconds = time.perf_counter() - started
+
+    if WEIGHT_CACHE_ENABLED:
+        try:
+            write_weight_cache(model, model_name, precision, cache_dir)
+            print(f"💾 Converted weights cached for {model_name} ({precision})", file=sys.stderr, flush=True)
+            record_load_time(model_name, precision, SOURCE_CHECKPOINT, load_seconds, cache_dir)
+        except OSError as e:
+            print(f"⚠️  Could not write weight cache: {e}", file=sys.stderr, flush=True)
+
+    return model, SOURCE_CHECKPOINT
+
+
+def load_checkpoint(model_name, device, precision):
+    """Load a model the uncached way: unpickle the checkpoint, then convert its precision"""
+    import whisper
+
+    model = whisper.load_model(model_name, device=device)
+    if PRECISION_DTYPES[precision] != torch.float32:
+        model.to(PRECISION_DTYPES[precision])
+    return model
+
+
+def record_load_time(model_name, precision, source, seconds, cache_dir=DEFAULT_WEIGHT_DIR):
+    """Keep the last measured load time from `source` next to the cache manifest"""
+    target = cache_path(model_name, precision, cache_dir)
+    if not target.is_dir():
+        return
+    times = load_times(model_name, precision, cache_dir)
+    times[source] = round(seconds, 3)
+    try:
+        with open(target / LOAD_TIMES_NAME, 'w', encoding='utf-8') as f:
+            json.dump(times, f)
+    except OSError:
+        pass
+
+
+def load_times(model_name, precision, cache_dir=DEFAULT_WEIGHT_DIR):
+    """Last measured load seconds per source (SOURCE_CACHE, SOURCE_CHECKPOINT); empty if none"""
+    try:
+        with open(cache_path(model_name, precision, cache_dir) / LOAD_TIMES_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cache_info(model_name, precision, cache_dir=DEFAULT_WEIGHT_DIR):
+    """Size of the cached weights in bytes, or None if not converted yet"""
+    if _read_manifest(model_name, precision, cache_dir) is None:
+        return None
+    return (cache_path(model_name, precision, cache_dir) / WEIGHTS_NAME).stat().st_size
+
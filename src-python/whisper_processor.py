@@ -10,12 +10,15 @@ import os
 import sys
 import argparse
 import subprocess
+import tempfile
+import time
 from pathlib import Path
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
 try:
+    import numpy as np
     import torch
     import whisper
 except ImportError:
@@ -25,17 +28,78 @@ except ImportError:
     print("  pip install openai-whisper")
     sys.exit(1)
 
+from alignment import get_feature_cache
+from audio_cache import AUDIO_CACHE_ENABLED, AudioCache, cached_pcm_path
+from audio_io import SAMPLE_RATE, decode_audio, probe_duration, write_wav
+from batch_pipeline import BatchPipeline, expand_inputs, is_batch_input
+from checkpoint import TranscriptionCheckpoint
+from engines import ENGINES, create_engine
+from model_registry import get_registry
+from transcript_cache import TranscriptCache, sampled_fingerprint
+from parallel_transcribe import offset_segments, stitch_segments, transcribe_parallel
+from progress import ProgressReporter
+from repetition import RepetitionDetector
+from streaming import stream_batches
+from segment_store import SegmentStore, write_segment_store
+from multitrack import list_tracks, transcribe_tracks
+from packing import PackedSpeechMap
+from vad import SpeechMap, find_quiet_point
+
 
 class WhisperProcessor:
-    def __init__(self, model_name="medium", device=None):
+    def __init__(self, model_name="medium", device=None, workers=1, threads_per_worker=None,
+                 engine="openai", precision=None, batch_size=1, vad=False,
+                 checkpoint_interval=None, use_cache=True, repetition_window=8,
+                 repetition_threshold=0.8, adaptive=False, word_timestamps=False,
+                 draft_model=None, draft_tokens=4, compile_mode=None, on_progress=None, stream=False,
+                 pack=False, multitrack=False, audio_cache=AUDIO_CACHE_ENABLED):
         """
         Initialize Whisper processor with anti-repetition settings.
 
         Args:
             model_name: Whisper model size
             device: Computing device (auto-detects CUDA if available)
+            workers: CPU worker processes for parallel transcription (1 = off)
+            threads_per_worker: Torch threads per worker (default: cores / workers)
+            engine: Inference engine ("openai" or "faster-whisper")
+            precision: Engine precision, e.g. fp16 or int8 (default depends on engine and device)
+            batch_size: 30 s windows encoded/decoded together (1 = sequential)
+            vad: Skip non-speech audio with a voice activity pre-pass before decoding
+            checkpoint_interval: Seconds of audio between resumable checkpoints in
+                transcribe_file (None = transcribe in one pass)
+            use_cache: Serve repeat runs on identical media from the transcript cache
+            repetition_window: Recent segments each segment is checked against for repetition
+            repetition_threshold: Shingle overlap above which a segment is dropped (0-1)
+            adaptive: Decode greedily first and re-run beam search only on windows
+                that fail the compression ratio / logprob checks
+            word_timestamps: Align words during transcription instead of on
+                demand with align_words / align_transcript
+            draft_model: Small model (e.g. "tiny" or "base") for speculative greedy
+                decoding; the output matches the main model's greedy decoding
+            draft_tokens: Tokens the draft model proposes per verification pass
+            compile_mode: Run a compiled model ("trace" or "inductor"); falls
+                back to eager when compilation is unavailable
+            on_progress: Optional callback receiving rate-limited progress events
+                (decoded/total seconds, real-time factor, ETA) during transcription
+            stream: Transcribe files in bounded batches of 30 s windows read from
+                FFmpeg (or the audio cache), so memory does not grow with duration
+            pack: Fill each 30 s encoder window with several short VAD speech regions
+                and split the segments back onto them (implies vad)
+            multitrack: Transcribe each audio track of a file (or each file of a ZIP)
+                separately, with VAD and across `workers` processes on the CPU, and
+                merge them into one transcript labelled by track (implies vad)
+            audio_cache: Keep decoded PCM and log-mel features on disk for later runs
+                (default: WHISPER_AUDIO_CACHE=1 in the environment)
         """
         self.model_name = model_name
+        self.workers = max(1, int(workers or 1))
+        self.threads_per_worker = threads_per_worker
+        self.batch_size = max(1, int(batch_size or 1))
+        self.vad = vad or pack or multitrack
+        self.checkpoint_interval = checkpoint_interval
+        self.cache = TranscriptCache() if use_cache else None
+        self.repetition_window = repetition_window
+        self.repetition_threshold = repetition_threshold
 
         # Auto-detect best device
         if device is None:
@@ -49,8 +113,53 @@ class WhisperProcessor:
         else:
             self.device = device
 
+        self.engine = create_engine(engine, model_name, self.device, precision=precision)
+        self.precision = self.engine.precision
+        self.device = self.engine.device  # Some engines/precisions are CPU-only
+
+        if not self.engine.beam_search:
+            print(f"ℹ️  The {engine} engine decodes greedily; beam search (beam_size 5) is not used",
+                  file=sys.stderr, flush=True)
+        if adaptive and not self.engine.adaptive_decoding:
+            raise ValueError(f"Engine '{engine}' does not support adaptive decoding")
+        self.adaptive = adaptive
+        self.word_timestamps = word_timestamps
+
+        if draft_model and not self.engine.speculative_decoding:
+            raise ValueError(f"Engine '{engine}' does not support speculative decoding")
+        self.draft_model_name = draft_model
+        self.draft_tokens = draft_tokens
+        self.draft = None
+
+        if compile_mode and not self.engine.compilable:
+            raise ValueError(f"Engine '{engine}' does not support compiled inference")
+        self.compile_mode = compile_mode
+
+        if stream and not self.engine.streaming:
+            raise ValueError(f"Engine '{engine}' does not support streaming transcription")
+        if stream and (self.vad or self.workers > 1):
+            raise ValueError("Streaming transcription cannot be combined with VAD or parallel workers")
+        self.stream = stream
+
+        if pack and not self.engine.window_packing:
+            raise ValueError(f"Engine '{engine}' does not support packed windows")
+        if pack and self.workers > 1 and not multitrack:
+            raise ValueError("Packed windows cannot be combined with parallel workers")
+        self.pack = pack
+        self.multitrack = multitrack
+
+        # Encoder output kept from batched transcription for later word alignment,
+        # keyed by the media fingerprint and the audio's offset on its timeline
+        self.feature_cache = get_feature_cache()
+        self.media_key = None
+        # Decoded PCM and log-mel features, memory-mapped across runs and models
+        self.audio_cache = AudioCache() if audio_cache else None
+        self.media_offset = 0.0
         self.model = None
 
+        self.on_progress = on_progress
+        self._progress = None  # Reporter spanning a multi-chunk run (transcribe_resumable)
+
     def check_system(self):
         """Check system requirements and GPU availability"""
         print("\n" + "=" * 60)
@@ -69,6 +178,16 @@ class WhisperProcessor:
         else:
             print("⚠️  CUDA not available - will use CPU (slow)")
 
+        # Check native bf16 (AVX512_BF16 / AMX) for --precision bf16
+        from cpu_features import bf16_support
+
+        bf16 = bf16_support()
+        if bf16["native"]:
+            units = ", ".join(flag for flag in ("avx512_bf16", "amx_bf16") if bf16[flag]) or "oneDNN"
+            print(f"✅ CPU bf16: native ({units})")
+        else:
+            print("⚠️  CPU bf16: not native - bf16 mode falls back to fp32")
+
         # Check FFmpeg
         try:
             result = subprocess.run(['ffmpeg', '-version'],
@@ -82,155 +201,321 @@ class WhisperProcessor:
             print("❌ FFmpeg not installed")
             print("   Install: winget install FFmpeg")
 
+        # Check converted weight cache and model load times
+        if self.engine.name == "openai":
+            from weight_cache import SOURCE_CACHE, SOURCE_CHECKPOINT, cache_info, load_times
+
+            stored = self.engine.weight_precision
+            size = cache_info(self.model_name, stored)
+            if size is None:
+                print(f"⚠️  Weight cache: {self.model_name} ({stored}) not converted yet "
+                      f"(first load converts it)")
+            else:
+                print(f"✅ Weight cache: {self.model_name} ({stored}) {size / 1024**3:.2f} GB, memory-mapped")
+
+            # Last measured loads, recorded by earlier runs and `benchmarks.py load`
+            times = load_times(self.model_name, stored)
+            cached, checkpoint = times.get(SOURCE_CACHE), times.get(SOURCE_CHECKPOINT)
+            if cached is not None and checkpoint is not None:
+                print(f"⏱️  Load time: {self.model_name} ({stored}) {cached:.2f}s from the weight cache, "
+                      f"{checkpoint:.2f}s from the checkpoint ({checkpoint / max(cached, 1e-3):.1f}x faster)")
+            elif times:
+                source, seconds = next(iter(times.items()))
+                print(f"⏱️  Load time: {self.model_name} ({stored}) {seconds:.2f}s from the {source} "
+                      f"(run benchmarks.py load to compare)")
+
+        if self.audio_cache is not None:
+            stats = self.audio_cache.stats()
+            print(f"✅ Audio cache: {stats['recordings']} recordings, {stats['bytes'] / 1024**3:.2f} GB "
+                  f"(limit {stats['max_bytes'] / 1024**3:.0f} GB)")
+
+        # Measured throughput of the configurations run on this machine
+        from throughput import load_throughput
+
+        for key, entry in sorted(load_throughput().items(), key=lambda item: item[1]["rtf"] or 0):
+            print(f"📈 Throughput: {key} RTF {entry['rtf']:.3f} over {entry['runs']} run(s)")
+
         print("=" * 60 + "\n")
 
         return torch.cuda.is_available()
 
     def load_model(self):
-        """Load Whisper model with optimizations"""
+        """Load Whisper model with optimizations (shared through the model registry)"""
         print(f"📥 Loading Whisper model: {self.model_name}")
         print(f"🖥️  Device: {self.device}")
 
         try:
-            self.model = whisper.load_model(self.model_name, device=self.device)
-
-            if self.device == "cuda":
-                # Optimize for RTX 5090
-                self.model.half()  # Use FP16 for faster processing
-                print("✅ Model loaded with FP16 optimization")
-            else:
-                print("✅ Model loaded (CPU mode)")
+            self.model = get_registry().get(
+                self.model_name, self.device, self.precision, self._model_loader(),
+                engine=self.engine.name if not self.compile_mode else f"{self.engine.name}+{self.compile_mode}"
+            )
 
+            if self.draft_model_name:
+                # The draft comes from the same registry, so it stays resident between runs
+                from speculative import check_draft_compatible
+
+                print(f"📥 Loading draft model: {self.draft_model_name}")
+                draft_engine = create_engine(self.engine.name, self.draft_model_name, self.device,
+                                             precision=self.precision)
+                self.draft = get_registry().get(
+                    self.draft_model_name, self.device, self.precision, draft_engine.load,
+                    engine=draft_engine.name
+                )
+                check_draft_compatible(self.model, self.draft)
             return True
 
         except Exception as e:
             print(f"❌ Error loading model: {e}")
             return False
 
-    def extract_audio(self, video_path, output_path):
-        """Extract audio from video file using FFmpeg"""
-        print(f"\n🎵 Extracting audio from: {video_path}")
-        print(f"DEBUG: Output path: {output_path}", file=sys.stderr, flush=True)
+    def _model_loader(self):
+        """Engine loader, followed by compilation when a compile mode is set"""
+        if not self.compile_mode:
+            return self.engine.load
 
-        try:
-            cmd = [
-                'ffmpeg',
-                '-i', str(video_path),
-                '-vn',  # No video
-                '-acodec', 'pcm_s16le',  # PCM 16-bit
-                '-ar', '16000',  # 16kHz sample rate (Whisper's native)
-                '-ac', '1',  # Mono
-                '-y',  # Overwrite
-                str(output_path)
-            ]
+        def load_compiled():
+            from compiled import compile_model
 
-            print(f"DEBUG: Running FFmpeg command", file=sys.stderr, flush=True)
-            print(f"DEBUG: Command: {' '.join(cmd)}", file=sys.stderr, flush=True)
+            model = self.engine.load()
+            return compile_model(model, self.model_name, self.precision, self.compile_mode,
+                                 batch_size=self.batch_size)
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
+        return load_compiled
 
-            print(f"DEBUG: FFmpeg exit code: {result.returncode}", file=sys.stderr, flush=True)
+    def load_audio(self, media_path):
+        """
+        Decode audio from any media file straight into memory.
 
-            if result.returncode == 0:
-                print(f"✅ Audio extracted to: {output_path}")
-                return True
-            else:
-                print(f"❌ FFmpeg error (exit code {result.returncode}):", file=sys.stderr, flush=True)
-                print(f"STDOUT: {result.stdout}", file=sys.stderr, flush=True)
-                print(f"STDERR: {result.stderr}", file=sys.stderr, flush=True)
-                print(f"❌ FFmpeg failed to extract audio", file=sys.stderr, flush=True)
-                return False
+        Args:
+            media_path: Path to the input file (video or audio)
+
+        Returns:
+            float32 NumPy waveform at 16 kHz, or None on failure
+        """
+        print(f"\n🎵 Decoding audio from: {media_path}")
+
+        try:
+            audio = self.decode_media(media_path)
+            print(f"✅ Decoded {len(audio) / SAMPLE_RATE:.1f}s of audio")
+            return audio
 
         except Exception as e:
-            print(f"❌ Exception in extract_audio: {e}", file=sys.stderr, flush=True)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return False
+            print(f"❌ Exception in load_audio: {e}", file=sys.stderr, flush=True)
+            return None
 
-    def detect_repetition(self, segments, threshold=0.8):
+    def decode_media(self, media_path):
+        """Decoded waveform of a media file, memory-mapped from the audio cache when enabled"""
+        if self.audio_cache is None:
+            return decode_audio(media_path)
+        return self.audio_cache.pcm(media_path)
+
+    def _cached_mels(self, audio):
+        """Per-window log-mel features of a waveform served by the audio cache (else None)"""
+        dims = getattr(self.model, 'dims', None)  # openai-whisper style models only
+        if self.audio_cache is None or dims is None:
+            return None
+        return self.audio_cache.window_mels(audio, dims.n_mels, device=self.model.device)
+
+    def detect_repetition(self, segments, threshold=None, detector=None):
         """
         Detect and filter repetitive segments (hallucination fix).
 
+        Each segment is compared against the shingles of the last
+        `repetition_window` segments, so looping hallucinations (A-B-A-B) are
+        caught as well as immediate repeats.
+
         Args:
             segments: List of transcript segments
             threshold: Similarity threshold for detecting repetition (0-1)
+            detector: RepetitionDetector to continue from (e.g. across chunks)
         """
         if not segments:
             return segments
 
-        filtered_segments = [segments[0]]  # Keep first segment
-
-        for i in range(1, len(segments)):
-            current_text = segments[i]['text'].strip().lower()
-            previous_text = segments[i-1]['text'].strip().lower()
-
-            # Calculate simple similarity (word overlap)
-            current_words = set(current_text.split())
-            previous_words = set(previous_text.split())
+        if detector is None:
+            detector = self.repetition_detector(threshold)
+        return detector.filter(segments)
+
+    def repetition_detector(self, threshold=None):
+        """Create a RepetitionDetector with this processor's settings"""
+        return RepetitionDetector(
+            window=self.repetition_window,
+            threshold=threshold or self.repetition_threshold,
+        )
+
+    def settings(self, language=None):
+        """Processor options that change the transcript for a given input"""
+        return {
+            "model": self.model_name,
+            "engine": self.engine.name,
+            "precision": self.precision,
+            "batch_size": self.batch_size,
+            "workers": self.workers,
+            "vad": self.vad,
+            "pack": self.pack,
+            "multitrack": self.multitrack,
+            "adaptive": self.adaptive,
+            "draft_model": self.draft_model_name,
+            "stream": self.stream,
+            "repetition": [self.repetition_window, self.repetition_threshold],
+            "options": self._transcribe_options(language),
+        }
+
+    def _transcribe_options(self, language=None):
+        """Decoding options shared by every transcription path"""
+        # Enhanced transcription options to prevent repetition
+        options = {
+            "language": language,
+            "task": "transcribe",
+            # Anti-repetition settings
+            "temperature": 0.0,  # Deterministic output
+            "compression_ratio_threshold": 2.4,  # Detect repetition
+            "logprob_threshold": -1.0,  # Filter low-confidence
+            "no_speech_threshold": 0.6,  # Skip silence
+            "condition_on_previous_text": False,  # Don't condition on previous (reduces repetition)
+            # Improved quality
+            "beam_size": 5,  # Better search
+            "best_of": 5,  # Sample multiple
+            "patience": 1.0,
+            "word_timestamps": self.word_timestamps,  # Otherwise aligned on demand (align_words)
+        }
+        if not self.engine.beam_search:
+            # Greedy-only engines: keep the settings (and transcript cache key) honest
+            options.update(beam_size=None, best_of=None, patience=None)
+        return options
+
+    def detect_language(self, audio):
+        """Detect the spoken language from the first 30 seconds of a waveform"""
+        language = self.engine.detect_language(self.model, audio)
+        print(f"🌐 Detected language: {language}")
+        return language
+
+    def _feature_recorder(self):
+        """Callback that keeps batched encoder output for later word alignment"""
+        if self.media_key is None:
+            return None
+        offset = int(round(self.media_offset * SAMPLE_RATE))
+
+        def record(start, features):
+            self.feature_cache.put(self.media_key, offset + start, features)
+        return record
+
+    def _run_transcription(self, audio, options, on_encoded=None, on_progress=None):
+        """Dispatch to the streaming, parallel, batched or sequential transcription path"""
+        is_waveform = isinstance(audio, np.ndarray)
+
+        if self.stream and not is_waveform:
+            if options["language"] is None:
+                options["language"] = self.detect_language(decode_audio(audio, duration=30))
+            batches = stream_batches(audio, self.batch_size, self.audio_cache)
+            return self.engine.transcribe_stream(
+                self.model, batches, options, self.batch_size, verbose=True, adaptive=self.adaptive,
+                draft=self.draft, draft_tokens=self.draft_tokens, on_progress=on_progress
+            )
 
-            if current_words and previous_words:
-                overlap = len(current_words & previous_words)
-                similarity = overlap / max(len(current_words), len(previous_words))
+        if self.workers > 1 and self.device == "cpu":
+            if not is_waveform:
+                audio = self.decode_media(audio)
+            if options["language"] is None:
+                options["language"] = self.detect_language(audio)
+            return transcribe_parallel(
+                self.model_name, audio, options,
+                workers=self.workers,
+                threads_per_worker=self.threads_per_worker,
+                engine=self.engine.name,
+                precision=self.precision,
+                adaptive=self.adaptive,
+                draft_model=self.draft_model_name,
+                compile_mode=self.compile_mode,
+                on_progress=on_progress,
+                pcm_path=cached_pcm_path(audio)
+            )
 
-                # Skip if too similar to previous segment
-                if similarity < threshold:
-                    filtered_segments.append(segments[i])
-                else:
-                    print(f"⚠️  Filtered repetition at {segments[i]['start']:.1f}s")
-            else:
-                filtered_segments.append(segments[i])
+        # Packed audio is laid out in fixed 30 s windows, which whisper's seek loop would not respect
+        if self.batch_size > 1 or self.adaptive or self.draft is not None or self.pack:
+            if not is_waveform:
+                audio = self.decode_media(audio)
+            if options["language"] is None:
+                options["language"] = self.detect_language(audio)
+            mels = self._cached_mels(audio)
+            return self.engine.transcribe_batched(
+                self.model, audio, options, self.batch_size, verbose=True, adaptive=self.adaptive,
+                on_encoded=on_encoded, draft=self.draft, draft_tokens=self.draft_tokens,
+                on_progress=on_progress, mels=mels
+            )
 
-        return filtered_segments
+        # Transcribe
+        return self.engine.transcribe(
+            self.model,
+            audio if is_waveform else str(audio),
+            options,
+            verbose=True,
+            on_progress=on_progress
+        )
 
-    def transcribe(self, audio_path, language=None):
+    def transcribe(self, audio, language=None, repetition=None):
         """
         Transcribe audio with anti-repetition settings.
 
         Args:
-            audio_path: Path to audio file
+            audio: Path to audio file, or a decoded float32 waveform at 16 kHz
             language: Force language (None for auto-detect)
+            repetition: RepetitionDetector carried over from earlier audio, so
+                loops spanning a chunk boundary are caught (default: fresh detector)
         """
-        print(f"DEBUG: transcribe - audio_path: {audio_path}", file=sys.stderr, flush=True)
-        print(f"DEBUG: File exists: {os.path.exists(audio_path)}", file=sys.stderr, flush=True)
-        if hasattr(audio_path, 'exists') and audio_path.exists():
-            print(f"DEBUG: File size: {audio_path.stat().st_size}", file=sys.stderr, flush=True)
+        is_waveform = isinstance(audio, np.ndarray)
+        if is_waveform:
+            print(f"DEBUG: transcribe - waveform: {len(audio) / SAMPLE_RATE:.1f}s", file=sys.stderr, flush=True)
+        else:
+            print(f"DEBUG: transcribe - audio_path: {audio}", file=sys.stderr, flush=True)
+            print(f"DEBUG: File exists: {os.path.exists(audio)}", file=sys.stderr, flush=True)
+            if hasattr(audio, 'exists') and audio.exists():
+                print(f"DEBUG: File size: {audio.stat().st_size}", file=sys.stderr, flush=True)
         if self.model is None:
             print("❌ Model not loaded")
             return None
 
-        print(f"\n🎤 Transcribing: {audio_path}")
+        print(f"\n🎤 Transcribing: {'decoded audio' if is_waveform else audio}")
         print("⏳ This may take several minutes...")
 
         try:
-            # Enhanced transcription options to prevent repetition
-            options = {
-                "language": language,
-                "task": "transcribe",
-                "fp16": self.device == "cuda",
-                # Anti-repetition settings
-                "temperature": 0.0,  # Deterministic output
-                "compression_ratio_threshold": 2.4,  # Detect repetition
-                "logprob_threshold": -1.0,  # Filter low-confidence
-                "no_speech_threshold": 0.6,  # Skip silence
-                "condition_on_previous_text": False,  # Don't condition on previous (reduces repetition)
-                # Improved quality
-                "beam_size": 5,  # Better search
-                "best_of": 5,  # Sample multiple
-                "patience": 1.0,
-                "word_timestamps": True,  # Include word-level timestamps for better processing
-            }
-
-            # Transcribe
-            result = self.model.transcribe(
-                str(audio_path),
-                **options,
-                verbose=True
-            )
+            options = self._transcribe_options(language)
+            span_seconds = self._audio_seconds(audio)
+            started = time.perf_counter()  # The VAD pass counts towards the mode's throughput
+
+            speech_map = None
+            if self.vad:
+                if not is_waveform:
+                    audio = self.decode_media(audio)
+                speech_map = (PackedSpeechMap if self.pack else SpeechMap).from_audio(audio)
+                report = speech_map.report()
+                print(f"🔇 VAD: {report['regions']} speech regions, skipping "
+                      f"{report['skipped_seconds']:.0f}s of {report['total_seconds']:.0f}s "
+                      f"({report['skipped_percent']:.0f}%)")
+                if self.pack:
+                    print(f"📦 Packed into {report['windows']} encoder windows "
+                          f"(unpacked: {report['unpacked_windows']})")
+                if speech_map.is_empty:
+                    print("⚠️  No speech detected")
+                    return {'text': "", 'segments': [], 'language': language, 'vad': report}
+                audio = speech_map.packed_audio(audio)
+
+            # VAD-packed audio is not on the media's timeline, so its features are not kept
+            on_encoded = self._feature_recorder() if speech_map is None else None
+            on_progress, reporter = self._progress_callback(span_seconds, self._audio_seconds(audio))
+            result = self._run_transcription(audio, options, on_encoded=on_encoded, on_progress=on_progress)
+            self._record_throughput(span_seconds, time.perf_counter() - started)
+            if reporter is not None:
+                reporter.finish()
+
+            if speech_map is not None:
+                result['segments'] = speech_map.remap_segments(result.get('segments', []))
+                result['vad'] = speech_map.report()
 
             # Filter repetitive segments
             if 'segments' in result:
                 original_count = len(result['segments'])
-                result['segments'] = self.detect_repetition(result['segments'])
+                result['segments'] = self.detect_repetition(result['segments'], detector=repetition)
                 filtered_count = original_count - len(result['segments'])
 
                 if filtered_count > 0:
@@ -245,28 +530,93 @@ class WhisperProcessor:
             traceback.print_exc()
             return None
 
+    def _audio_seconds(self, audio):
+        """Duration of a waveform or media file in seconds (None if it cannot be probed)"""
+        try:
+            return len(audio) / SAMPLE_RATE if isinstance(audio, np.ndarray) else probe_duration(audio)
+        except Exception:
+            return None
+
+    def _progress_callback(self, span_seconds, transcribed_seconds):
+        """
+        Progress callback for one transcribe() call.
+
+        Args:
+            span_seconds: Media duration the call covers
+            transcribed_seconds: Audio actually sent to the model (less after VAD)
+
+        Returns:
+            (callback or None, reporter to finish when the call succeeds or None)
+        """
+        if self._progress is not None:
+            # One chunk of a longer run; its reporter spans the whole file
+            return self._progress.scoped(self.media_offset, span_seconds, transcribed_seconds), None
+        if self.on_progress is None or not span_seconds:
+            return None, None
+        reporter = ProgressReporter(span_seconds, self.on_progress)
+        return reporter.scoped(0.0, span_seconds, transcribed_seconds), reporter
+
+    def _throughput_modes(self):
+        """Speed-up modes in effect, as recorded in the throughput key"""
+        modes = []
+        if self.batch_size > 1:
+            modes.append(f"batch{self.batch_size}")
+        if self.workers > 1 and self.device == "cpu" and not self.multitrack:
+            modes.append(f"workers{self.workers}")
+        if self.pack:
+            modes.append("pack")
+        elif self.vad:
+            modes.append("vad")
+        if self.adaptive:
+            modes.append("adaptive")
+        if self.draft_model_name:
+            modes.append(f"draft-{self.draft_model_name}")
+        if self.compile_mode:
+            modes.append(f"compile-{self.compile_mode}")
+        if self.stream:
+            modes.append("stream")
+        return modes
+
+    def _record_throughput(self, seconds, elapsed):
+        """
+        Add this run's real-time factor to the per-configuration throughput record.
+
+        Args:
+            seconds: Duration of the recording (before VAD removed any silence)
+            elapsed: Wall time spent transcribing it
+        """
+        from throughput import record_throughput, throughput_key
+
+        if not seconds:
+            return
+        key = throughput_key(self.model_name, self.engine.name, self.precision, self.device,
+                             self._throughput_modes())
+        entry = record_throughput(key, seconds, elapsed)
+        print(f"📈 RTF {elapsed / seconds:.3f} ({key}, average {entry['rtf']:.3f})",
+              file=sys.stderr, flush=True)
+
     def save_transcript(self, result, output_path):
         """Save transcript with timestamps"""
         print(f"\n💾 Saving transcript to: {output_path}")
 
         try:
             with open(output_path, 'w', encoding='utf-8') as f:
-                # Write header
-                f.write(f"Transcript - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Model: {self.model_name}\n")
-                f.write(f"Language: {result.get('language', 'auto-detected')}\n")
-                f.write("=" * 60 + "\n\n")
+                self._write_header(f, result.get('language', 'auto-detected'))
 
                 # Write segments with timestamps
                 if 'segments' in result:
-                    for segment in result['segments']:
-                        timestamp = f"[{self._format_timestamp(segment['start'])} --> {self._format_timestamp(segment['end'])}]"
-                        f.write(f"{timestamp}\n")
-                        f.write(f"{segment['text'].strip()}\n\n")
+                    self._write_segments(f, result['segments'])
                 else:
                     # Fallback: full text without segments
                     f.write(result['text'])
 
+            if 'segments' in result:
+                # Structured store with word timings and a seek index
+                try:
+                    write_segment_store(result['segments'], output_path)
+                except (OSError, KeyError, TypeError, ValueError) as e:
+                    print(f"⚠️  Could not write segment store: {e}")
+
             print(f"✅ Transcript saved!")
             return True
 
@@ -274,13 +624,34 @@ class WhisperProcessor:
             print(f"❌ Error saving transcript: {e}")
             return False
 
-    def transcribe_file(self, file_path, output_path):
+    def _write_header(self, f, language):
+        """Write the transcript header"""
+        f.write(f"Transcript - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Model: {self.model_name}\n")
+        f.write(f"Language: {language or 'auto-detected'}\n")
+        f.write("=" * 60 + "\n\n")
+
+    def _write_segments(self, f, segments):
+        """Write segments with timestamps (prefixed with their track label in multi-track transcripts)"""
+        for segment in segments:
+            timestamp = f"[{self._format_timestamp(segment['start'])} --> {self._format_timestamp(segment['end'])}]"
+            f.write(f"{timestamp}\n")
+            text = segment['text'].strip()
+            if segment.get('track'):
+                text = f"{segment['track']}: {text}"
+            f.write(f"{text}\n\n")
+
+    def transcribe_file(self, file_path, output_path, keep_audio=False, audio=None, language=None):
         """
         Transcribe a single file and save the transcript.
 
         Args:
             file_path: Path to the input file (video or audio)
             output_path: Path to save the transcript
+            keep_audio: Also write the decoded audio as a WAV next to the transcript
+            audio: Already decoded waveform of the file (e.g. prefetched by
+                BatchPipeline); decoded here when None
+            language: Force language (None for auto-detect)
 
         Returns:
             Path to transcript file on success, None on failure
@@ -298,39 +669,73 @@ class WhisperProcessor:
                 print(f"ERROR: Input file not found: {input_path}", file=sys.stderr, flush=True)
                 return None
 
-            # Check if audio needs to be extracted
-            if input_path.suffix in [".mp4", ".mkv", ".mov"]:
-                audio_path = output_path.with_suffix(".wav")
-                print(f"DEBUG: Extracting audio to {audio_path}", file=sys.stderr, flush=True)
-                if not self.extract_audio(input_path, audio_path):
-                    print(f"ERROR: Failed to extract audio from {input_path}", file=sys.stderr, flush=True)
+            # Identical media with identical settings was already transcribed
+            cached = self.cache.lookup(input_path, self.settings(language)) if self.cache else None
+            if cached is not None and not keep_audio:
+                if not self.save_transcript(cached, output_path):
+                    print(f"ERROR: Failed to save transcript", file=sys.stderr, flush=True)
                     return None
-            else:
-                audio_path = input_path
-                print(f"DEBUG: Using audio file directly: {audio_path}", file=sys.stderr, flush=True)
+                print(f"DEBUG: Served transcript from cache, output: {output_path}", file=sys.stderr, flush=True)
+                return str(output_path)
 
             # Check if model is loaded
             if self.model is None:
                 print(f"ERROR: Model not loaded before transcription", file=sys.stderr, flush=True)
                 return None
 
-            # Transcribe the audio
-            print(f"DEBUG: Starting transcription of {audio_path}", file=sys.stderr, flush=True)
-            result = self.transcribe(audio_path)
+            # Batched encoder output is kept under this key for align_words
+            self.media_key = sampled_fingerprint(input_path)
+            self.media_offset = 0.0
+
+            checkpoint = None
+            if self.multitrack:
+                # One transcript from the separately transcribed speaker tracks
+                print(f"DEBUG: Starting multi-track transcription of {input_path}", file=sys.stderr, flush=True)
+                result = self.transcribe_tracks(input_path, language=language)
+                audio = self.load_audio(input_path) if keep_audio else None
+            elif self.checkpoint_interval and not self.stream:
+                # Transcribe in resumable chunks, decoding only what is left
+                print(f"DEBUG: Starting resumable transcription of {input_path}", file=sys.stderr, flush=True)
+                checkpoint = TranscriptionCheckpoint(output_path, input_path, self.settings(language))
+                result = self.transcribe_resumable(input_path, checkpoint, language=language, audio=audio)
+                if keep_audio and audio is None:
+                    audio = self.load_audio(input_path)
+            elif self.stream and audio is None:
+                # Bounded windows straight from FFmpeg; the waveform is never held whole
+                print(f"DEBUG: Starting streaming transcription of {input_path}", file=sys.stderr, flush=True)
+                result = self.transcribe(input_path, language=language)
+                audio = self.load_audio(input_path) if keep_audio else None
+            else:
+                # Decode straight into memory (no temporary WAV)
+                if audio is None:
+                    audio = self.load_audio(input_path)
+                if audio is None:
+                    print(f"ERROR: Failed to decode audio from {input_path}", file=sys.stderr, flush=True)
+                    return None
+
+                # Transcribe the audio
+                print(f"DEBUG: Starting transcription of {input_path}", file=sys.stderr, flush=True)
+                result = self.transcribe(audio, language=language)
+
             if not result:
                 print(f"ERROR: Transcription failed - returned None", file=sys.stderr, flush=True)
                 return None
 
+            if keep_audio and audio is not None:
+                audio_path = output_path.with_suffix(".wav")
+                write_wav(audio, audio_path)
+                print(f"DEBUG: Kept decoded audio at {audio_path}", file=sys.stderr, flush=True)
+
             # Save the transcript
             print(f"DEBUG: Saving transcript to {output_path}", file=sys.stderr, flush=True)
             if not self.save_transcript(result, output_path):
                 print(f"ERROR: Failed to save transcript", file=sys.stderr, flush=True)
                 return None
 
-            # Clean up temporary audio file
-            if audio_path != input_path and audio_path.exists():
-                print(f"DEBUG: Cleaning up temporary audio file", file=sys.stderr, flush=True)
-                audio_path.unlink()
+            if checkpoint is not None:
+                checkpoint.remove()
+            if self.cache:
+                self.cache.store(input_path, self.settings(language), result)
 
             print(f"DEBUG: Transcription complete, output: {output_path}", file=sys.stderr, flush=True)
             return str(output_path)
@@ -341,6 +746,366 @@ class WhisperProcessor:
             traceback.print_exc(file=sys.stderr)
             return None
 
+        finally:
+            self.media_key = None
+
+    def transcribe_tracks(self, media_path, language=None):
+        """
+        Transcribe every audio track of a multi-track recording and merge them.
+
+        Args:
+            media_path: Multi-stream media file (e.g. an MKV with one track per
+                speaker), or a ZIP archive of per-speaker audio files
+            language: Force language (None for auto-detect per track)
+
+        Returns:
+            Whisper-style result whose segments carry a 'track' label, or None on failure
+        """
+        if self.model is None:
+            print("❌ Model not loaded")
+            return None
+
+        try:
+            with tempfile.TemporaryDirectory(prefix="meeting-recap-tracks-") as extract_dir:
+                tracks = list_tracks(media_path, extract_dir)
+                if not tracks:
+                    print(f"❌ No audio tracks found in {media_path}")
+                    return None
+                print(f"🎚️  {len(tracks)} audio tracks: {', '.join(track['label'] for track in tracks)}")
+
+                durations = {path: probe_duration(path) or 0.0 for path in {track['path'] for track in tracks}}
+                total_seconds = sum(durations[track['path']] for track in tracks)
+                reporter = None
+                if self.on_progress is not None and total_seconds:
+                    # Tracks are laid end to end on one progress timeline
+                    reporter = ProgressReporter(total_seconds, self.on_progress)
+                self._progress = reporter
+                try:
+                    result = transcribe_tracks(
+                        self, tracks, language=language,
+                        workers=self.workers if self.device == "cpu" else 1,
+                        threads_per_worker=self.threads_per_worker,
+                        worker_settings=self._track_worker_settings(),
+                        on_progress=reporter.update if reporter is not None else None
+                    )
+                finally:
+                    self._progress = None
+                if reporter is not None:
+                    reporter.finish()
+                return result
+
+        except Exception as e:
+            print(f"❌ Error during multi-track transcription: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def _track_worker_settings(self):
+        """WhisperProcessor arguments for worker processes transcribing single tracks"""
+        return {
+            "model_name": self.model_name,
+            "engine": self.engine.name,
+            "precision": self.precision if self.device == "cpu" else None,
+            "batch_size": self.batch_size,
+            "vad": True,
+            "pack": self.pack,
+            "adaptive": self.adaptive,
+            "word_timestamps": self.word_timestamps,
+            "draft_model": self.draft_model_name,
+            "draft_tokens": self.draft_tokens,
+            "compile_mode": self.compile_mode,
+            "repetition_window": self.repetition_window,
+            "repetition_threshold": self.repetition_threshold,
+        }
+
+    def transcribe_resumable(self, input_path, checkpoint, language=None, audio=None):
+        """
+        Transcribe a file in chunks, checkpointing after each one.
+
+        Each chunk ends at a pause near `checkpoint_interval` seconds. After it
+        is transcribed, the segments so far and the audio offset reached are
+        saved, so a restarted run decodes only the audio that is left.
+
+        Args:
+            input_path: Media file to transcribe
+            checkpoint: TranscriptionCheckpoint for this input and settings
+            language: Force language (None for auto-detect)
+            audio: Already decoded waveform of the file (e.g. prefetched by
+                BatchPipeline); chunks are sliced from it instead of decoded
+
+        Returns:
+            Whisper-style result dict, or None on failure
+        """
+        segments, offset, language = checkpoint.load() or ([], 0.0, language)
+        if offset:
+            print(f"⏩ Resuming from checkpoint at {self._format_timestamp(offset)} "
+                  f"({len(segments)} segments done)")
+
+        repetition = self.repetition_detector()
+        repetition.prime(segments)
+
+        interval = self.checkpoint_interval
+        lookahead = min(30.0, interval / 4)
+
+        # One reporter spans every chunk, so progress and ETA cover the whole file
+        total_seconds = self._audio_seconds(input_path) if self.on_progress else None
+        if total_seconds:
+            self._progress = ProgressReporter(total_seconds, self.on_progress, done_seconds=offset)
+
+        # With the audio cache, chunks are slices of the memory-mapped waveform
+        if audio is None and self.audio_cache is not None:
+            audio = self.decode_media(input_path)
+
+        try:
+            while True:
+                if audio is not None:
+                    first = int(round(offset * SAMPLE_RATE))
+                    chunk = audio[first:first + int((interval + lookahead) * SAMPLE_RATE)]
+                else:
+                    chunk = decode_audio(input_path, start=offset, duration=interval + lookahead)
+                if len(chunk) == 0:
+                    break
+
+                final = len(chunk) < int((interval + lookahead) * SAMPLE_RATE)
+                if not final:
+                    # End the chunk in a pause so no word is split across chunks
+                    cut = find_quiet_point(chunk, int((interval - lookahead) * SAMPLE_RATE), len(chunk))
+                    chunk = chunk[:cut]
+
+                self.media_offset = offset
+                result = self.transcribe(chunk, language=language, repetition=repetition)
+                if result is None:
+                    return None
+
+                language = language or result.get('language')
+                segments.extend(offset_segments(result.get('segments', []), offset))
+                offset += len(chunk) / SAMPLE_RATE
+
+                checkpoint.save(segments, offset, language)
+                print(f"💾 Checkpoint saved at {self._format_timestamp(offset)}")
+
+                if final:
+                    break
+
+            if self._progress is not None:
+                self._progress.finish()
+        finally:
+            self._progress = None
+
+        segments = stitch_segments(segments)
+        return {
+            'text': "".join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': language,
+        }
+
+    def transcribe_follow(self, input_path, output_path, language=None, window_seconds=30.0,
+                          idle_seconds=15.0, poll_seconds=2.0, on_window=None):
+        """
+        Transcribe a recording that is still being written.
+
+        Newly appended audio is decoded in windows of about `window_seconds`,
+        each ending at a pause, and its segments are appended to the
+        transcript as soon as the window is done. Once the file has not grown
+        for `idle_seconds`, the remaining tail is transcribed in a final pass
+        and the transcript is rewritten with the detected language.
+
+        Args:
+            input_path: Recording being written (a streamable container such as WAV, WebM or MKV)
+            output_path: Transcript path, appended to while the recording grows
+            language: Force language (None for auto-detect on the first window)
+            window_seconds: Audio per incremental window
+            idle_seconds: Seconds without growth after which the recording is treated as finished
+            poll_seconds: Delay between checks for new audio
+            on_window: Optional callback(offset_seconds, new_segments, final) after each window
+
+        Returns:
+            Whisper-style result dict, or None on failure
+        """
+        input_path = Path(input_path)
+        if self.model is None:
+            print("❌ Model not loaded")
+            return None
+
+        lookahead = min(5.0, window_seconds / 4)
+        needed = int((window_seconds + lookahead) * SAMPLE_RATE)
+        repetition = self.repetition_detector()
+        segments = []
+        offset = 0.0
+
+        last_size = -1
+        last_growth = time.monotonic()
+
+        print(f"👀 Following {input_path.name} (finishes after {idle_seconds:.0f}s without growth)")
+
+        with open(output_path, 'w', encoding='utf-8') as transcript:
+            self._write_header(transcript, language)
+            transcript.flush()
+
+            while True:
+                size = input_path.stat().st_size if input_path.exists() else 0
+                if size != last_size:
+                    last_size = size
+                    last_growth = time.monotonic()
+                growing = time.monotonic() - last_growth < idle_seconds
+
+                try:
+                    chunk = decode_audio(input_path, start=offset, duration=window_seconds + lookahead)
+                except RuntimeError as e:
+                    # A container caught mid-write may not parse yet
+                    if growing:
+                        time.sleep(poll_seconds)
+                        continue
+                    print(f"❌ Could not decode {input_path}: {e}")
+                    return None
+
+                final = len(chunk) < needed
+                if final and growing:
+                    time.sleep(poll_seconds)
+                    continue
+                if not final:
+                    # End the window in a pause so no word is split across windows
+                    cut = find_quiet_point(chunk, int((window_seconds - lookahead) * SAMPLE_RATE), len(chunk))
+                    chunk = chunk[:cut]
+
+                new_segments = []
+                if len(chunk):
+                    result = self.transcribe(chunk, language=language, repetition=repetition)
+                    if result is None:
+                        return None
+
+                    language = language or result.get('language')
+                    new_segments = offset_segments(result.get('segments', []), offset)
+                    self._write_segments(transcript, new_segments)
+                    transcript.flush()
+
+                    segments.extend(new_segments)
+                    offset += len(chunk) / SAMPLE_RATE
+
+                print(f"📡 Live transcript up to {self._format_timestamp(offset)}", file=sys.stderr, flush=True)
+                if on_window:
+                    on_window(offset, new_segments, final)
+
+                if final:
+                    break
+
+        segments = stitch_segments(segments)
+        result = {
+            'text': "".join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': language,
+        }
+
+        # Rewrite with the detected language in the header
+        if not self.save_transcript(result, output_path):
+            return None
+        return result
+
+    def align_words(self, audio, segments, language=None, offset=0.0, media_key=None):
+        """
+        Add word-level timestamps to already transcribed segments (on demand).
+
+        Encoder output kept from batched transcription of the same media is
+        reused; other windows are encoded once and cached for the next request.
+
+        Args:
+            audio: float32 waveform at 16 kHz
+            segments: Segment dicts to align, in time order
+            language: Transcript language (None = detect from the audio)
+            offset: Position of audio[0] on the segments' timeline, in seconds
+            media_key: Media fingerprint the encoder output is cached under
+
+        Returns:
+            Aligned segments with 'words', or None on failure
+        """
+        if self.model is None:
+            print("❌ Model not loaded")
+            return None
+
+        try:
+            language = language or self.detect_language(audio)
+            return self.engine.align_words(
+                self.model, audio, segments, language,
+                feature_cache=self.feature_cache,
+                media_key=media_key,
+                offset=int(round(offset * SAMPLE_RATE))
+            )
+        except NotImplementedError as e:
+            print(f"❌ {e}")
+            return None
+        except Exception as e:
+            print(f"❌ Error during word alignment: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    def align_transcript(self, transcript_path, media_path, start=0.0, end=None, save=True):
+        """
+        Align words for one time range of a saved transcript.
+
+        Only the audio around the range is decoded. With `save`, the word
+        timings are written back into the transcript's segment store so the
+        next request for the range is served without the model.
+
+        Args:
+            transcript_path: Transcript with a segment store next to it
+            media_path: Media file the transcript was made from
+            start: Range start in seconds
+            end: Range end in seconds (None = end of transcript)
+            save: Write the aligned words back into the segment store
+
+        Returns:
+            Aligned segments with 'words', or None on failure
+        """
+        try:
+            with SegmentStore(transcript_path) as store:
+                segments = store.range(start, end)
+        except FileNotFoundError:
+            print(f"❌ No segment store for {transcript_path}")
+            return None
+
+        pending = [segment for segment in segments if not segment['words']]
+        if not pending:
+            return segments
+
+        # Decode from early enough to cover any cached window holding the first segment
+        hop = whisper.audio.HOP_LENGTH
+        first_sample = int(max(0.0, pending[0]['start'] - 30.0) * SAMPLE_RATE) // hop * hop
+        decode_start = first_sample / SAMPLE_RATE
+        duration = pending[-1]['end'] - decode_start + 30.0
+        cached_audio = self.audio_cache.lookup_pcm(media_path) if self.audio_cache is not None else None
+        if cached_audio is not None:
+            audio = cached_audio[first_sample:first_sample + int(duration * SAMPLE_RATE)]
+        else:
+            audio = decode_audio(media_path, start=decode_start, duration=duration)
+
+        aligned = self.align_words(audio, pending, language=self._transcript_language(transcript_path),
+                                   offset=decode_start, media_key=sampled_fingerprint(media_path))
+        if aligned is None:
+            return None
+
+        if save:
+            aligned_by_id = {segment['id']: segment for segment in aligned}
+            with SegmentStore(transcript_path) as store:
+                all_segments = store.range()
+            write_segment_store(
+                [aligned_by_id.get(segment['id'], segment) for segment in all_segments],
+                transcript_path
+            )
+
+        return segments
+
+    def _transcript_language(self, transcript_path):
+        """Language recorded in a transcript header, or None if it was not detected"""
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("Language: "):
+                    language = line[len("Language: "):].strip()
+                    return None if language in ("", "None", "auto-detected") else language
+                if line.startswith("="):
+                    break
+        return None
+
     def _format_timestamp(self, seconds):
         """Format seconds as HH:MM:SS"""
         hours = int(seconds // 3600)
@@ -364,6 +1129,9 @@ Examples:
   # Force English language
   python rtx5090_processor.py recordings/meeting.mp4 --language en
 
+  # Transcribe a whole folder (or glob), loading the model once
+  python rtx5090_processor.py "recordings/*.mkv" --prefetch 2
+
   # Check system
   python rtx5090_processor.py --check
 
@@ -380,7 +1148,7 @@ Model sizes:
     parser.add_argument(
         'input',
         nargs='?',
-        help='Input video file (MP4, etc.)'
+        help='Input video file (MP4, etc.), or a directory/glob of files for batch mode'
     )
 
     parser.add_argument(
@@ -390,6 +1158,20 @@ Model sizes:
         help='Whisper model size (default: medium)'
     )
 
+    parser.add_argument(
+        '--engine',
+        default='openai',
+        choices=sorted(ENGINES),
+        help='Inference engine (default: openai; onnx decodes greedily, without beam search)'
+    )
+
+    parser.add_argument(
+        '--precision',
+        help='Engine precision: fp32/fp16/int8/bf16 for openai (int8 = dynamic quantization, '
+             'bf16 = autocast on CPUs with AVX512_BF16/AMX); '
+             'int8, int8_float16, float16, float32 for faster-whisper (default: best for the device)'
+    )
+
     parser.add_argument(
         '--language',
         help='Force language (e.g., en, es, fr). Leave blank for auto-detect'
@@ -398,8 +1180,146 @@ Model sizes:
     parser.add_argument(
         '--keep-audio',
         action='store_true',
-        default=True,
-        help='Keep extracted WAV file (default: True)'
+        help='Also write the decoded audio as a WAV file (default: decode in memory only)'
+    )
+
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1,
+        help='30 s windows encoded together (default: 1, sequential); the decoder is batched only for '
+             'greedy decoding (--adaptive), beam search decodes each window on its own'
+    )
+
+    parser.add_argument(
+        '--word-timestamps',
+        action='store_true',
+        help='Align words during transcription (default: aligned on demand, e.g. for subtitle export)'
+    )
+
+    parser.add_argument(
+        '--compile',
+        choices=['trace', 'inductor'],
+        help='Compiled CPU inference: TorchScript-traced encoder or torch.compile (openai engine, '
+             'artifacts cached on disk)'
+    )
+
+    parser.add_argument(
+        '--draft-model',
+        choices=['tiny', 'base', 'small'],
+        help='Speculative decoding: small draft model proposes tokens the main model verifies (openai engine, greedy)'
+    )
+
+    parser.add_argument(
+        '--draft-tokens',
+        type=int,
+        default=4,
+        help='Tokens the draft model proposes per verification pass (default: 4)'
+    )
+
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Decode greedily and use beam search only on windows that fail quality checks (openai engine)'
+    )
+
+    parser.add_argument(
+        '--vad',
+        action='store_true',
+        help='Skip silence and table noise with a voice activity pre-pass'
+    )
+
+    parser.add_argument(
+        '--pack',
+        action='store_true',
+        help='Fill each 30 s encoder window with several short speech regions (implies --vad; openai/onnx engines)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='CPU worker processes for parallel transcription (default: 1, off)'
+    )
+
+    parser.add_argument(
+        '--threads-per-worker',
+        type=int,
+        help='Torch threads per worker process (default: CPU cores / workers)'
+    )
+
+    parser.add_argument(
+        '--checkpoint-every',
+        type=float,
+        default=0,
+        metavar='SECONDS',
+        help='Save a resumable checkpoint every N seconds of audio, e.g. 600 (default: 0 = off)'
+    )
+
+    parser.add_argument(
+        '--repetition-window',
+        type=int,
+        default=8,
+        help='Recent segments each segment is compared against when filtering repetition loops (default: 8)'
+    )
+
+    parser.add_argument(
+        '--repetition-threshold',
+        type=float,
+        default=0.8,
+        help='Fraction of repeated word shingles at which a segment is dropped (default: 0.8)'
+    )
+
+    parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='Transcribe a recording that is still being written, appending to the transcript as it grows'
+    )
+
+    parser.add_argument(
+        '--follow-idle',
+        type=float,
+        default=15.0,
+        help='With --follow, seconds without file growth before the final pass (default: 15)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always transcribe, even if this media was transcribed with the same settings before'
+    )
+
+    parser.add_argument(
+        '--audio-cache',
+        action='store_true',
+        help='Keep decoded audio and log-mel features in ~/.cache/meeting-recap/audio so repeat runs '
+             'skip FFmpeg (also WHISPER_AUDIO_CACHE=1)'
+    )
+
+    parser.add_argument(
+        '--multitrack',
+        action='store_true',
+        help='Transcribe each audio track (or each file of a ZIP) separately with VAD, in parallel with '
+             '--workers, and label the merged transcript by track'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Transcribe in bounded batches of 30 s windows read from FFmpeg, so memory stays '
+             'constant however long the recording (openai/onnx engines)'
+    )
+
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=2,
+        help='Batch mode: files decoded ahead of the one being transcribed (default: 2)'
+    )
+
+    parser.add_argument(
+        '--output-dir',
+        help='Batch mode: directory for transcripts (default: ../transcripts next to each input)'
     )
 
     parser.add_argument(
@@ -411,7 +1331,31 @@ Model sizes:
     args = parser.parse_args()
 
     # Initialize processor
-    processor = WhisperProcessor(model_name=args.model)
+    try:
+        processor = WhisperProcessor(
+            model_name=args.model,
+            workers=args.workers,
+            threads_per_worker=args.threads_per_worker,
+            engine=args.engine,
+            precision=args.precision,
+            batch_size=args.batch_size,
+            vad=args.vad,
+            checkpoint_interval=args.checkpoint_every or None,
+            use_cache=not args.no_cache,
+            audio_cache=args.audio_cache or AUDIO_CACHE_ENABLED,
+            repetition_window=args.repetition_window,
+            repetition_threshold=args.repetition_threshold,
+            adaptive=args.adaptive,
+            word_timestamps=args.word_timestamps,
+            draft_model=args.draft_model,
+            draft_tokens=args.draft_tokens,
+            compile_mode=args.compile,
+            stream=args.stream,
+            pack=args.pack,
+            multitrack=args.multitrack
+        )
+    except ValueError as e:
+        parser.error(str(e))
 
     # Check system if requested
     if args.check:
@@ -423,6 +1367,40 @@ Model sizes:
         parser.print_help()
         return
 
+    # Directory or glob: one model load, FFmpeg decoding overlapped with inference
+    if is_batch_input(args.input):
+        inputs = expand_inputs(args.input)
+        if not inputs:
+            print(f"❌ Error: No audio or video files match: {args.input}")
+            return
+
+        print("\n" + "=" * 60)
+        print("RTX 5090 Whisper Processor (Batch)")
+        print("=" * 60)
+        print(f"Input: {args.input} ({len(inputs)} files)")
+        print(f"Model: {args.model}")
+        print(f"Engine: {args.engine} ({processor.precision})")
+        print(f"Language: {args.language or 'auto-detect'}")
+        print(f"Prefetch: {args.prefetch} files")
+        print(f"Transcript output: {args.output_dir or '../transcripts next to each input'}")
+        print("=" * 60)
+
+        has_cuda = processor.check_system()
+        if not has_cuda:
+            print("⚠️  Warning: Running on CPU will be very slow!")
+            response = input("Continue? (y/n): ")
+            if response.lower() != 'y':
+                return
+
+        if not processor.load_model():
+            print("❌ Failed to load model")
+            return
+
+        pipeline = BatchPipeline(processor, prefetch=args.prefetch, output_dir=args.output_dir,
+                                 keep_audio=args.keep_audio)
+        pipeline.run(inputs, language=args.language)
+        return
+
     # Verify input exists
     input_path = Path(args.input)
     if not input_path.exists():
@@ -435,7 +1413,8 @@ Model sizes:
     transcript_dir = project_root / "transcripts"
 
     # Create directories
-    audio_dir.mkdir(exist_ok=True)
+    if args.keep_audio:
+        audio_dir.mkdir(exist_ok=True)
     transcript_dir.mkdir(exist_ok=True)
 
     # Output paths
@@ -448,8 +1427,11 @@ Model sizes:
     print("=" * 60)
     print(f"Input: {input_path}")
     print(f"Model: {args.model}")
+    print(f"Engine: {args.engine} ({processor.precision})")
+    if args.workers > 1:
+        print(f"Workers: {args.workers}")
     print(f"Language: {args.language or 'auto-detect'}")
-    print(f"Audio output: {audio_path}")
+    print(f"Audio output: {audio_path if args.keep_audio else 'in memory only'}")
     print(f"Transcript output: {transcript_path}")
     print("=" * 60)
 
@@ -461,9 +1443,14 @@ Model sizes:
         if response.lower() != 'y':
             return
 
-    # Extract audio
-    if not processor.extract_audio(input_path, audio_path):
-        print("❌ Failed to extract audio")
+    # Serve repeat runs on identical media from the transcript cache
+    cached = None
+    if processor.cache and not args.keep_audio and not args.follow:
+        cached = processor.cache.lookup(input_path, processor.settings(args.language))
+    if cached is not None:
+        if processor.save_transcript(cached, transcript_path):
+            print("\n⚡ Transcript served from cache")
+            print(f"📄 Transcript: {transcript_path}")
         return
 
     # Load model
@@ -471,21 +1458,60 @@ Model sizes:
         print("❌ Failed to load model")
         return
 
-    # Transcribe
-    result = processor.transcribe(audio_path, language=args.language)
+    checkpoint = None
+    if args.follow:
+        # Tail the growing recording; the transcript is written as it goes
+        result = processor.transcribe_follow(
+            input_path, transcript_path, language=args.language, idle_seconds=args.follow_idle
+        )
+        audio = processor.load_audio(input_path) if args.keep_audio else None
+    elif processor.multitrack:
+        # Each speaker track separately, merged into one labelled transcript
+        result = processor.transcribe_tracks(input_path, language=args.language)
+        audio = processor.load_audio(input_path) if args.keep_audio else None
+    elif processor.checkpoint_interval and not processor.stream:
+        # Transcribe in resumable chunks, decoding only what is left
+        checkpoint = TranscriptionCheckpoint(
+            transcript_path, input_path, processor.settings(args.language)
+        )
+        result = processor.transcribe_resumable(input_path, checkpoint, language=args.language)
+        audio = processor.load_audio(input_path) if args.keep_audio else None
+    elif processor.stream:
+        # Bounded 30 s windows straight from FFmpeg or the audio cache
+        result = processor.transcribe(input_path, language=args.language)
+        audio = processor.load_audio(input_path) if args.keep_audio else None
+    else:
+        # Decode audio straight into memory
+        audio = processor.load_audio(input_path)
+        if audio is None:
+            print("❌ Failed to decode audio")
+            return
+
+        # Transcribe
+        result = processor.transcribe(audio, language=args.language)
+
     if not result:
         print("❌ Transcription failed")
         return
 
-    # Save transcript
-    if not processor.save_transcript(result, transcript_path):
+    if args.keep_audio and audio is not None:
+        write_wav(audio, audio_path)
+        print(f"✅ Audio saved to: {audio_path}")
+
+    # Save transcript (follow mode has already written it)
+    if not args.follow and not processor.save_transcript(result, transcript_path):
         print("❌ Failed to save transcript")
         return
 
-    # Cleanup audio if requested
-    if not args.keep_audio and audio_path.exists():
-        audio_path.unlink()
-        print(f"🗑️  Removed temporary audio file")
+    if checkpoint is not None:
+        checkpoint.remove()
+    if processor.cache:
+        processor.cache.store(input_path, processor.settings(args.language), result)
+
+    stats = get_registry().stats()
+    print(f"\n♻️  Model cache: {stats['hits']} hits, {stats['misses']} misses")
+    for entry in stats["resident"]:
+        print(f"⏱️  {entry['model']} load time: {entry['load_seconds']:.2f}s")
 
     print("\n✨ Processing complete!")
     print(f"📄 Transcript: {transcript_path}")